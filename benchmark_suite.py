@@ -0,0 +1,704 @@
+"""
+Micro benchmarks of the client hot paths, with regression tracking
+
+    python benchmark_suite.py run --output current.json
+    python benchmark_suite.py compare baseline.json current.json --threshold 10
+
+Everything runs offline (the WSDLs are read from defaults/responses and the REST round trips go to a
+local HTTP server) except the stub registration, request matching and batch benchmarks, which need --wiremock-url.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import requests
+from pydantic import parse_obj_as
+from suds.client import Client
+
+import no_ssl_verification as SSL
+import soap_stub_templates
+import stubbing_utils as WireMockStubbing
+from platform_api.base64_encoder import Base64Encoder
+from platform_api.facades.batch_executor import LIFETIME, PROCESS_MODE, THREAD_MODE, BatchCall, BatchExecutor
+from platform_api.facades.lifetime_model import (
+    ApplySettingsStatusResponse,
+    InactivateLifetimeUserRequest,
+    LifetimeChangeUserPassword,
+    LifetimeCredentials,
+    LifetimeEnvironment,
+    LifetimeUser,
+)
+from platform_api.facades.platform_service_center_model import ServiceCenterCredentials, SolutionDownloadResponse
+from platform_api.facades.protocol_wrappers.base_soap_wrapper import (
+    BaseSoapWrapperService,
+    clear_warm_clients,
+    revalidate_warm_clients,
+)
+from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import LifeTimeSoapWrapperService
+from platform_api.facades.protocol_wrappers.platform_soap_wrapper import ServiceCenterSoapWrapperService
+from wiremock_service import WireMockRun
+
+FORMAT_VERSION = 1
+
+# results/ is ignored by git, a run never dirties the tree
+DEFAULT_OUTPUT = "results/benchmark_results.json"
+DEFAULT_THRESHOLD_PERCENT = 10.0
+DEFAULT_MIN_TIME_SECONDS = 0.2
+DEFAULT_REPEAT = 5
+DEFAULT_MAX_PAYLOAD_SIZE = 16 * 1024 * 1024
+DEFAULT_STUBS_TO_REGISTER = 200
+DEFAULT_STUBS_TO_MATCH = 100
+DEFAULT_BATCH_SIZE = 200
+
+KB = 1024
+MB = 1024 * KB
+BASE64_PAYLOAD_SIZES = [1 * KB, 64 * KB, 1 * MB, 16 * MB, 100 * MB, 500 * MB]
+
+RESPONSES_PATH = pathlib.Path(__file__).resolve().parent / "defaults" / "responses"
+LIFETIME_WSDL = (RESPONSES_PATH / "lifetime_service_usermanagement.xml").as_uri()
+PLATFORM_WSDL = (RESPONSES_PATH / "service_center_outsystems_platform.xml").as_uri()
+SOLUTIONS_WSDL = (RESPONSES_PATH / "service_center_solutions.xml").as_uri()
+
+USER_CREATE_OR_UPDATE_REPLY = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <User_CreateOrUpdateResponse xmlns="http://www.outsystems.com">
+            <Success>true</Success>
+            <Status>
+                <Id>1</Id>
+                <ResponseId>1</ResponseId>
+                <ResponseMessage>OK</ResponseMessage>
+                <ResponseAdditionalInfo/>
+            </Status>
+            <PlatformUser>
+                <Id>1234</Id>
+                <Username>username</Username>
+            </PlatformUser>
+        </User_CreateOrUpdateResponse>
+    </soap:Body>
+</soap:Envelope>"""
+
+SET_LICENSE_REPLY = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+<soap:Body>
+    <SetLicenseResponse xmlns="http://www.outsystems.com">
+        <success>true</success>
+    </SetLicenseResponse>
+</soap:Body>
+</soap:Envelope>"""
+
+LIFETIME_AUTHENTICATION = LifetimeCredentials(username="admin_username", password="admin_password")
+SERVICE_CENTER_AUTHENTICATION = ServiceCenterCredentials(username="admin_username", password_encrypted="secret")
+
+
+class BenchmarkResult(NamedTuple):
+    """Timings of a single benchmark, in seconds per call"""
+
+    iterations: int
+    median: float
+    mean: float
+    min: float
+    stdev: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "iterations": self.iterations,
+            "median_s": self.median,
+            "mean_s": self.mean,
+            "min_s": self.min,
+            "stdev_s": self.stdev,
+            "ops_per_sec": 1.0 / self.median if self.median else 0.0,
+        }
+
+
+def measure(
+        func: Callable[[], Any], min_time: float = DEFAULT_MIN_TIME_SECONDS, repeat: int = DEFAULT_REPEAT
+) -> BenchmarkResult:
+    """
+    Times func like timeit does: the number of calls per sample grows until a sample takes min_time
+
+    Args:
+        func (Callable): The code to time
+        min_time (float): The minimum duration of a sample, in seconds
+        repeat (int): The number of samples
+
+    Returns:
+        BenchmarkResult: the per call timings
+    """
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / elapsed) if elapsed else loops * 10)
+
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+
+    return _result(samples, iterations=loops * repeat)
+
+
+def _result(samples: List[float], iterations: int) -> BenchmarkResult:
+    return BenchmarkResult(
+        iterations=iterations,
+        median=statistics.median(samples),
+        mean=statistics.mean(samples),
+        min=min(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    )
+
+
+def _soap_client_benchmarks() -> Dict[str, Callable[[], Any]]:
+    def _wrapper_client():
+        # a new wrapper has no client yet, it clones the warm client of the WSDL
+        return BaseSoapWrapperService()._get_soap_client(url=LIFETIME_WSDL, faults=False)
+
+    def _cold_wrapper_client():
+        # no warm client either, so this goes through Client construction and the WSDL cache
+        clear_warm_clients()
+        return _wrapper_client()
+
+    return {
+        "soap_client.construct_uncached.lifetime": lambda: Client(LIFETIME_WSDL, faults=False, cache=None),
+        "soap_client.construct_uncached.platform": lambda: Client(PLATFORM_WSDL, faults=False, cache=None),
+        "soap_client.construct_uncached.solutions": lambda: Client(SOLUTIONS_WSDL, faults=False, cache=None),
+        "soap_client.get_soap_client.lifetime": _wrapper_client,
+        "soap_client.get_soap_client_cold.lifetime": _cold_wrapper_client,
+        # a conditional GET of the WSDL, answered with the same document by the stubs: hashed, not parsed again
+        "soap_client.revalidate_wsdl.lifetime": lambda: revalidate_warm_clients([LIFETIME_WSDL]),
+    }
+
+
+def _soap_envelope_benchmarks() -> Dict[str, Callable[[], Any]]:
+    """Marshalling goes through the wrappers' _call_* methods on a nosend client, unmarshalling through suds"""
+
+    lifetime = LifeTimeSoapWrapperService()
+    service_center = ServiceCenterSoapWrapperService()
+    lifetime_client = Client(LIFETIME_WSDL, faults=False, nosend=True, cache=None)
+    platform_client = Client(PLATFORM_WSDL, faults=False, nosend=True, cache=None)
+    solutions_client = Client(SOLUTIONS_WSDL, faults=False, nosend=True, cache=None)
+
+    auth = lifetime_client.factory.create("s0:WebServiceSimpleAuthentication")
+    auth.Username = LIFETIME_AUTHENTICATION.username
+    auth.Password = LIFETIME_AUTHENTICATION.password
+    auth.Token = None
+
+    user = LifetimeUser(username="username", password="password", name="name", email="email", role="role")
+    license_content = Base64Encoder().from_bytes_to_base64_string(b"l" * 4 * KB)
+    solution_content = Base64Encoder().from_bytes_to_base64_string(b"s" * 1 * MB)
+
+    operations = {
+        "User_CreateOrUpdate": (
+            lambda: lifetime._call_create_or_update_user(lifetime_client, auth, user, True),
+            USER_CREATE_OR_UPDATE_REPLY,
+        ),
+        "User_ChangePassword": (
+            lambda: lifetime._call_change_user_password(
+                client=lifetime_client,
+                authentication=auth,
+                user=LifetimeChangeUserPassword(tenant_id="t", username="username", new_password="password"),
+                encrypt_password=True,
+            ),
+            soap_stub_templates.USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_ChangePassword"),
+        ),
+        "User_SetInactive": (
+            lambda: lifetime._call_inactivate_user(
+                client=lifetime_client,
+                authentication=auth,
+                request=InactivateLifetimeUserRequest(tenant_id="t", username="username"),
+            ),
+            soap_stub_templates.USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive"),
+        ),
+        "GetPlatformInfo": (
+            lambda: service_center._call_get_platform_info(client=platform_client),
+            soap_stub_templates.GET_PLATFORM_INFO_RESPONSE,
+        ),
+        "SetLicense": (
+            lambda: service_center._call_set_license(
+                client=platform_client, authentication=SERVICE_CENTER_AUTHENTICATION, b64_license=license_content
+            ),
+            SET_LICENSE_REPLY,
+        ),
+        "CreateAllSolution": (
+            lambda: service_center._call_create_all_solution(
+                client=solutions_client, authentication=SERVICE_CENTER_AUTHENTICATION, all_solution_name="all"
+            ),
+            soap_stub_templates.CREATE_ALL_SOLUTION_RESPONSE,
+        ),
+        "Download": (
+            lambda: service_center._call_solution_download(
+                client=solutions_client,
+                authentication=SERVICE_CENTER_AUTHENTICATION,
+                solution_name="solution",
+                solution_version_id=1,
+            ),
+            soap_stub_templates.SOLUTION_DOWNLOAD_RESPONSE_TEMPLATE.format(file_content=solution_content),
+        ),
+    }
+
+    benchmarks = {}
+    for name, (marshal, reply) in operations.items():
+        context = marshal()
+        reply_bytes = reply.encode("utf-8")
+        benchmarks[f"soap_envelope.marshal.{name}"] = marshal
+        benchmarks[f"soap_envelope.unmarshal.{name}"] = (
+            lambda context=context, reply_bytes=reply_bytes: context.process_reply(reply_bytes)
+        )
+
+    return benchmarks
+
+
+def _decode_hash_write(encoder: Base64Encoder, encoded: str):
+    """What the tooling did before decode_to_file: decode, then hash, then write the full copy"""
+
+    decoded = encoder.from_base64_string_to_bytes(encoded)
+    digest = hashlib.sha256(decoded).hexdigest()
+    with open(os.devnull, "wb") as f:
+        f.write(decoded)
+
+    return digest, len(decoded)
+
+
+def _decode_to_file(encoder: Base64Encoder, encoded: str):
+    with open(os.devnull, "wb") as f:
+        return encoder.decode_to_file(encoded, f)
+
+
+def _base64_benchmarks(max_payload_size: int) -> Dict[str, Callable[[], Any]]:
+    encoder = Base64Encoder()
+    benchmarks = {}
+
+    for size in BASE64_PAYLOAD_SIZES:
+        if size > max_payload_size:
+            continue
+        payload = b"\x00\x01\x02\x03" * (size // 4)
+        encoded = encoder.from_bytes_to_base64_string(payload)
+        label = f"{size // MB}MB" if size >= MB else f"{size // KB}KB"
+        benchmarks[f"base64.encode.{label}"] = lambda payload=payload: encoder.from_bytes_to_base64_string(payload)
+        benchmarks[f"base64.decode.{label}"] = lambda encoded=encoded: encoder.from_base64_string_to_bytes(encoded)
+        benchmarks[f"base64.decode_hash_write.{label}"] = lambda encoded=encoded: _decode_hash_write(encoder, encoded)
+        benchmarks[f"base64.decode_to_file.{label}"] = lambda encoded=encoded: _decode_to_file(encoder, encoded)
+
+    return benchmarks
+
+
+def _pydantic_benchmarks() -> Dict[str, Callable[[], Any]]:
+    environments = [
+        {"Key": f"env-{i}", "Name": f"Environment {i}", "IsLifeTime": i == 0, "HostName": f"env{i}.example.com"}
+        for i in range(100)
+    ]
+    apply_settings_status = {
+        "Status": "Finished",
+        "Messages": [{"Step": f"step {i}", "Message": "done", "MessageType": "Info"} for i in range(20)],
+    }
+    solution_content = Base64Encoder().from_bytes_to_base64_string(b"s" * 1 * MB)
+
+    return {
+        "pydantic.lifetime_environment_list.100": lambda: parse_obj_as(List[LifetimeEnvironment], environments),
+        "pydantic.apply_settings_status": lambda: ApplySettingsStatusResponse(**apply_settings_status),
+        "pydantic.lifetime_user": lambda: LifetimeUser(
+            userName="username", password="password", name="name", email="email", role="role"
+        ),
+        "pydantic.solution_download_response.1MB": lambda: SolutionDownloadResponse(
+            solutionDownloadOpId=1, file_content=solution_content
+        ),
+    }
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, Nagle would add a delayed-ack stall to every pooled call
+    disable_nagle_algorithm = True
+    body = json.dumps([{"Key": "env-1", "Name": "Development", "IsLifeTime": False, "HostName": "dev"}]).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _rest_benchmarks(server: ThreadingHTTPServer) -> Dict[str, Callable[[], Any]]:
+    url = f"http://127.0.0.1:{server.server_address[1]}/CloudOrchestrationAPI/rest/v1/Infrastructure"
+    session = requests.Session()
+
+    return {
+        "rest.round_trip.unpooled": lambda: requests.get(url).json(),
+        "rest.round_trip.pooled": lambda: session.get(url).json(),
+    }
+
+
+def _stub_registration_benchmark(wiremock_url: str, stubs: int) -> Dict[str, BenchmarkResult]:
+    """One sample per stub, registration is not repeated in a tight loop to keep the server state bounded"""
+
+    samples = []
+
+    with SSL.do_not_verify(), WireMockRun(wiremock_url) as wiremock:
+        run_id = wiremock.run_id
+        for i in range(stubs):
+            start = time.perf_counter()
+            WireMockStubbing.register_soap_mapping(
+                wiremock=wiremock,
+                run_id=run_id,
+                soap_operations_url=soap_stub_templates.USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+                expected_request=soap_stub_templates.USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username=f"{run_id}-{i}"),
+                expected_response=soap_stub_templates.USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive"),
+            )
+            samples.append(time.perf_counter() - start)
+
+    return {
+        "stubs.register_soap_mapping": BenchmarkResult(
+            iterations=len(samples),
+            median=statistics.median(samples),
+            mean=statistics.mean(samples),
+            min=min(samples),
+            stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        )
+    }
+
+
+def _request_matching_benchmarks(
+        wiremock_url: str, stubs: int, min_time: float, repeat: int, name_filter: str = ""
+) -> Dict[str, BenchmarkResult]:
+    """
+    Round trip of a SOAP call that WireMock matches against `stubs` candidate stubs, per body matcher
+
+    The called stub is the first registered, WireMock tries the newest stubs first so every call is
+    compared with all of them: the difference between the matchers is their matching cost.
+    """
+
+    results = {}
+    matchers = {
+        "wiremock.match.equal_to_xml": WireMockStubbing.MATCH_XML,
+        "wiremock.match.xpath": WireMockStubbing.MATCH_XPATH,
+    }
+    matchers = {name: request_matcher for name, request_matcher in matchers.items() if name_filter in name}
+
+    for name, request_matcher in matchers.items():
+        with SSL.do_not_verify(), WireMockRun(wiremock_url) as wiremock, requests.Session() as session:
+            run_id = wiremock.run_id
+            for i in range(stubs):
+                WireMockStubbing.register_soap_mapping(
+                    wiremock=wiremock,
+                    run_id=run_id,
+                    soap_operations_url=soap_stub_templates.USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+                    expected_request=soap_stub_templates.USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username=f"{run_id}-{i}"),
+                    expected_response=soap_stub_templates.USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive"),
+                    request_matcher=request_matcher,
+                )
+
+            url = f"{wiremock_url}{soap_stub_templates.USER_MANAGEMENT_SOAP_OPERATIONS_URL}"
+            body = soap_stub_templates.USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username=f"{run_id}-0").replace(
+                WireMockStubbing.XMLUNIT_IGNORE, "admin"
+            )
+
+            def _call():
+                response = session.post(url, data=body, headers={"Content-Type": "text/xml; charset=utf-8"})
+                response.raise_for_status()
+
+            print(f"Running {name} ...")
+            results[name] = measure(_call, min_time=min_time, repeat=repeat)
+
+    return results
+
+
+def _batch_benchmarks(
+        wiremock_url: str, batch_size: int, min_time: float, repeat: int, name_filter: str = ""
+) -> Dict[str, BenchmarkResult]:
+    """
+    A batch of inactivate_user calls per sample, on threads and on processes, for growing pool sizes
+
+    The pools are created and warmed (suds clients built) before timing, the ops_per_sec of a result is in
+    batches: multiply by the batch size for calls per second.
+    """
+
+    results = {}
+    pool_sizes = sorted({1, 2, 4, os.cpu_count() or 1})
+    names = {
+        (mode, workers): f"batch.{mode}.{workers}_workers"
+        for mode in (THREAD_MODE, PROCESS_MODE)
+        for workers in pool_sizes
+        if name_filter in f"batch.{mode}.{workers}_workers"
+    }
+    if not names:
+        return results
+
+    with SSL.do_not_verify(), WireMockRun(wiremock_url) as wiremock:
+        username = f"{wiremock.run_id}-batch"
+        WireMockStubbing.register_soap_mapping(
+            wiremock=wiremock,
+            run_id=wiremock.run_id,
+            soap_operations_url=soap_stub_templates.USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+            expected_request=soap_stub_templates.USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username=username),
+            expected_response=soap_stub_templates.USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive"),
+        )
+        call = BatchCall(
+            LIFETIME,
+            "inactivate_user",
+            {
+                "domain": urlparse(wiremock_url).netloc,
+                "authentication": LifetimeCredentials(username="admin_username", password="admin_password"),
+                "request": InactivateLifetimeUserRequest(tenant_id="batch", username=username),
+            },
+        )
+        calls = [call] * batch_size
+
+        for (mode, workers), name in names.items():
+            print(f"Running {name} ...")
+            with BatchExecutor(mode=mode, workers=workers) as executor:
+                executor.run(calls)
+                results[name] = measure(lambda: executor.run(calls), min_time=min_time, repeat=repeat)
+
+    return results
+
+
+COLD_START_SCRIPT = """
+import json, sys, time
+
+start = time.perf_counter()
+from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
+imported = time.perf_counter()
+
+timings = {"import": imported - start}
+if len(sys.argv) > 1:
+    import no_ssl_verification as SSL
+
+    with SSL.do_not_verify():
+        start = time.perf_counter()
+        PlatformServiceCenterFacade().get_platform_info(domain=sys.argv[1])
+        timings["first_call"] = time.perf_counter() - start
+
+print(json.dumps(timings))
+"""
+
+
+def _cold_start_benchmarks(wiremock_url: str, repeat: int, name_filter: str = "") -> Dict[str, BenchmarkResult]:
+    """
+    Import time of the facades and, with a WireMock, their first call (get_platform_info) in a new interpreter
+
+    Every sample is a fresh process, timed from inside: the interpreter startup is left out. Every sample is cold,
+    the first call downloads and parses the WSDL: the parsed WSDLs are only kept in the memory of a process.
+    """
+
+    first_call = wiremock_url and name_filter in "cold_start.first_call"
+    if not first_call and name_filter not in "cold_start.import":
+        return {}
+    print("Running cold_start ...")
+
+    with contextlib.ExitStack() as stack:
+        command = [sys.executable, "-c", COLD_START_SCRIPT]
+        if first_call:
+            stack.enter_context(SSL.do_not_verify())
+            wiremock = stack.enter_context(WireMockRun(wiremock_url))
+            WireMockStubbing.register_soap_mapping(
+                wiremock=wiremock,
+                run_id=wiremock.run_id,
+                soap_operations_url=soap_stub_templates.PLATFORM_API_SOAP_OPERATIONS_URL,
+                expected_request=soap_stub_templates.GET_PLATFORM_INFO_REQUEST,
+                expected_response=soap_stub_templates.GET_PLATFORM_INFO_RESPONSE,
+            )
+            command.append(urlparse(wiremock_url).netloc)
+
+        samples: Dict[str, List[float]] = {}
+        for _ in range(repeat):
+            output = subprocess.run(
+                command, check=True, capture_output=True, text=True, cwd=pathlib.Path(__file__).resolve().parent
+            ).stdout
+            for name, elapsed in json.loads(output.splitlines()[-1]).items():
+                samples.setdefault(f"cold_start.{name}", []).append(elapsed)
+
+    return {
+        name: _result(timings, iterations=len(timings)) for name, timings in samples.items() if name_filter in name
+    }
+
+
+def run_benchmarks(
+        name_filter: str = "",
+        max_payload_size: int = DEFAULT_MAX_PAYLOAD_SIZE,
+        wiremock_url: str = None,
+        min_time: float = DEFAULT_MIN_TIME_SECONDS,
+        repeat: int = DEFAULT_REPEAT,
+) -> Dict[str, Any]:
+    """
+    Runs the benchmarks whose name contains name_filter
+
+    Args:
+        name_filter (str): Substring of the benchmark names to run, empty for all
+        max_payload_size (int): The largest base64 payload to benchmark, in bytes
+        wiremock_url (str, optional): The WireMock base url, the benchmarks needing a WireMock are skipped without it
+        min_time (float): The minimum duration of a sample, in seconds
+        repeat (int): The number of samples per benchmark
+
+    Returns:
+        Dict[str, Any]: The results document, see save_results
+    """
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _JsonHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        benchmarks = {}
+        benchmarks.update(_soap_client_benchmarks())
+        benchmarks.update(_soap_envelope_benchmarks())
+        benchmarks.update(_base64_benchmarks(max_payload_size))
+        benchmarks.update(_pydantic_benchmarks())
+        benchmarks.update(_rest_benchmarks(server))
+
+        results = {}
+        for name, func in benchmarks.items():
+            if name_filter not in name:
+                continue
+            print(f"Running {name} ...")
+            results[name] = measure(func, min_time=min_time, repeat=repeat)
+
+        # the groups below produce several results, they run those whose name contains the filter
+        results.update(_cold_start_benchmarks(wiremock_url, repeat, name_filter))
+
+        if wiremock_url and name_filter in "stubs.register_soap_mapping":
+            print("Running stubs.register_soap_mapping ...")
+            results.update(_stub_registration_benchmark(wiremock_url, DEFAULT_STUBS_TO_REGISTER))
+
+        if wiremock_url:
+            results.update(
+                _request_matching_benchmarks(wiremock_url, DEFAULT_STUBS_TO_MATCH, min_time, repeat, name_filter)
+            )
+            results.update(_batch_benchmarks(wiremock_url, DEFAULT_BATCH_SIZE, min_time, repeat, name_filter))
+    finally:
+        server.shutdown()
+
+    return {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+        "benchmarks": {name: result.to_dict() for name, result in results.items()},
+    }
+
+
+def save_results(results: Dict[str, Any], output: str):
+    pathlib.Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        results = json.load(f)
+
+    if results.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path} has format version {results.get('format_version')}, expected {FORMAT_VERSION}")
+
+    return results
+
+
+def compare_results(
+        baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD_PERCENT
+) -> List[str]:
+    """
+    Compares the median time per call of the benchmarks present in both documents
+
+    Args:
+        baseline (Dict[str, Any]): The stored baseline results
+        current (Dict[str, Any]): The new results
+        threshold (float): The slowdown, in percent, above which a benchmark is flagged
+
+    Returns:
+        List[str]: The names of the benchmarks that regressed
+    """
+
+    regressions = []
+    base_benchmarks = baseline["benchmarks"]
+    current_benchmarks = current["benchmarks"]
+
+    print(f"{'benchmark':<52}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name in sorted(set(base_benchmarks) | set(current_benchmarks)):
+        if name not in current_benchmarks:
+            print(f"{name:<52}{'':>14}{'missing':>14}")
+            continue
+        if name not in base_benchmarks:
+            print(f"{name:<52}{'new':>14}{current_benchmarks[name]['median_s']:>14.3e}")
+            continue
+
+        base_time = base_benchmarks[name]["median_s"]
+        current_time = current_benchmarks[name]["median_s"]
+        change = (current_time - base_time) / base_time * 100.0 if base_time else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+
+        print(f"{name:<52}{base_time:>14.3e}{current_time:>14.3e}{change:>9.1f}%{flag}")
+
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the client hot paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--output", default=DEFAULT_OUTPUT, help="path of the JSON results file")
+    run.add_argument("--filter", default="", help="only run the benchmarks whose name contains this")
+    run.add_argument("--max-payload-size", type=int, default=DEFAULT_MAX_PAYLOAD_SIZE, help="in bytes")
+    run.add_argument("--wiremock-url", default=None, help="WireMock base url for the stub registration benchmark")
+    run.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME_SECONDS)
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+
+    compare = commands.add_parser("compare", help="flag the regressions against a baseline")
+    compare.add_argument("baseline", help="the stored baseline results")
+    compare.add_argument("current", help="the results to check")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT, help="in percent")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(
+            name_filter=args.filter,
+            max_payload_size=args.max_payload_size,
+            wiremock_url=args.wiremock_url,
+            min_time=args.min_time,
+            repeat=args.repeat,
+        )
+        save_results(results, args.output)
+        return 0
+
+    regressions = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.threshold}%")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, NamedTuple
+
+import pytest
+
+from platform_api.facades.protocol_wrappers.resilience import DEFAULT_RESILIENCE_POLICY
+
+# loads the plugin when the project is not pip installed, a no-op otherwise (same name as the entry point)
+pytest_plugins = ["wiremock_pytest_plugin"]
+
+
+@pytest.fixture(autouse=True)
+def _closed_circuit_breakers():
+    """
+    Every test starts with closed breakers in the default resilience policy
+
+    The facades of the scenario tests share it and call the same WireMock domain: the 500 responses stubbed by one
+    test would otherwise open the circuit for the tests running after it.
+    """
+
+    DEFAULT_RESILIENCE_POLICY.reset()
+
+
+class RecordedRequest(NamedTuple):
+    method: str
+    path: str
+    headers: dict
+    body: bytes
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    """Answers every admin call with an empty JSON object, recording the requests with their raw bodies"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                chunk = self.rfile.read(size + 2)[:size]
+                if not size:
+                    return body
+                body += chunk
+
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _record(self):
+        self.server.requests.append(
+            RecordedRequest(self.command, self.path, dict(self.headers.items()), self._read_body())
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_GET = do_POST = do_PUT = do_DELETE = _record
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def recording_server():
+    """A local HTTP server standing in for the WireMock admin API, server.requests holds what it received"""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    server.requests: List[RecordedRequest] = []
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
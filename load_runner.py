@@ -0,0 +1,532 @@
+"""
+Load generation against WireMock (or any stub server answering the same endpoints)
+
+Drives a weighted mix of facade operations for a fixed duration, either closed loop (a fixed number
+of workers calling back to back) or open loop (a target rate of calls per second), and reports the
+latency percentiles, the throughput and the errors per operation.
+
+    python load_runner.py --duration 30 --concurrency 8 --mix create_or_update_user=3,get_platform_info=1
+    python load_runner.py --duration 60 --rate 50 --output results/run.json
+    python load_runner.py --background-stubs 3000 --mix inactivate_user,get_platform_info
+    python load_runner.py --run-id load-1 --keep-stubs --duration 0 && python load_runner.py --run-id load-1 --skip-stubs
+"""
+import argparse
+import json
+import math
+import pathlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import no_ssl_verification as SSL
+import stubbing_utils as WireMockStubbing
+from platform_api.base64_encoder import Base64Encoder
+from platform_api.facades.base_model import GenericError
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.lifetime_model import (
+    InactivateLifetimeUserRequest,
+    LifetimeChangeUserPassword,
+    LifetimeCredentials,
+    LifetimeUser,
+)
+from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
+from platform_api.facades.platform_service_center_model import ServiceCenterCredentials
+from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import COA_INFRASTRUCTURE
+from soap_stub_templates import (
+    USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+    PLATFORM_API_SOAP_OPERATIONS_URL,
+    PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL,
+    USER_CREATE_OR_UPDATE_REQUEST_TEMPLATE,
+    USER_CREATE_OR_UPDATE_RESPONSE,
+    USER_CHANGE_PASSWORD_REQUEST_TEMPLATE,
+    USER_SET_INACTIVE_REQUEST_TEMPLATE,
+    USER_STATUS_RESPONSE_TEMPLATE,
+    GET_PLATFORM_INFO_REQUEST,
+    GET_PLATFORM_INFO_RESPONSE,
+    CREATE_ALL_SOLUTION_REQUEST_TEMPLATE,
+    CREATE_ALL_SOLUTION_RESPONSE,
+    SOLUTION_DOWNLOAD_REQUEST_TEMPLATE,
+    SOLUTION_DOWNLOAD_RESPONSE_TEMPLATE,
+    GET_INFRASTRUCTURE_RESPONSE,
+)
+from wiremock_pool import ShardStats, WireMockPool, print_stats
+from wiremock_service import WireMockRun, WireMockService, WIREMOCK_DEFAULT_URL
+
+DEFAULT_DOMAIN = "localhost:8433"
+DEFAULT_DURATION_SECONDS = 30
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SOLUTION_FILE_SIZE = 1024
+
+LOAD_PASSWORD = "load_password"
+LOAD_SOLUTION_NAME = "load_solution"
+LOAD_SOLUTION_VERSION_ID = 1000
+
+
+class LoadContext(NamedTuple):
+    """What an operation needs to build its stubs and its calls"""
+
+    run_id: str
+    domain: str
+    solution_file_size: int
+
+    @property
+    def username(self) -> str:
+        return f"{self.run_id}-load"
+
+    @property
+    def solution_name(self) -> str:
+        return f"{self.run_id}-{LOAD_SOLUTION_NAME}"
+
+
+class LoadOperation(NamedTuple):
+    """A facade operation the runner can drive"""
+
+    register_stubs: Callable[[WireMockService, LoadContext], None]
+    call: Callable[[LifetimeFacade, PlatformServiceCenterFacade, LoadContext], Any]
+
+
+def _register_create_or_update_user(wiremock: WireMockService, context: LoadContext):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        soap_operations_url=USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+        expected_request=USER_CREATE_OR_UPDATE_REQUEST_TEMPLATE.format(username=context.username),
+        expected_response=USER_CREATE_OR_UPDATE_RESPONSE,
+    )
+
+
+def _call_create_or_update_user(lifetime: LifetimeFacade, _, context: LoadContext):
+    return lifetime.create_or_update_user(
+        domain=context.domain,
+        authentication=LifetimeCredentials(username="admin_username", password=LOAD_PASSWORD),
+        user=LifetimeUser(
+            username=context.username, password=LOAD_PASSWORD, name="name", email="email", role="role_name"
+        ),
+    )
+
+
+def _register_change_user_password(wiremock: WireMockService, context: LoadContext):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        soap_operations_url=USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+        expected_request=USER_CHANGE_PASSWORD_REQUEST_TEMPLATE.format(username=context.username),
+        expected_response=USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_ChangePassword"),
+    )
+
+
+def _call_change_user_password(lifetime: LifetimeFacade, _, context: LoadContext):
+    return lifetime.change_user_password(
+        domain=context.domain,
+        authentication=LifetimeCredentials(username="admin_username", password=LOAD_PASSWORD),
+        user=LifetimeChangeUserPassword(tenant_id="load", username=context.username, new_password=LOAD_PASSWORD),
+    )
+
+
+def _register_inactivate_user(wiremock: WireMockService, context: LoadContext):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        soap_operations_url=USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+        expected_request=USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username=context.username),
+        expected_response=USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive"),
+    )
+
+
+def _call_inactivate_user(lifetime: LifetimeFacade, _, context: LoadContext):
+    return lifetime.inactivate_user(
+        domain=context.domain,
+        authentication=LifetimeCredentials(username="admin_username", password=LOAD_PASSWORD),
+        request=InactivateLifetimeUserRequest(tenant_id="load", username=context.username),
+    )
+
+
+def _register_get_infrastructure(wiremock: WireMockService, context: LoadContext):
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username=context.username,
+        password=LOAD_PASSWORD,
+        expected_response=GET_INFRASTRUCTURE_RESPONSE,
+    )
+
+
+def _call_get_infrastructure(lifetime: LifetimeFacade, _, context: LoadContext):
+    return lifetime.get_infrastructure(
+        domain=context.domain,
+        authentication=LifetimeCredentials(username=context.username, password=LOAD_PASSWORD),
+    )
+
+
+def _register_get_platform_info(wiremock: WireMockService, context: LoadContext):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        soap_operations_url=PLATFORM_API_SOAP_OPERATIONS_URL,
+        expected_request=GET_PLATFORM_INFO_REQUEST,
+        expected_response=GET_PLATFORM_INFO_RESPONSE,
+    )
+
+
+def _call_get_platform_info(_, service_center: PlatformServiceCenterFacade, context: LoadContext):
+    return service_center.get_platform_info(domain=context.domain)
+
+
+def _register_create_all_solution(wiremock: WireMockService, context: LoadContext):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        soap_operations_url=PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL,
+        expected_request=CREATE_ALL_SOLUTION_REQUEST_TEMPLATE.format(solution_name=context.solution_name),
+        expected_response=CREATE_ALL_SOLUTION_RESPONSE,
+    )
+
+
+def _call_create_all_solution(_, service_center: PlatformServiceCenterFacade, context: LoadContext):
+    return service_center.create_all_solution(
+        domain=context.domain,
+        authentication=ServiceCenterCredentials(username="admin_username", password=LOAD_PASSWORD),
+        all_solution_name=context.solution_name,
+    )
+
+
+def _register_solution_download(wiremock: WireMockService, context: LoadContext):
+    file_content = Base64Encoder().from_bytes_to_base64_string(b"x" * context.solution_file_size)
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=context.run_id,
+        soap_operations_url=PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL,
+        expected_request=SOLUTION_DOWNLOAD_REQUEST_TEMPLATE.format(
+            solution_name=context.solution_name, solution_version_id=LOAD_SOLUTION_VERSION_ID
+        ),
+        expected_response=SOLUTION_DOWNLOAD_RESPONSE_TEMPLATE.format(file_content=file_content),
+    )
+
+
+def _call_solution_download(_, service_center: PlatformServiceCenterFacade, context: LoadContext):
+    return service_center.solution_download(
+        domain=context.domain,
+        authentication=ServiceCenterCredentials(username="admin_username", password=LOAD_PASSWORD),
+        solution_name=context.solution_name,
+        solution_version_id=LOAD_SOLUTION_VERSION_ID,
+    )
+
+
+OPERATIONS: Dict[str, LoadOperation] = {
+    "create_or_update_user": LoadOperation(_register_create_or_update_user, _call_create_or_update_user),
+    "change_user_password": LoadOperation(_register_change_user_password, _call_change_user_password),
+    "inactivate_user": LoadOperation(_register_inactivate_user, _call_inactivate_user),
+    "get_infrastructure": LoadOperation(_register_get_infrastructure, _call_get_infrastructure),
+    "get_platform_info": LoadOperation(_register_get_platform_info, _call_get_platform_info),
+    "create_all_solution": LoadOperation(_register_create_all_solution, _call_create_all_solution),
+    "solution_download": LoadOperation(_register_solution_download, _call_solution_download),
+}
+
+
+# (request template, response) of the background stubs
+BACKGROUND_STUB_TEMPLATES = (
+    (USER_CREATE_OR_UPDATE_REQUEST_TEMPLATE, USER_CREATE_OR_UPDATE_RESPONSE),
+    (USER_CHANGE_PASSWORD_REQUEST_TEMPLATE, USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_ChangePassword")),
+    (USER_SET_INACTIVE_REQUEST_TEMPLATE, USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive")),
+)
+
+
+def register_background_stubs(wiremock: WireMockService, context: LoadContext, count: int):
+    """
+    Registers user management stubs no call matches, spread over the operations of the endpoint
+
+    They stand for the stubs of the other tests sharing the WireMock: every call on the endpoint is compared with
+    all of them.
+    """
+
+    for index in range(count):
+        request_template, response = BACKGROUND_STUB_TEMPLATES[index % len(BACKGROUND_STUB_TEMPLATES)]
+        WireMockStubbing.register_soap_mapping(
+            wiremock=wiremock,
+            run_id=context.run_id,
+            soap_operations_url=USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+            expected_request=request_template.format(username=f"{context.run_id}-background-{index}"),
+            expected_response=response,
+            )
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parses an operation mix like "create_or_update_user=3,get_platform_info=1"
+
+    A name without weight counts as 1. An empty mix means every operation with the same weight.
+    """
+
+    if not mix:
+        return {name: 1.0 for name in OPERATIONS}
+
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name}, expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight) if weight else 1.0
+
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+
+    if not sorted_values:
+        return 0.0
+
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+
+    return sorted_values[rank]
+
+
+def _error_key(error: Exception) -> str:
+    if isinstance(error, GenericError):
+        return f"{type(error).__name__}:{int(error.http_status_code)}"
+
+    return type(error).__name__
+
+
+class LoadRecorder:
+    """Collects latencies and errors from the worker threads"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = {}
+        self._errors: Dict[str, Dict[str, int]] = {}
+
+    def record(self, operation: str, latency_ms: float, error: Exception = None):
+        with self._lock:
+            self._latencies.setdefault(operation, []).append(latency_ms)
+            if error is not None:
+                errors = self._errors.setdefault(operation, {})
+                key = _error_key(error)
+                errors[key] = errors.get(key, 0) + 1
+
+    def summary(self, elapsed_seconds: float) -> Dict[str, Any]:
+        """Latency percentiles (ms), throughput (calls/s) and error breakdown per operation and in total"""
+
+        with self._lock:
+            latencies = {name: sorted(values) for name, values in self._latencies.items()}
+            errors = {name: dict(values) for name, values in self._errors.items()}
+
+        def _stats(values: List[float], error_breakdown: Dict[str, int]) -> Dict[str, Any]:
+            return {
+                "count": len(values),
+                "errors": sum(error_breakdown.values()),
+                "throughput": len(values) / elapsed_seconds if elapsed_seconds else 0.0,
+                "latency_ms": {
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99),
+                    "max": values[-1] if values else 0.0,
+                    "mean": sum(values) / len(values) if values else 0.0,
+                },
+                "error_breakdown": error_breakdown,
+            }
+
+        total_errors: Dict[str, int] = {}
+        for breakdown in errors.values():
+            for key, count in breakdown.items():
+                total_errors[key] = total_errors.get(key, 0) + count
+
+        return {
+            "operations": {name: _stats(values, errors.get(name, {})) for name, values in latencies.items()},
+            "total": _stats(sorted(v for values in latencies.values() for v in values), total_errors),
+        }
+
+
+class _Worker(threading.local):
+    """One pair of facades per thread, the suds clients are not thread safe"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lifetime = LifetimeFacade()
+        self.service_center = PlatformServiceCenterFacade()
+
+
+def run_load(
+        operations: Dict[str, float],
+        duration: float = DEFAULT_DURATION_SECONDS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = None,
+        domain: str = DEFAULT_DOMAIN,
+        wiremock_url: str = WIREMOCK_DEFAULT_URL,
+        register_stubs: bool = True,
+        solution_file_size: int = DEFAULT_SOLUTION_FILE_SIZE,
+        pool: WireMockPool = None,
+        background_stubs: int = 0,
+        run_id: str = None,
+        keep_stubs: bool = False,
+) -> Dict[str, Any]:
+    """
+    Runs the load and returns the results
+
+    Args:
+        operations (Dict[str, float]): The operation mix, name -> weight
+        duration (float): How long to generate load, in seconds
+        concurrency (int): The number of worker threads
+        rate (float, optional): Calls per second (open loop). None to call back to back (closed loop).
+        domain (str): The host domain the facades call
+        wiremock_url (str): The WireMock admin base url, used to register and delete the stubs
+        register_stubs (bool): False when the server already has the stubs of run_id
+        solution_file_size (int): The size in bytes of the solution served by solution_download
+        pool (WireMockPool, optional): Run against the shard of the run id, instead of domain and wiremock_url
+        background_stubs (int): The number of extra user management stubs no call matches
+        run_id (str, optional): The run id the stubs are keyed on, a new one by default. Give the run id of a run
+            with keep_stubs to call its stubs without registering them again.
+        keep_stubs (bool): Leave the stubs registered by the run in the WireMock
+
+    Returns:
+        Dict[str, Any]: The run settings and the summary of the recorded calls
+    """
+
+    run_id = run_id or WireMockStubbing.new_run_id()
+    if pool is not None:
+        wiremock_url, domain = pool.url_for(run_id), pool.domain_for(run_id)
+
+    context = LoadContext(run_id=run_id, domain=domain, solution_file_size=solution_file_size)
+    wiremock = WireMockRun(wiremock_url, run_id=context.run_id)
+    names = list(operations)
+    weights = [operations[name] for name in names]
+    recorder = LoadRecorder()
+    worker = _Worker()
+
+    def _call(name: str, scheduled_at: float):
+        # latency is measured from the scheduled time so queueing delay is not hidden (coordinated omission)
+        error = None
+        try:
+            OPERATIONS[name].call(worker.lifetime, worker.service_center, context)
+        except Exception as e:
+            error = e
+        recorder.record(name, (time.perf_counter() - scheduled_at) * 1000.0, error)
+
+    with SSL.do_not_verify():
+        if register_stubs:
+            for name in names:
+                OPERATIONS[name].register_stubs(wiremock, context)
+            register_background_stubs(wiremock, context, background_stubs)
+
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        end = start + duration
+
+        try:
+            if rate:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    sent = 0
+                    while True:
+                        scheduled_at = start + sent / rate
+                        if scheduled_at >= end:
+                            break
+                        delay = scheduled_at - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                        executor.submit(_call, random.choices(names, weights)[0], scheduled_at)
+                        sent += 1
+            else:
+                def _loop():
+                    while time.perf_counter() < end:
+                        _call(random.choices(names, weights)[0], time.perf_counter())
+
+                threads = [threading.Thread(target=_loop, daemon=True) for _ in range(concurrency)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            elapsed = time.perf_counter() - start
+        finally:
+            if not keep_stubs:
+                wiremock.close()
+
+    return {
+        "run_id": context.run_id,
+        "started_at": started_at,
+        "elapsed_seconds": elapsed,
+        "settings": {
+            "duration": duration,
+            "concurrency": concurrency,
+            "rate": rate,
+            "domain": domain,
+            "mix": operations,
+            "solution_file_size": solution_file_size,
+            "background_stubs": background_stubs,
+        },
+        **recorder.summary(elapsed),
+        **({"shards": [shard._asdict() for shard in pool.stats()]} if pool is not None else {}),
+    }
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"Run {results['run_id']} - {results['elapsed_seconds']:.1f}s")
+    print(f"{'operation':<24}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+    rows = list(results["operations"].items()) + [("TOTAL", results["total"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<24}{stats['count']:>8}{stats['errors']:>8}{stats['throughput']:>10.1f}"
+            f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+        )
+        for error, count in stats["error_breakdown"].items():
+            print(f"    {error}: {count}")
+
+    if "shards" in results:
+        print_stats([ShardStats(**shard) for shard in results["shards"]])
+
+
+def save_results(results: Dict[str, Any], output: str):
+    pathlib.Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Drives facade operations against WireMock")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_SECONDS, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="number of workers")
+    parser.add_argument("--rate", type=float, default=None, help="calls per second, omit for back to back calls")
+    parser.add_argument("--mix", default="", help="e.g. create_or_update_user=3,get_platform_info=1")
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN, help="host domain called by the facades")
+    parser.add_argument("--wiremock-url", default=WIREMOCK_DEFAULT_URL, help="WireMock base url")
+    parser.add_argument("--pool-urls", default="", help="comma separated WireMock pool, overrides the domain")
+    parser.add_argument("--run-id", default=None, help="the run id the stubs are keyed on, a new one by default")
+    parser.add_argument("--skip-stubs", action="store_true", help="call the stubs of --run-id, do not register them")
+    parser.add_argument("--keep-stubs", action="store_true", help="leave the stubs in the WireMock after the run")
+    parser.add_argument("--solution-file-size", type=int, default=DEFAULT_SOLUTION_FILE_SIZE)
+    parser.add_argument("--background-stubs", type=int, default=0, help="extra stubs on the user management endpoint")
+    parser.add_argument("--output", default=None, help="path of the JSON results file")
+    args = parser.parse_args(argv)
+    if args.skip_stubs and not args.run_id:
+        parser.error("--skip-stubs needs the --run-id of a run that kept its stubs (--keep-stubs)")
+
+    results = run_load(
+        operations=parse_mix(args.mix),
+        duration=args.duration,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        domain=args.domain,
+        wiremock_url=args.wiremock_url,
+        register_stubs=not args.skip_stubs,
+        solution_file_size=args.solution_file_size,
+        pool=WireMockPool(args.pool_urls.split(",")) if args.pool_urls else None,
+        background_stubs=args.background_stubs,
+        run_id=args.run_id,
+        keep_stubs=args.keep_stubs,
+    )
+
+    print_report(results)
+    if args.output:
+        save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
 import base64
+import hashlib
+import string
+from typing import BinaryIO, Tuple
+
+# base64 characters read per chunk by decode_to_file, a multiple of 4
+DECODE_CHUNK_SIZE = 4 * 1024 * 1024
+
+# b64decode discards the characters outside the alphabet (line breaks...), so does decode_to_file
+_NOT_BASE64 = bytes(set(range(256)) - set((string.ascii_letters + string.digits + "+/=").encode("ascii")))
 
 
 class Base64Encoder:
@@ -71,6 +80,44 @@ class Base64Encoder:
         """
         return base64.b64decode(base64_string)
 
+    def decode_to_file(self, base64_string: str, file: BinaryIO) -> Tuple[str, int]:
+        """
+        Decodes a base 64 string into a binary file, a chunk at a time, hashing the bytes as they are written
+
+        Only one chunk of the decoded bytes is in memory at any time.
+
+        Args:
+            base64_string (str): the base 64 string
+            file (BinaryIO): the file the decoded bytes are written to
+
+        Raises:
+            binascii.Error: if the string is not valid base 64
+
+        Returns:
+            Tuple[str, int]: the sha256 hex digest and the size of the decoded bytes
+
+        """
+        digest = hashlib.sha256()
+        size = 0
+        pending = b""
+
+        for start in range(0, len(base64_string), DECODE_CHUNK_SIZE):
+            chunk = pending + base64_string[start:start + DECODE_CHUNK_SIZE].encode("ascii", "ignore").translate(
+                None, _NOT_BASE64
+            )
+            complete = len(chunk) - len(chunk) % 4
+            pending = chunk[complete:]
+            decoded = base64.b64decode(chunk[:complete])
+            digest.update(decoded)
+            file.write(decoded)
+            size += len(decoded)
+
+        if pending:
+            # an unpadded tail, b64decode raises like it does for the whole string
+            base64.b64decode(pending)
+
+        return digest.hexdigest(), size
+
     def from_string_to_bytes(self, _string: str) -> bytes:
         """
         A helper to encode a string to bytes using the very same encoding of the service
@@ -0,0 +1,154 @@
+"""
+Runs batches of facade calls on a pool of threads or of worker processes
+
+suds spends most of a call building and parsing envelopes while holding the GIL, so a thread pool stops
+scaling after a few workers. In process mode every worker process keeps its own facades, and with them its
+own warmed suds clients, for its whole life: only the call records and their results cross the process
+boundary.
+
+    calls = [BatchCall(LIFETIME, "inactivate_user", {"domain": domain, "authentication": auth, "request": r}) ...]
+    with BatchExecutor(mode=PROCESS_MODE, workers=8) as executor:
+        for result in executor.run(calls):
+            ...
+"""
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
+from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
+
+LIFETIME = "lifetime"
+SERVICE_CENTER = "service_center"
+
+THREAD_MODE = "thread"
+PROCESS_MODE = "process"
+
+# calls sent to a worker process per round trip, per worker: fewer round trips, still an even spread
+CHUNKS_PER_WORKER = 4
+
+
+class BatchCall(NamedTuple):
+    """A facade method call: the facade (LIFETIME or SERVICE_CENTER), the method name and its keyword arguments"""
+
+    facade: str
+    operation: str
+    arguments: Dict[str, Any]
+
+
+class BatchResult(NamedTuple):
+    """The return value of a call, or the error it raised (a GenericError, or any other exception)"""
+
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _create_facades(resilience_policy: Optional[ResiliencePolicy]) -> Dict[str, Any]:
+    return {
+        LIFETIME: LifetimeFacade(resilience_policy=resilience_policy),
+        SERVICE_CENTER: PlatformServiceCenterFacade(resilience_policy=resilience_policy),
+    }
+
+
+def _call(facades: Dict[str, Any], call: BatchCall) -> BatchResult:
+    try:
+        return BatchResult(value=getattr(facades[call.facade], call.operation)(**call.arguments))
+    except Exception as e:
+        return BatchResult(error=e)
+
+
+# the facades of a worker process, created once by the pool initializer
+_process_facades: Dict[str, Any] = {}
+
+
+def _init_process(resilience_policy: Optional[ResiliencePolicy]):
+    _process_facades.update(_create_facades(resilience_policy))
+
+
+def _call_in_process(call: BatchCall) -> BatchResult:
+    return _call(_process_facades, call)
+
+
+class BatchExecutor:
+    """
+    A pool running facade calls, in threads (THREAD_MODE) or in worker processes (PROCESS_MODE)
+
+    Every thread or process has its own facades, the suds clients are not thread safe. In process mode the
+    resilience policy is copied to each worker with fresh circuit breakers, so a breaker only sees the calls
+    of its own process.
+    """
+
+    def __init__(
+            self, mode: str = THREAD_MODE, workers: int = None, resilience_policy: ResiliencePolicy = None
+    ) -> None:
+        """
+        Args:
+            mode (str): THREAD_MODE or PROCESS_MODE
+            workers (int, optional): The pool size. Defaults to the number of CPUs.
+            resilience_policy (ResiliencePolicy, optional): The policy of the facades
+
+        Raises:
+            ValueError: if the mode is unknown
+        """
+
+        super().__init__()
+        self._workers = workers or os.cpu_count() or 1
+        self._mode = mode
+
+        if mode == THREAD_MODE:
+            local = threading.local()
+
+            def _call_in_thread(call: BatchCall) -> BatchResult:
+                if not hasattr(local, "facades"):
+                    local.facades = _create_facades(resilience_policy)
+                return _call(local.facades, call)
+
+            self._executor: Executor = ThreadPoolExecutor(max_workers=self._workers)
+            self._function = _call_in_thread
+        elif mode == PROCESS_MODE:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers, initializer=_init_process, initargs=(resilience_policy,)
+            )
+            self._function = _call_in_process
+        else:
+            raise ValueError(f"Unknown batch mode {mode}, expected {THREAD_MODE} or {PROCESS_MODE}")
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def run(self, calls: List[BatchCall]) -> List[BatchResult]:
+        """
+        Runs the calls and waits for all of them
+
+        Args:
+            calls (List[BatchCall]): The calls, their arguments must be picklable in process mode
+
+        Returns:
+            List[BatchResult]: the results, in the order of the calls
+        """
+
+        chunksize = 1
+        if self._mode == PROCESS_MODE:
+            chunksize = max(1, len(calls) // (self._workers * CHUNKS_PER_WORKER))
+
+        return list(self._executor.map(self._function, calls, chunksize=chunksize))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "BatchExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,211 @@
+"""
+Runs one facade operation against many domains in parallel, streaming the result of each call as it finishes
+
+    calls = [(domain, {"authentication": credentials, "b64_license": license}) for domain in domains]
+    with FanOut(SERVICE_CENTER, concurrency=32, per_domain_limit=2) as fan_out:
+        for result in fan_out.run("set_license", calls):
+            print(result.domain, result.value if result.ok else result.error, fan_out.stats().completed)
+
+At most `concurrency` calls run at once, and at most `per_domain_limit` of them against the same domain, so a
+domain with many calls neither holds every thread nor gets more connections than it should serve. The calls of
+the domains are started in turn, in the order the domains first appear.
+"""
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from platform_api.facades.batch_executor import LIFETIME, SERVICE_CENTER
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
+from platform_api.facades.protocol_wrappers.http_transport import HttpTransport
+from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_DOMAIN_LIMIT = 2
+
+FACADE_CLASSES = {LIFETIME: LifetimeFacade, SERVICE_CENTER: PlatformServiceCenterFacade}
+
+
+class DomainResult(NamedTuple):
+    """
+    The return value of the call to a domain, or the error it raised, and its duration in seconds
+
+    The error is usually a GenericError, but anything raised by the call ends up here, e.g. the TypeError of bad
+    arguments, so the other calls keep streaming.
+    """
+
+    domain: str
+    value: Any
+    error: Optional[Exception]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanOutStats(NamedTuple):
+    """The progress of a run and the latencies of its finished calls, in seconds"""
+
+    total: int
+    completed: int
+    failed: int
+    in_flight: int
+    elapsed: float
+    latency_median: float
+    latency_p95: float
+    latency_max: float
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.completed - self.in_flight
+
+
+class FanOut:
+    """
+    A thread pool calling a facade operation on many domains
+
+    Every thread has its own facade, the suds clients are not thread safe. The facades share the resilience
+    policy, so the circuit breaker of a domain sees all its calls, and the transport.
+    """
+
+    def __init__(
+            self,
+            facade: str = SERVICE_CENTER,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            per_domain_limit: int = DEFAULT_PER_DOMAIN_LIMIT,
+            resilience_policy: ResiliencePolicy = None,
+            transport: HttpTransport = None,
+    ) -> None:
+        """
+        Args:
+            facade (str): LIFETIME or SERVICE_CENTER
+            concurrency (int): The number of calls running at once
+            per_domain_limit (int): The number of calls running at once against the same domain
+            resilience_policy (ResiliencePolicy, optional): The policy of the facades
+            transport (HttpTransport, optional): The transport of the facades
+
+        Raises:
+            ValueError: if the facade is unknown
+        """
+
+        super().__init__()
+        if facade not in FACADE_CLASSES:
+            raise ValueError(f"Unknown facade {facade}, expected {LIFETIME} or {SERVICE_CENTER}")
+
+        local = threading.local()
+
+        def _facade() -> Any:
+            if not hasattr(local, "facade"):
+                local.facade = FACADE_CLASSES[facade](resilience_policy=resilience_policy, transport=transport)
+            return local.facade
+
+        self._facade = _facade
+        self._concurrency = concurrency
+        self._per_domain_limit = per_domain_limit
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._lock = threading.Lock()
+        self._start_stats(total=0)
+
+    def _start_stats(self, total: int):
+        with self._lock:
+            self._total = total
+            self._failed = 0
+            self._in_flight = 0
+            self._latencies: List[float] = []
+            self._started_at = time.perf_counter()
+
+    def stats(self) -> FanOutStats:
+        """The statistics of the current (or last) run, safe to call from any thread while it runs"""
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return FanOutStats(
+                total=self._total,
+                completed=len(latencies),
+                failed=self._failed,
+                in_flight=self._in_flight,
+                elapsed=time.perf_counter() - self._started_at,
+                latency_median=statistics.median(latencies) if latencies else 0.0,
+                latency_p95=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+                latency_max=latencies[-1] if latencies else 0.0,
+            )
+
+    def _call(self, operation: str, domain: str, arguments: Dict[str, Any]) -> DomainResult:
+        start = time.perf_counter()
+        try:
+            value = getattr(self._facade(), operation)(domain=domain, **arguments)
+        except Exception as e:
+            return DomainResult(domain, None, e, time.perf_counter() - start)
+
+        return DomainResult(domain, value, None, time.perf_counter() - start)
+
+    def run(self, operation: str, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[DomainResult]:
+        """
+        Calls the operation for every (domain, arguments) and yields the results as the calls finish
+
+        Args:
+            operation (str): The facade method name, e.g. get_platform_info
+            calls (Iterable[Tuple[str, Dict[str, Any]]]): The domains and the keyword arguments of their call,
+                besides the domain. A domain may appear several times.
+
+        Returns:
+            Iterator[DomainResult]: the results, in completion order
+        """
+
+        pending: Dict[str, Deque[Dict[str, Any]]] = {}
+        total = 0
+        for domain, arguments in calls:
+            pending.setdefault(domain, deque()).append(arguments or {})
+            total += 1
+        self._start_stats(total)
+
+        in_flight_by_domain: Counter = Counter()
+        running: Dict[Future, str] = {}
+
+        def _start_calls():
+            started = True
+            while started and pending and len(running) < self._concurrency:
+                started = False
+                for domain in list(pending):
+                    if len(running) >= self._concurrency:
+                        break
+                    if in_flight_by_domain[domain] >= self._per_domain_limit:
+                        continue
+
+                    arguments = pending[domain].popleft()
+                    if not pending[domain]:
+                        del pending[domain]
+                    in_flight_by_domain[domain] += 1
+                    running[self._executor.submit(self._call, operation, domain, arguments)] = domain
+                    started = True
+
+            with self._lock:
+                self._in_flight = len(running)
+
+        _start_calls()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            results = []
+            for future in done:
+                in_flight_by_domain[running.pop(future)] -= 1
+                results.append(future.result())
+
+            with self._lock:
+                self._latencies.extend(result.seconds for result in results)
+                self._failed += sum(1 for result in results if not result.ok)
+            _start_calls()
+
+            yield from results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "FanOut":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
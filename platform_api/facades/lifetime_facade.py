@@ -1,4 +1,4 @@
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterable, List
 
 from platform_api.facades.lifetime_model import (
     ApplySettingsStatusResponse,
@@ -9,19 +9,73 @@ from platform_api.facades.lifetime_model import (
     LifetimeEnvironment,
     LifetimeUser,
 )
-from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import (
-    LifeTimeRestWrapperService,
-)
-from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import (
-    LifeTimeSoapWrapperService,
-)
+from platform_api.facades.lifetime_session_tokens import LifetimeSessionTokens
+
+if TYPE_CHECKING:
+    # the wrappers pull in suds and requests, they are imported by the first call needing them
+    from platform_api.facades.protocol_wrappers.http_transport import HttpTransport
+    from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import LifeTimeRestWrapperService
+    from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import LifeTimeSoapWrapperService
+    from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
+    from platform_api.facades.warmup import WarmupResult
 
 
 class LifetimeFacade:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        resilience_policy: "ResiliencePolicy" = None,
+        transport: "HttpTransport" = None,
+        session_tokens: LifetimeSessionTokens = None,
+    ) -> None:
         super().__init__()
-        self._soap_client = LifeTimeSoapWrapperService()
-        self._rest_client = LifeTimeRestWrapperService()
+        self._resilience_policy = resilience_policy
+        self._transport = transport
+        self._session_tokens = session_tokens
+        self.__soap_client = None
+        self.__rest_client = None
+
+    @property
+    def _soap_client(self) -> "LifeTimeSoapWrapperService":
+        if self.__soap_client is None:
+            from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import LifeTimeSoapWrapperService
+
+            self.__soap_client = LifeTimeSoapWrapperService(
+                resilience_policy=self._resilience_policy, session_tokens=self._session_tokens
+            )
+
+        return self.__soap_client
+
+    @property
+    def _rest_client(self) -> "LifeTimeRestWrapperService":
+        if self.__rest_client is None:
+            from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import LifeTimeRestWrapperService
+
+            self.__rest_client = LifeTimeRestWrapperService(
+                resilience_policy=self._resilience_policy, transport=self._transport
+            )
+
+        return self.__rest_client
+
+    def warmup(self, domains: List[str], services: Iterable[str] = None) -> Dict[str, "WarmupResult"]:
+        """
+        Prefetches the WSDLs and opens the connections of the transport of this facade, for every domain
+
+        Args:
+            domains (List[str]): The host domains about to be called
+            services (Iterable[str], optional): See platform_api.facades.warmup. Defaults to LIFETIME_SERVICES.
+
+        Returns:
+            Dict[str, WarmupResult]: the warm-up timings of each domain
+        """
+
+        from platform_api.facades.warmup import LIFETIME_SERVICES, warmup
+
+        return warmup(
+            domains,
+            services=LIFETIME_SERVICES if services is None else services,
+            resilience_policy=self._resilience_policy,
+            transport=self._transport,
+        )
 
     def create_or_update_user(
         self, domain: str, authentication: LifetimeCredentials, user: LifetimeUser, encrypt_password: bool = True
@@ -69,6 +123,16 @@ class LifetimeFacade:
 
         return self._rest_client.get_infrastructure(domain=domain, authentication=authentication)
 
+    def infrastructure_version(self, domain: str, authentication: LifetimeCredentials) -> str:
+
+        return self._rest_client.infrastructure_version(domain=domain, authentication=authentication)
+
+    def infrastructure_changed_since(self, domain: str, authentication: LifetimeCredentials, version: str) -> bool:
+
+        return self._rest_client.infrastructure_changed_since(
+            domain=domain, authentication=authentication, version=version
+        )
+
     def apply_environment_settings(self, domain: str, authentication: LifetimeCredentials, environment_key: str) -> int:
 
         return self._rest_client.apply_environment_settings(
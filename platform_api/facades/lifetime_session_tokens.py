@@ -0,0 +1,113 @@
+"""
+Lifetime session tokens, shared by the Lifetime SOAP calls made with the same credentials
+
+With session tokens the User_* calls send the token acquired from the AuthenticationService instead of the
+username and password, so Lifetime verifies the password once per token rather than on every call.
+
+    tokens = LifetimeSessionTokens()
+    lifetime = LifetimeFacade(session_tokens=tokens)
+"""
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+# Lifetime tokens expire server side, a token is dropped before so calls rarely go out with an expired one
+DEFAULT_TOKEN_TTL_SECONDS = 10 * 60
+
+# the Status.ResponseId of a User_* reply rejecting the session token, see LifetimeSessionTokens
+LIFETIME_INVALID_TOKEN_RESPONSE_IDS = frozenset({9})
+
+
+class SessionToken(NamedTuple):
+    token: str
+    expires_at: float
+
+
+class LifetimeSessionTokens:
+    """
+    The session token of each (domain, username, password), acquired once and reused until it expires
+
+    Thread safe: the threads needing the token of the same credentials wait for a single acquisition. The
+    passwords are only kept hashed, as part of the keys.
+    """
+
+    def __init__(
+            self,
+            ttl: float = DEFAULT_TOKEN_TTL_SECONDS,
+            invalid_token_response_ids: Iterable[int] = LIFETIME_INVALID_TOKEN_RESPONSE_IDS,
+    ) -> None:
+        """
+        Args:
+            ttl (float): The seconds a token is reused for
+            invalid_token_response_ids (Iterable[int]): The Status.ResponseId of the replies rejecting a token, such a
+                call gets a new token and is sent again
+        """
+
+        super().__init__()
+        self._ttl = ttl
+        self._invalid_token_response_ids: FrozenSet[int] = frozenset(invalid_token_response_ids)
+        self._tokens: Dict[Tuple[str, str, str], SessionToken] = {}
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(domain: str, username: str, password: str) -> Tuple[str, str, str]:
+        return domain, username, hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+    def is_invalid_token(self, response_id: int) -> bool:
+        return response_id in self._invalid_token_response_ids
+
+    def get(self, domain: str, username: str, password: str) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: the token of the credentials, None if there is none or it expired
+        """
+
+        session_token = self._tokens.get(self._key(domain, username, password))
+        if session_token is None or session_token.expires_at <= time.monotonic():
+            return None
+
+        return session_token.token
+
+    def token_for(self, domain: str, username: str, password: str, acquire: Callable[[], str]) -> str:
+        """
+        Returns the token of the credentials, calling acquire for a new one if there is none or it expired
+
+        Args:
+            domain (str): The host domain of the Lifetime server
+            username (str): The username
+            password (str): The password
+            acquire (Callable[[], str]): Gets a new token from Lifetime
+
+        Raises:
+            LifetimeError: the error raised by acquire
+
+        Returns:
+            str: the token
+        """
+
+        key = self._key(domain, username, password)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            token = self.get(domain, username, password)
+            if token is None:
+                token = acquire()
+                self._tokens[key] = SessionToken(token, time.monotonic() + self._ttl)
+
+        return token
+
+    def invalidate(self, domain: str, username: str, password: str, token: str):
+        """Drops the token of the credentials, unless another thread already replaced it"""
+
+        key = self._key(domain, username, password)
+        with self._lock:
+            session_token = self._tokens.get(key)
+            if session_token is not None and session_token.token == token:
+                del self._tokens[key]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
@@ -1,3 +1,5 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
 from platform_api.facades.platform_service_center_model import (
     PlatformInfo,
     ServiceCenterChangeUserPassword,
@@ -5,19 +7,71 @@ from platform_api.facades.platform_service_center_model import (
     ServiceCenterUser,
     SolutionDownloadResponse,
 )
-from platform_api.facades.protocol_wrappers.platform_rest_wrapper import (
-    ServiceCenterRestWrapperService,
-)
-from platform_api.facades.protocol_wrappers.platform_soap_wrapper import (
-    ServiceCenterSoapWrapperService,
-)
+from platform_api.facades.solution_cache import CachedSolution, SolutionCache
+
+if TYPE_CHECKING:
+    # the wrappers pull in suds and requests, they are imported by the first call needing them
+    from platform_api.facades.protocol_wrappers.http_transport import HttpTransport
+    from platform_api.facades.protocol_wrappers.platform_rest_wrapper import ServiceCenterRestWrapperService
+    from platform_api.facades.protocol_wrappers.platform_soap_wrapper import ServiceCenterSoapWrapperService
+    from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
+    from platform_api.facades.warmup import WarmupResult
 
 
 class PlatformServiceCenterFacade:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        resilience_policy: "ResiliencePolicy" = None,
+        transport: "HttpTransport" = None,
+        solution_cache: SolutionCache = None,
+    ) -> None:
         super().__init__()
-        self._soap_client = ServiceCenterSoapWrapperService()
-        self._rest_client = ServiceCenterRestWrapperService()
+        self._solution_cache = solution_cache or SolutionCache()
+        self._resilience_policy = resilience_policy
+        self._transport = transport
+        self.__soap_client = None
+        self.__rest_client = None
+
+    @property
+    def _soap_client(self) -> "ServiceCenterSoapWrapperService":
+        if self.__soap_client is None:
+            from platform_api.facades.protocol_wrappers.platform_soap_wrapper import ServiceCenterSoapWrapperService
+
+            self.__soap_client = ServiceCenterSoapWrapperService(resilience_policy=self._resilience_policy)
+
+        return self.__soap_client
+
+    @property
+    def _rest_client(self) -> "ServiceCenterRestWrapperService":
+        if self.__rest_client is None:
+            from platform_api.facades.protocol_wrappers.platform_rest_wrapper import ServiceCenterRestWrapperService
+
+            self.__rest_client = ServiceCenterRestWrapperService(
+                resilience_policy=self._resilience_policy, transport=self._transport
+            )
+
+        return self.__rest_client
+
+    def warmup(self, domains: List[str], services: Iterable[str] = None) -> Dict[str, "WarmupResult"]:
+        """
+        Prefetches the WSDLs and opens the connections of the transport of this facade, for every domain
+
+        Args:
+            domains (List[str]): The host domains about to be called
+            services (Iterable[str], optional): See platform_api.facades.warmup. Defaults to SERVICE_CENTER_SERVICES.
+
+        Returns:
+            Dict[str, WarmupResult]: the warm-up timings of each domain
+        """
+
+        from platform_api.facades.warmup import SERVICE_CENTER_SERVICES, warmup
+
+        return warmup(
+            domains,
+            services=SERVICE_CENTER_SERVICES if services is None else services,
+            resilience_policy=self._resilience_policy,
+            transport=self._transport,
+        )
 
     def get_platform_info(self, domain: str) -> PlatformInfo:
 
@@ -32,7 +86,13 @@ class PlatformServiceCenterFacade:
         )
 
     def solution_download(
-        self, domain: str, authentication: ServiceCenterCredentials, solution_name: str, solution_version_id: int
+        self,
+        domain: str,
+        authentication: ServiceCenterCredentials,
+        solution_name: str,
+        solution_version_id: int,
+        file_backed: bool = False,
+        download_dir: str = None,
     ) -> SolutionDownloadResponse:
 
         return self._soap_client.solution_download(
@@ -40,6 +100,53 @@ class PlatformServiceCenterFacade:
             authentication=authentication,
             solution_name=solution_name,
             solution_version_id=solution_version_id,
+            file_backed=file_backed,
+            download_dir=download_dir,
+        )
+
+    def solution_download_cached(
+        self, domain: str, authentication: ServiceCenterCredentials, solution_name: str, solution_version_id: int
+    ) -> CachedSolution:
+        """
+        Downloads a solution version into the solution cache, unless it is already there
+
+        A cached version is returned without calling Service Center. Version 0 (the current version) is
+        downloaded every time, and still returned as a file of the cache.
+
+        Args:
+            domain (str): The host domain of the Service center server.
+            authentication (ServiceCenterCredentials): The authentication information to call Service Center.
+            solution_name (str): the solution name
+            solution_version_id (int): The solution version identifier
+
+        Raises:
+            ServiceCenterError: If any error occurs while downloading the solution
+
+        Returns:
+            CachedSolution: the decoded solution file, its sha256 and size
+        """
+
+        cached = self._solution_cache.get(domain, solution_name, solution_version_id)
+        if cached is not None:
+            return cached
+
+        response = self.solution_download(
+            domain=domain,
+            authentication=authentication,
+            solution_name=solution_name,
+            solution_version_id=solution_version_id,
+            file_backed=True,
+            download_dir=str(self._solution_cache.incoming_dir),
+        )
+
+        return self._solution_cache.put_file(
+            domain,
+            solution_name,
+            solution_version_id,
+            response.file_path,
+            response.sha256,
+            response.size,
+            response.solution_download_op_id,
         )
 
     def create_user(
@@ -1,5 +1,8 @@
+import base64
+import mmap
+import pathlib
 from http import HTTPStatus
-from typing import Dict
+from typing import Dict, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -80,12 +83,42 @@ class ServiceCenterUser(BaseModel):
 class SolutionDownloadResponse(BaseModel):
     """
     Holds information Solution Download Response from service center
+
+    In file-backed mode the solution is decoded into file_path instead of being kept as base 64 in
+    file_content, and its sha256 and size are computed while decoding.
     """
 
-    file_content: str
+    file_content: str = Field(default="")
     solution_download_op_id: int = Field(alias="solutionDownloadOpId")
+    file_path: Optional[pathlib.Path] = Field(default=None)
+    sha256: str = Field(default="")
+    size: int = Field(default=0)
+
+    @property
+    def is_file_backed(self) -> bool:
+        return self.file_path is not None
+
+    def payload(self) -> Union[bytes, mmap.mmap]:
+        """
+        The decoded solution
+
+        Returns:
+            Union[bytes, mmap.mmap]: a read-only memory map of file_path in file-backed mode, the decoded
+            file_content otherwise
+        """
+
+        if not self.is_file_backed:
+            return base64.b64decode(self.file_content)
+        if not self.size:
+            return b""
+
+        with open(self.file_path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
     def __str__(self) -> str:
+        if self.is_file_backed:
+            return f"SolutionDownloadResponse({self.solution_download_op_id},{self.file_path},{self.sha256})"
+
         return f"SolutionDownloadResponse({self.solution_download_op_id},{self.file_content})"
 
     class Config:
@@ -1,25 +1,183 @@
 """
 Module with Base methods for services
 """
+import hashlib
+import io
 import logging
+import threading
+import time
+import urllib.error
+import urllib.request
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Type
+from urllib.parse import urlparse
 
-from suds.cache import ObjectCache
-from suds.client import Client
+from suds.cache import NoCache
+from suds.client import Client, ServiceSelector
+from suds.options import Options
+from suds.transport.https import HttpAuthenticated
 
+from platform_api.facades.base_model import GenericError
 from platform_api.facades.lifetime_model import LifetimeError
 from platform_api.facades.platform_service_center_model import ServiceCenterError
+from platform_api.facades.protocol_wrappers.resilience import DEFAULT_RESILIENCE_POLICY, ResiliencePolicy
 
 logger = logging.getLogger(__name__)
 
-CACHE_DAYS = 365
+# the seconds a warm client is used before its WSDL is revalidated with a conditional GET, so a platform upgrade
+# is picked up within minutes
+DEFAULT_WSDL_REVALIDATION_SECONDS = 5 * 60
+_wsdl_revalidation_seconds: float = DEFAULT_WSDL_REVALIDATION_SECONDS
+
+
+class _WarmClient(NamedTuple):
+    """A parsed WSDL, with the validators and the sha256 of the document it was parsed from"""
+
+    client: Client
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: str
+    validated_at: float
+
+
+# the suds clients built in this process, by WSDL url and faults: the wrappers created later (e.g. by the next
+# invocation of a reused function runtime) clone them instead of parsing the WSDL again
+_warm_clients: Dict[Tuple[str, bool], _WarmClient] = {}
+_revalidating: Set[Tuple[str, bool]] = set()
+_warm_clients_lock = threading.Lock()
+
+
+def clear_warm_clients():
+    """Forgets the clients built so far, the next wrapper calling a WSDL builds its client again"""
+
+    with _warm_clients_lock:
+        _warm_clients.clear()
+
+
+def set_wsdl_revalidation_interval(seconds: float):
+    """
+    Sets the seconds a warm client is used before its WSDL is revalidated, for all the wrappers of the process
+
+    The revalidation runs in the background of the first call after the interval, the calls keep the current
+    client until a changed WSDL is parsed.
+
+    Args:
+        seconds (float): The interval, DEFAULT_WSDL_REVALIDATION_SECONDS by default
+    """
+
+    global _wsdl_revalidation_seconds
+    _wsdl_revalidation_seconds = seconds
+
+
+def revalidate_warm_clients(urls: Iterable[str] = None, resilience_policy: ResiliencePolicy = None) -> List[str]:
+    """
+    Revalidates the WSDLs of the warm clients now, instead of waiting for the interval
+
+    Args:
+        urls (Iterable[str], optional): The WSDL urls to revalidate. Defaults to all the warm clients.
+        resilience_policy (ResiliencePolicy, optional): The policy of the conditional GETs
+
+    Raises:
+        GenericError: If a WSDL cannot be fetched
+        Exception: The suds error if a changed WSDL cannot be parsed
+
+    Returns:
+        List[str]: the urls whose WSDL changed and was parsed again
+    """
+
+    wrapper = BaseSoapWrapperService(resilience_policy=resilience_policy)
+    urls = None if urls is None else set(urls)
+    with _warm_clients_lock:
+        keys = [key for key in _warm_clients if urls is None or key[0] in urls]
+
+    changed = []
+    for key in keys:
+        if wrapper._revalidate(key, raise_errors=True):
+            changed.append(key[0])
+
+    return changed
+
+
+def _fetch_wsdl(
+        url: str, timeout: float, cached: Optional[_WarmClient]
+) -> Optional[Tuple[bytes, Optional[str], Optional[str]]]:
+    """
+    GETs a WSDL, conditionally on the validators of the cached client
+
+    Returns:
+        Optional[Tuple[bytes, Optional[str], Optional[str]]]: the document, its ETag and Last-Modified, or None if
+            it is not modified
+    """
+
+    request = urllib.request.Request(url)
+    if cached is not None and cached.etag:
+        request.add_header("If-None-Match", cached.etag)
+    if cached is not None and cached.last_modified:
+        request.add_header("If-Modified-Since", cached.last_modified)
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(), response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == HTTPStatus.NOT_MODIFIED and cached is not None:
+            return None
+        raise
+
+
+class _DocumentTransport(HttpAuthenticated):
+    """Serves the WSDL already fetched to the Client parsing it, the other documents (imports) are fetched"""
+
+    def __init__(self, url: str, document: bytes) -> None:
+        super().__init__()
+        self._url = url
+        self._document = document
+
+    def open(self, request):
+        if request.url == self._url:
+            return io.BytesIO(self._document)
+
+        return super().open(request)
+
+
+def _clone_client(client: Client, **kwargs) -> Client:
+    """
+    A client sharing the parsed WSDL of client, with its own options and transport
+
+    Client.clone does the same but deep copies the options, which recurses forever through the suds option
+    proxies on recent Pythons.
+
+    Args:
+        client (Client): The client to clone
+        **kwargs: The suds options of the clone
+
+    Returns:
+        Client: The clone
+    """
+
+    clone = Client.__new__(Client)
+    clone.options = Options()
+    clone.options.transport = HttpAuthenticated()
+    clone.set_options(**kwargs)
+    clone.wsdl = client.wsdl
+    clone.factory = client.factory
+    clone.service = ServiceSelector(clone, client.wsdl.services)
+    clone.sd = client.sd
+    clone.messages = dict(tx=None, rx=None)
+
+    return clone
 
 
 class BaseSoapWrapperService:
     """Wraps Service Center services"""
 
-    __soap_client: Client = None
+    # error raised when the resilience policy gives up on a call
+    _error_class: Type[GenericError] = GenericError
+
+    def __init__(self, resilience_policy: ResiliencePolicy = None) -> None:
+        super().__init__()
+        self._resilience_policy = resilience_policy or DEFAULT_RESILIENCE_POLICY
+        # by url, the clone and the warm client it was cloned from
+        self.__soap_clients: Dict[str, Tuple[Client, Client]] = {}
 
     def _get_soap_client(self, url: str, faults: bool = False) -> Client:
         """
@@ -35,12 +193,133 @@ class BaseSoapWrapperService:
 
         logger.debug("calling %s endpoint" % url)
 
-        if not self.__soap_client:
-            self.__soap_client = Client(url, faults=faults, cache=ObjectCache(days=CACHE_DAYS))
+        warm_client = self._warm_client(url, faults)
+        cloned_from, client = self.__soap_clients.get(url, (None, None))
+        if cloned_from is not warm_client:
+            # first call, or the WSDL changed since the clone
+            client = _clone_client(
+                warm_client,
+                faults=faults,
+                timeout=self._resilience_policy.socket_timeout,
+                # an option of this clone, the service ports of the WSDL are shared with the other clones
+                location=url,
+            )
+            self.__soap_clients[url] = (warm_client, client)
+
+        return client
+
+    def _warm_client(self, url: str, faults: bool) -> Client:
+        """
+        The client of the WSDL shared by the wrappers of this process, built by the first one calling it
+
+        Past the revalidation interval the first call starts revalidating it in the background, and still gets it.
+        """
+
+        key = (url, faults)
+        warm_client = _warm_clients.get(key)
+        if warm_client is None:
+            warm_client = self._load_warm_client(url, faults, None)
+            with _warm_clients_lock:
+                warm_client = _warm_clients.setdefault(key, warm_client)
+        elif time.monotonic() - warm_client.validated_at >= _wsdl_revalidation_seconds:
+            with _warm_clients_lock:
+                start = key not in _revalidating
+                _revalidating.add(key)
+            if start:
+                threading.Thread(target=self._revalidate, args=(key,), daemon=True).start()
+
+        return warm_client.client
+
+    def _load_warm_client(self, url: str, faults: bool, cached: Optional[_WarmClient]) -> _WarmClient:
+        """Fetches the WSDL, conditionally if cached, and parses it unless it is the document of cached"""
+
+        def _load() -> _WarmClient:
+            document = _fetch_wsdl(url, self._resilience_policy.socket_timeout, cached)
+            if document is None:
+                return cached._replace(validated_at=time.monotonic())
+
+            content, etag, last_modified = document
+            sha256 = hashlib.sha256(content).hexdigest()
+            if cached is not None and cached.sha256 == sha256:
+                # no validators from the server, or they changed but not the WSDL
+                return cached._replace(etag=etag, last_modified=last_modified, validated_at=time.monotonic())
+
+            client = Client(
+                url,
+                faults=faults,
+                cache=NoCache(),
+                timeout=self._resilience_policy.socket_timeout,
+                transport=_DocumentTransport(url, content),
+            )
+            if not client.wsdl.services:
+                # well-formed XML but not a WSDL, e.g. an XHTML error page
+                raise ValueError(f"{url} is not a WSDL, it has no services")
+            return _WarmClient(client, etag, last_modified, sha256, time.monotonic())
+
+        return self._resilience_policy.execute(
+            domain=urlparse(url).netloc,
+            operation=_load,
+            error_class=self._error_class,
+            idempotent=True,
+        )
+
+    def _revalidate(self, key: Tuple[str, bool], raise_errors: bool = False) -> bool:
+        """
+        Replaces the warm client of key if its WSDL changed
+
+        Args:
+            key (Tuple[str, bool]): The WSDL url and faults of the warm client
+            raise_errors (bool, optional): False to log the errors and keep the client until the next interval
+
+        Returns:
+            bool: True if the WSDL changed
+        """
+
+        cached = _warm_clients.get(key)
+        try:
+            if cached is None:
+                return False
+
+            try:
+                refreshed = self._load_warm_client(key[0], key[1], cached)
+            except Exception as e:
+                # e.g. an HTML maintenance page instead of the WSDL, fetched again after the next interval
+                if raise_errors:
+                    raise
+                logger.warning(f"Keeping the WSDL of {key[0]}, it could not be revalidated: {e!r}")
+                refreshed = cached._replace(validated_at=time.monotonic())
 
-        self.__soap_client.sd[0].service.setlocation(url)
+            with _warm_clients_lock:
+                if _warm_clients.get(key) is cached:
+                    _warm_clients[key] = refreshed
 
-        return self.__soap_client
+            if refreshed.client is not cached.client:
+                logger.info(f"The WSDL of {key[0]} changed")
+            return refreshed.client is not cached.client
+        finally:
+            with _warm_clients_lock:
+                _revalidating.discard(key)
+
+    def _execute(self, domain: str, operation: Callable[[], Any], idempotent: bool = False) -> Any:
+        """
+        Calls a SOAP operation through the resilience policy
+
+        Args:
+            domain (str): The host domain of the server.
+            operation (Callable): The suds call, returning the (http status, reply) tuple of a faults=False client
+            idempotent (bool, optional): True if the operation can be safely retried. Defaults to False.
+
+        Returns:
+            Any: The (http status, reply) tuple
+        """
+
+        return self._resilience_policy.execute(
+            domain=domain,
+            operation=operation,
+            error_class=self._error_class,
+            idempotent=idempotent,
+            is_server_error=lambda response: response[0] >= HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
 
     def _raise_lt_soap_error(self, response_status: Any) -> None:
         """Raises a standard error based on a Lifetime response
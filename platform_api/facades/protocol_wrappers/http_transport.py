@@ -0,0 +1,151 @@
+"""
+The HTTP clients the REST wrappers send their requests through
+
+    RequestsTransport: HTTP/1.1 through the requests functions, a connection per call (the default)
+    PooledRequestsTransport: HTTP/1.1 through a requests Session, kept-alive connections reused across calls
+    Http2Transport: HTTP/2 through httpx, the concurrent calls to a host multiplexed over one connection
+
+Every transport takes the requests arguments (auth, headers, data, timeout) and returns a response with the
+status_code, text, headers and json() of a requests.Response. Http2Transport needs the optional
+`httpx[http2]` dependency (pip install simple-soap-tests[http2]).
+"""
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_HTTP2_MAX_CONNECTIONS = 100
+
+
+class HttpTransport:
+    """Sends the requests of the REST wrappers, meant to be shared by every wrapper calling the same hosts"""
+
+    def request(self, method: str, url: str, **kwargs) -> Any:
+        """
+        Sends a request
+
+        Args:
+            method (str): The HTTP method
+            url (str): The url
+            **kwargs: The requests arguments: auth, headers, data, timeout
+
+        Raises:
+            requests.exceptions.RequestException: if the request could not be sent or timed out
+
+        Returns:
+            Any: The response
+        """
+
+        raise NotImplementedError
+
+    def connect(self, url: str, timeout: Any = None):
+        """
+        Opens a connection to the host of url ahead of the first request, for the transports keeping them open
+
+        Args:
+            url (str): A url of the host
+            timeout (Any, optional): The requests timeout
+
+        Raises:
+            requests.exceptions.RequestException: if the host could not be reached or timed out
+        """
+
+    def close(self):
+        """Closes the open connections"""
+
+    def __enter__(self) -> "HttpTransport":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RequestsTransport(HttpTransport):
+    """HTTP/1.1 through the requests functions, every call opens (and closes) its own connection"""
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return requests.request(method, url, **kwargs)
+
+
+class PooledRequestsTransport(HttpTransport):
+    """HTTP/1.1 through a requests Session keeping up to pool_maxsize connections per host alive"""
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> None:
+        super().__init__()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self._session.request(method, url, **kwargs)
+
+    def connect(self, url: str, timeout: Any = None):
+        self.request("HEAD", url, timeout=timeout)
+
+    def close(self):
+        self._session.close()
+
+
+class Http2Transport(HttpTransport):
+    """
+    HTTP/2 through an httpx client, one connection per host carrying every concurrent call as its own stream
+
+    The client is thread safe and shared by the threads calling request. The body, the headers and the basic
+    auth are encoded by requests, so the server receives exactly what the other transports send, and the
+    httpx transport errors are raised as the requests errors the resilience policy retries.
+    """
+
+    def __init__(self, verify: bool = True, max_connections: int = DEFAULT_HTTP2_MAX_CONNECTIONS) -> None:
+        """
+        Args:
+            verify (bool): Verify the server certificates
+            max_connections (int): The connection limit over all the hosts
+
+        Raises:
+            ImportError: if httpx or its http2 extra is not installed
+        """
+
+        super().__init__()
+        try:
+            import h2  # noqa: F401 - httpx only looks for it when the client is created
+            import httpx
+        except ImportError as e:
+            raise ImportError("The HTTP/2 transport needs httpx and h2: pip install 'httpx[http2]'") from e
+
+        self._httpx = httpx
+        self._client = httpx.Client(http2=True, verify=verify, limits=httpx.Limits(max_connections=max_connections))
+
+    def _timeout(self, timeout: Any):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+
+        return self._httpx.Timeout(timeout)
+
+    def request(self, method: str, url: str, timeout: Any = None, **kwargs) -> Any:
+        prepared = requests.Request(method, url, **kwargs).prepare()
+        headers: Dict[str, str] = dict(prepared.headers)
+
+        try:
+            return self._client.request(
+                method,
+                prepared.url,
+                headers=headers,
+                content=prepared.body,
+                timeout=self._timeout(timeout),
+            )
+        except self._httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except self._httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    def connect(self, url: str, timeout: Any = None):
+        self.request("HEAD", url, timeout=timeout)
+
+    def close(self):
+        self._client.close()
+
+
+DEFAULT_TRANSPORT = RequestsTransport()
@@ -1,6 +1,9 @@
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from http import HTTPStatus
-from typing import Any, List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import requests
 from pydantic import parse_obj_as
@@ -14,6 +17,8 @@ from platform_api.facades.lifetime_model import (
     LifetimeError,
 )
 from platform_api.facades.log_extra import log_extra
+from platform_api.facades.protocol_wrappers.http_transport import DEFAULT_TRANSPORT, HttpTransport
+from platform_api.facades.protocol_wrappers.resilience import DEFAULT_RESILIENCE_POLICY, ResiliencePolicy
 
 LTCC_SERVICES_SET_PUBLIC_HOST = (
     "/LifeTimeCloudConnect/rest/LTCCServices/Environment_SetPublicHost?EnvironmentSerial={environment_serial}"
@@ -24,12 +29,37 @@ COA_ENVIRONMENT_GET_STATUS_APPLY_SETTINGS = (
     "/CloudOrchestrationAPI/rest/v1/applysettings/{operation_id}/status?EnvironmentKey={environment_key}"
 )
 
+# (domain, username) pairs whose last infrastructure is kept, the least recently used ones are dropped beyond
+DEFAULT_MAX_CACHED_INFRASTRUCTURES = 256
+
 logger = logging.getLogger(__name__)
 
 
+class _CachedInfrastructure(NamedTuple):
+    """The last infrastructure returned for a domain and user, with the validators of its response"""
+
+    environments: List[LifetimeEnvironment]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: str
+
+
 class LifeTimeRestWrapperService:
     """Wraps lifetime REST services"""
 
+    def __init__(
+            self,
+            resilience_policy: ResiliencePolicy = None,
+            transport: HttpTransport = None,
+            max_cached_infrastructures: int = DEFAULT_MAX_CACHED_INFRASTRUCTURES,
+    ) -> None:
+        super().__init__()
+        self._resilience_policy = resilience_policy or DEFAULT_RESILIENCE_POLICY
+        self._transport = transport or DEFAULT_TRANSPORT
+        self._infrastructure: "OrderedDict[Tuple[str, str], _CachedInfrastructure]" = OrderedDict()
+        self._max_cached_infrastructures = max_cached_infrastructures
+        self._infrastructure_lock = threading.Lock()
+
     def set_public_host(
         self,
         domain: str,
@@ -65,7 +95,13 @@ class LifeTimeRestWrapperService:
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         body = ({"IsLifetime": is_lifetime, "PublicHost": public_host},)
 
-        response = requests.post(url, auth=auth, headers=headers, data=body)
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "POST",
+                url, auth=auth, headers=headers, data=body, timeout=self._resilience_policy.timeout
+            ),
+        )
         logger.debug(f"End calling {set_public_host_url} endpoint: {response.text}")
 
         if response.status_code != HTTPStatus.OK:
@@ -77,6 +113,10 @@ class LifeTimeRestWrapperService:
         """
         Gets Environments of the Infrastructure
 
+        The environments of the last call with the same domain and user are returned again, without parsing the
+        response, when the server answers the conditional request with 304 Not Modified or the body is unchanged.
+        They are copies: changing them does not change what the next call returns.
+
         Args:
             domain (str): The host domain of the Lifetime server.
             authentication (LifetimeCredentials): The authentication information to call Lifetime web services.
@@ -88,27 +128,105 @@ class LifeTimeRestWrapperService:
             List[LifetimeEnvironment]: The List of environments
         """
 
+        environments = self._refresh_infrastructure(domain, authentication).environments
+
+        return [environment.copy() for environment in environments]
+
+    def infrastructure_version(self, domain: str, authentication: LifetimeCredentials) -> str:
+        """
+        Gets the version of the Infrastructure: the sha256 of its response, the same as long as nothing changed
+
+        Args:
+            domain (str): The host domain of the Lifetime server.
+            authentication (LifetimeCredentials): The authentication information to call Lifetime web services.
+
+        Raises:
+            LifetimeError: If any error occurs while get environments.
+
+        Returns:
+            str: The version
+        """
+
+        return self._refresh_infrastructure(domain, authentication).sha256
+
+    def infrastructure_changed_since(self, domain: str, authentication: LifetimeCredentials, version: str) -> bool:
+        """
+        Tells if the Infrastructure changed since a version returned by infrastructure_version
+
+        Args:
+            domain (str): The host domain of the Lifetime server.
+            authentication (LifetimeCredentials): The authentication information to call Lifetime web services.
+            version (str): A version of the infrastructure
+
+        Raises:
+            LifetimeError: If any error occurs while get environments.
+
+        Returns:
+            bool: True if the infrastructure is not the one of version anymore
+        """
+
+        return self.infrastructure_version(domain, authentication) != version
+
+    def _refresh_infrastructure(self, domain: str, authentication: LifetimeCredentials) -> _CachedInfrastructure:
         logger.info("Calling infrastructure_get on CloudOrchestrationAPI")
 
         url = f"https://{domain}{COA_INFRASTRUCTURE}"
         logger.debug(f"calling {url} endpoint")
 
+        key = (domain, authentication.username)
+        with self._infrastructure_lock:
+            cached = self._infrastructure.get(key)
+            if cached is not None:
+                self._infrastructure.move_to_end(key)
+
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached is not None and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
         auth = HTTPBasicAuth(
             authentication.username,
             authentication.password,
         )
 
-        response = requests.get(url, auth=auth, headers=headers)
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "GET", url, auth=auth, headers=headers, timeout=self._resilience_policy.timeout
+            ),
+            idempotent=True,
+        )
+
+        if response.status_code == HTTPStatus.NOT_MODIFIED and cached is not None:
+            logger.info("The infrastructure is not modified")
+            return cached
+
         logger.debug(response.text)
 
         if response.status_code != HTTPStatus.OK:
             raise LifetimeError(error_code="", error_message=response.text, http_status_code=response.status_code)
 
-        infra = parse_obj_as(List[LifetimeEnvironment], response.json())
+        sha256 = hashlib.sha256(response.content).hexdigest()
+        if cached is not None and cached.sha256 == sha256:
+            # no validators from the server, or they changed but not the content
+            environments = cached.environments
+        else:
+            environments = parse_obj_as(List[LifetimeEnvironment], response.json())
         logger.info("The infrastructure_get was called successfully")
 
-        return infra
+        refreshed = _CachedInfrastructure(
+            environments=environments,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            sha256=sha256,
+        )
+        with self._infrastructure_lock:
+            self._infrastructure[key] = refreshed
+            self._infrastructure.move_to_end(key)
+            while len(self._infrastructure) > self._max_cached_infrastructures:
+                self._infrastructure.popitem(last=False)
+
+        return refreshed
 
     def apply_environment_settings(self, domain: str, authentication: LifetimeCredentials, environment_key: str) -> int:
         """
@@ -138,7 +256,12 @@ class LifeTimeRestWrapperService:
             authentication.password,
         )
 
-        response = requests.put(url, auth=auth, headers=headers)
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "PUT", url, auth=auth, headers=headers, timeout=self._resilience_policy.timeout
+            ),
+        )
         logger.debug("Response received from Platform apply settings api", extra=log_extra(response))
 
         if response.status_code != HTTPStatus.OK:
@@ -180,7 +303,13 @@ class LifeTimeRestWrapperService:
             authentication.password,
         )
 
-        response = requests.get(url, auth=auth, headers=headers)
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "GET", url, auth=auth, headers=headers, timeout=self._resilience_policy.timeout
+            ),
+            idempotent=True,
+        )
         logger.debug(response.text)
 
         if response.status_code != HTTPStatus.OK:
@@ -191,6 +320,27 @@ class LifeTimeRestWrapperService:
 
         return status
 
+    def _execute(self, domain: str, operation: Callable[[], requests.Response], idempotent: bool = False):
+        """
+        Calls a REST endpoint through the resilience policy
+
+        Args:
+            domain (str): The host domain of the Lifetime server.
+            operation (Callable): The HTTP call
+            idempotent (bool, optional): True if the operation can be safely retried. Defaults to False.
+
+        Returns:
+            requests.Response: The HTTP response
+        """
+
+        return self._resilience_policy.execute(
+            domain=domain,
+            operation=operation,
+            error_class=LifetimeError,
+            idempotent=idempotent,
+            is_server_error=lambda response: response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
     def _raise_lt_rest_error(self, rest_result: Any) -> None:
         """Raises a standard error based on the result structure from the Lifetime service
 
@@ -3,7 +3,7 @@ Wrapper to call Lifetime services
 """
 import logging
 from http import HTTPStatus
-from typing import Any, Union
+from typing import Any, Callable, Union
 
 from suds.client import Client
 
@@ -14,11 +14,14 @@ from platform_api.facades.lifetime_model import (
     LifetimeError,
     LifetimeUser,
 )
+from platform_api.facades.lifetime_session_tokens import LifetimeSessionTokens
 from platform_api.facades.protocol_wrappers.base_soap_wrapper import BaseSoapWrapperService
+from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
 
 logger = logging.getLogger(__name__)
 
 USER_MANAGEMENT_SERVICE_WSDL = "LifeTimeServices/UserManagementService.asmx?wsdl"
+AUTHENTICATION_SERVICE_WSDL = "LifeTimeServices/AuthenticationService.asmx?wsdl"
 
 LIFETIME_INACTIVATE_USER_USER_NOT_FOUND = 101
 
@@ -26,8 +29,20 @@ LIFETIME_INACTIVATE_USER_USER_NOT_FOUND = 101
 class LifeTimeSoapWrapperService(BaseSoapWrapperService):
     """Wraps lifetime SOAP services"""
 
-    # wsdl WebServiceSimpleAuthentication
-    __soap_authentication: Any = None
+    _error_class = LifetimeError
+
+    def __init__(
+            self, resilience_policy: ResiliencePolicy = None, session_tokens: LifetimeSessionTokens = None
+    ) -> None:
+        """
+        Args:
+            resilience_policy (ResiliencePolicy, optional): The timeouts, retries and circuit breakers
+            session_tokens (LifetimeSessionTokens, optional): Authenticate the calls with session tokens instead of
+                the username and password. Defaults to None (the password is sent on every call).
+        """
+
+        super().__init__(resilience_policy=resilience_policy)
+        self._session_tokens = session_tokens
 
     def __get_soap_authentication(self, client: Client, username: str, password: str, token: Union[str, None]):
         """
@@ -43,14 +58,91 @@ class LifeTimeSoapWrapperService(BaseSoapWrapperService):
             WebServiceSimpleAuthentication: the authentication info
         """
 
-        if not self.__soap_authentication:
-            self.__soap_authentication = client.factory.create("s0:WebServiceSimpleAuthentication")
+        # a new struct per call, the calls of other threads may be sending other credentials or tokens
+        soap_authentication = client.factory.create("s0:WebServiceSimpleAuthentication")
+        soap_authentication.Username = username
+        soap_authentication.Password = password
+        soap_authentication.Token = token
+
+        return soap_authentication
+
+    def _get_session_token(self, domain: str, authentication: LifetimeCredentials) -> str:
+        """
+        Acquires a session token from the Lifetime AuthenticationService
+
+        Args:
+            domain (str): The host domain of the Lifetime server.
+            authentication (LifetimeCredentials): The credentials the token is for.
+
+        Raises:
+            LifetimeError: If the credentials are rejected or the call fails.
+
+        Returns:
+            str: The session token.
+        """
+
+        url = f"https://{domain}/{AUTHENTICATION_SERVICE_WSDL}"
+        client = self._get_soap_client(url=url, faults=False)
+
+        response = self._execute(
+            domain=domain,
+            operation=lambda: client.service.Authentication_GetToken(authentication.username, authentication.password),
+            idempotent=True,
+        )
+
+        if response[0] != HTTPStatus.OK:
+            self._raise_lt_soap_error_from_code(response[0], response[1])
+
+        if not response[1].Success:
+            self._raise_lt_soap_error(response[1].Status)
+
+        return response[1].Token
+
+    def _execute_authenticated(
+        self, domain: str, client: Client, authentication: LifetimeCredentials, operation: Callable[[Any], Any]
+    ) -> Any:
+        """
+        Calls a SOAP operation with the authentication struct of the credentials
+
+        Without session tokens the struct holds the username and password. With them it holds the token of the
+        credentials, acquired by the first call; a reply rejecting the token gets a new token and the operation
+        is sent once more, the server did not run it.
+
+        Args:
+            domain (str): The host domain of the Lifetime server.
+            client (Client): The Client to call
+            authentication (LifetimeCredentials): The authentication information to call Lifetime web services.
+            operation (Callable): The suds call, given the authentication struct
+
+        Returns:
+            Any: The (http status, reply) tuple
+        """
+
+        if self._session_tokens is None:
+            auth_struct = self.__get_soap_authentication(
+                client=client, username=authentication.username, password=authentication.password, token=None
+            )
+            return self._execute(domain=domain, operation=lambda: operation(auth_struct))
+
+        credentials = (domain, authentication.username, authentication.password)
+        for _ in range(2):
+            token = self._session_tokens.token_for(
+                *credentials, acquire=lambda: self._get_session_token(domain, authentication)
+            )
+            auth_struct = self.__get_soap_authentication(client=client, username=None, password=None, token=token)
+            response = self._execute(domain=domain, operation=lambda: operation(auth_struct))
 
-        self.__soap_authentication.Username = username
-        self.__soap_authentication.Password = password
-        self.__soap_authentication.Token = token
+            rejected = (
+                response[0] == HTTPStatus.OK
+                and not response[1].Success
+                and self._session_tokens.is_invalid_token(response[1].Status.ResponseId)
+            )
+            if not rejected:
+                break
+            logger.info(f"Session token rejected by {domain}, getting a new one")
+            self._session_tokens.invalidate(*credentials, token=token)
 
-        return self.__soap_authentication
+        return response
 
     def create_or_update_user(
         self, domain: str, authentication: LifetimeCredentials, user: LifetimeUser, encrypt_password: bool = True
@@ -75,11 +167,15 @@ class LifeTimeSoapWrapperService(BaseSoapWrapperService):
         # The Client must be created with faults=False to can get HttpCode
         # If you want to change faults=True, the handling of "response" object must change (https://github.com/suds-community/suds#faults)
         client = self._get_soap_client(url=url, faults=False)
-        auth_struct = self.__get_soap_authentication(
-            client=client, username=authentication.username, password=authentication.password, token=None
-        )
 
-        response = self._call_create_or_update_user(client, auth_struct, user, encrypt_password)
+        response = self._execute_authenticated(
+            domain=domain,
+            client=client,
+            authentication=authentication,
+            operation=lambda auth_struct: self._call_create_or_update_user(
+                client, auth_struct, user, encrypt_password
+            ),
+        )
 
         if response[0] != HTTPStatus.OK:
             self._raise_lt_soap_error_from_code(response[0], response[1])
@@ -137,12 +233,14 @@ class LifeTimeSoapWrapperService(BaseSoapWrapperService):
         # The Client must be created with faults=False to can get HttpCode
         # If you want to change faults=True, the handling of "response" object must change (https://github.com/suds-community/suds#faults)
         client = self._get_soap_client(url=url, faults=False)
-        auth_struct = self.__get_soap_authentication(
-            client=client, username=authentication.username, password=authentication.password, token=None
-        )
 
-        response = self._call_change_user_password(
-            client=client, authentication=auth_struct, user=user, encrypt_password=encrypt_password
+        response = self._execute_authenticated(
+            domain=domain,
+            client=client,
+            authentication=authentication,
+            operation=lambda auth_struct: self._call_change_user_password(
+                client=client, authentication=auth_struct, user=user, encrypt_password=encrypt_password
+            ),
         )
 
         if response[0] != HTTPStatus.OK:
@@ -195,11 +293,15 @@ class LifeTimeSoapWrapperService(BaseSoapWrapperService):
         # The Client must be created with faults=False so it can get an HttpCode
         # If you want to change to faults=True, the handling of "response" object must change (https://github.com/suds-community/suds#faults)
         client = self._get_soap_client(url=url, faults=False)
-        auth_struct = self.__get_soap_authentication(
-            client=client, username=authentication.username, password=authentication.password, token=None
-        )
 
-        response = self._call_inactivate_user(client=client, authentication=auth_struct, request=request)
+        response = self._execute_authenticated(
+            domain=domain,
+            client=client,
+            authentication=authentication,
+            operation=lambda auth_struct: self._call_inactivate_user(
+                client=client, authentication=auth_struct, request=request
+            ),
+        )
         logger.debug(response)
 
         if response[0] != HTTPStatus.OK:
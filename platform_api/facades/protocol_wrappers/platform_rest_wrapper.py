@@ -1,6 +1,7 @@
 import json
 import logging
 from http import HTTPStatus
+from typing import Callable
 
 import requests
 from requests.models import HTTPBasicAuth
@@ -11,6 +12,8 @@ from platform_api.facades.platform_service_center_model import (
     ServiceCenterError,
     ServiceCenterUser,
 )
+from platform_api.facades.protocol_wrappers.http_transport import DEFAULT_TRANSPORT, HttpTransport
+from platform_api.facades.protocol_wrappers.resilience import DEFAULT_RESILIENCE_POLICY, ResiliencePolicy
 
 OUTSYSTEMS_CCA_CREATE_USER = "/CloudConnectAgent/rest/BussinessUsers/user"
 OUTSYSTEMS_CCA_CHANGE_USER_PWD = "/CloudConnectAgent/rest/BussinessUsers/user/{username}/setpassword"
@@ -25,6 +28,11 @@ class ServiceCenterRestWrapperService:
     Wraps Service Center REST services
     """
 
+    def __init__(self, resilience_policy: ResiliencePolicy = None, transport: HttpTransport = None) -> None:
+        super().__init__()
+        self._resilience_policy = resilience_policy or DEFAULT_RESILIENCE_POLICY
+        self._transport = transport or DEFAULT_TRANSPORT
+
     def create_user(
         self, domain: str, authentication: ServiceCenterCredentials, service_center_user: ServiceCenterUser
     ) -> bool:
@@ -58,7 +66,17 @@ class ServiceCenterRestWrapperService:
             "IsAdmin": service_center_user.is_admin,
         }
 
-        response = requests.post(url, auth=auth, headers=CONTENT_TYPE_JSON_HEADER, data=json.dumps(body))
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "POST",
+                url,
+                auth=auth,
+                headers=CONTENT_TYPE_JSON_HEADER,
+                data=json.dumps(body),
+                timeout=self._resilience_policy.timeout,
+            ),
+        )
         logger.debug(response.text)
 
         if response.status_code != HTTPStatus.OK:
@@ -107,7 +125,17 @@ class ServiceCenterRestWrapperService:
             "Password": service_center_change_user_password.new_password,
         }
 
-        response = requests.post(url, auth=auth, headers=CONTENT_TYPE_JSON_HEADER, data=json.dumps(body))
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "POST",
+                url,
+                auth=auth,
+                headers=CONTENT_TYPE_JSON_HEADER,
+                data=json.dumps(body),
+                timeout=self._resilience_policy.timeout,
+            ),
+        )
         logger.debug(response.text)
 
         if response.status_code != HTTPStatus.OK:
@@ -160,7 +188,17 @@ class ServiceCenterRestWrapperService:
             "Password": service_center_change_user_password.new_password,
         }
 
-        response = requests.post(url, auth=auth, headers=CONTENT_TYPE_JSON_HEADER, data=json.dumps(body))
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._transport.request(
+                "POST",
+                url,
+                auth=auth,
+                headers=CONTENT_TYPE_JSON_HEADER,
+                data=json.dumps(body),
+                timeout=self._resilience_policy.timeout,
+            ),
+        )
         logger.debug(response.text)
 
         if response.status_code != HTTPStatus.OK:
@@ -179,3 +217,24 @@ class ServiceCenterRestWrapperService:
             )
 
         return True
+
+    def _execute(self, domain: str, operation: Callable[[], requests.Response], idempotent: bool = False):
+        """
+        Calls a REST endpoint through the resilience policy
+
+        Args:
+            domain (str): The host domain of the Service Center server.
+            operation (Callable): The HTTP call
+            idempotent (bool, optional): True if the operation can be safely retried. Defaults to False.
+
+        Returns:
+            requests.Response: The HTTP response
+        """
+
+        return self._resilience_policy.execute(
+            domain=domain,
+            operation=operation,
+            error_class=ServiceCenterError,
+            idempotent=idempotent,
+            is_server_error=lambda response: response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
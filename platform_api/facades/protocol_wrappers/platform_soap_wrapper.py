@@ -2,10 +2,14 @@
 Wrapper to call Service Center services
 """
 import logging
+import os
+import pathlib
+import tempfile
 from http import HTTPStatus
 
 from suds.client import Client
 
+from platform_api.base64_encoder import Base64Encoder
 from platform_api.facades.platform_service_center_model import (
     PlatformInfo,
     ServiceCenterCredentials,
@@ -23,6 +27,8 @@ OUTSYSTEMS_SC_SOLUTIONS_WSDL = "/ServiceCenter/Solutions.asmx?wsdl"
 class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
     """Wraps Service Center SOAP services"""
 
+    _error_class = ServiceCenterError
+
     def get_platform_info(self, domain: str) -> PlatformInfo:
         """Get PlatformInfo from Service Center
 
@@ -42,7 +48,9 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
         logger.debug(f"calling {url} endpoint")
 
         client = self._get_soap_client(url=url, faults=False)
-        response = self._call_get_platform_info(client=client)
+        response = self._execute(
+            domain=domain, operation=lambda: self._call_get_platform_info(client=client), idempotent=True
+        )
         logger.debug(response)
 
         if response[0] != HTTPStatus.OK:
@@ -83,7 +91,12 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
         logger.debug("calling {url} endpoint")
 
         client = self._get_soap_client(url=url, faults=False)
-        response = self._call_set_license(client=client, authentication=authentication, b64_license=b64_license)
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._call_set_license(
+                client=client, authentication=authentication, b64_license=b64_license
+            ),
+        )
 
         if response[0] != HTTPStatus.OK:
             self._raise_sc_soap_error_from_code(response[0], response[1])
@@ -131,10 +144,13 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
         logger.debug(f"calling {url} endpoint")
 
         client = self._get_soap_client(url=url, faults=False)
-        response = self._call_create_all_solution(
-            client=client,
-            authentication=authentication,
-            all_solution_name=all_solution_name,
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._call_create_all_solution(
+                client=client,
+                authentication=authentication,
+                all_solution_name=all_solution_name,
+            ),
         )
         logger.debug(response)
 
@@ -165,7 +181,13 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
         )
 
     def solution_download(
-        self, domain: str, authentication: ServiceCenterCredentials, solution_name: str, solution_version_id: int
+        self,
+        domain: str,
+        authentication: ServiceCenterCredentials,
+        solution_name: str,
+        solution_version_id: int,
+        file_backed: bool = False,
+        download_dir: str = None,
     ) -> SolutionDownloadResponse:
         """
         Call Solutions/Download in Service Center
@@ -175,6 +197,8 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
             authentication (Credentials): The authentication information to call ServiCenter web services.
             solution_name (str): the solution name
             solution_version_id (int): The solution version identifier
+            file_backed (bool, optional): Decode the solution into a file instead of returning it as base 64
+            download_dir (str, optional): The folder of the file-backed solutions. Defaults to the temp folder.
 
         Raises:
             ServiceCenterError: If any error occurs while Get Solution from service center
@@ -190,11 +214,14 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
 
         logger.debug(f"Send values: solution_name:{solution_name} solution_version_id:{solution_version_id}")
         client = self._get_soap_client(url=url, faults=False)
-        response = self._call_solution_download(
-            client=client,
-            authentication=authentication,
-            solution_name=solution_name,
-            solution_version_id=solution_version_id,
+        response = self._execute(
+            domain=domain,
+            operation=lambda: self._call_solution_download(
+                client=client,
+                authentication=authentication,
+                solution_name=solution_name,
+                solution_version_id=solution_version_id,
+            ),
         )
 
         if response[0] != HTTPStatus.OK:
@@ -203,10 +230,40 @@ class ServiceCenterSoapWrapperService(BaseSoapWrapperService):
 
         logger.debug(f"SolutionDownloadOpId: {response[1]['SolutionDownloadOpId']}")
 
+        if file_backed:
+            return self._decode_solution_to_file(response[1], download_dir)
+
         return SolutionDownloadResponse(
             solution_download_op_id=response[1]["SolutionDownloadOpId"], file_content=str(response[1]["file"])
         )
 
+    def _decode_solution_to_file(self, reply, download_dir: str = None) -> SolutionDownloadResponse:
+        """
+        Decodes the file of a Download reply into a new file, hashing it on the way
+
+        Args:
+            reply: The Download reply
+            download_dir (str, optional): The folder of the file
+
+        Returns:
+            SolutionDownloadResponse: the file-backed response
+        """
+
+        fd, file_path = tempfile.mkstemp(dir=download_dir, prefix="solution-", suffix=".osp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                sha256, size = Base64Encoder().decode_to_file(str(reply["file"]), f)
+        except BaseException:
+            os.unlink(file_path)
+            raise
+
+        return SolutionDownloadResponse(
+            solution_download_op_id=reply["SolutionDownloadOpId"],
+            file_path=pathlib.Path(file_path),
+            sha256=sha256,
+            size=size,
+        )
+
     def _call_solution_download(
         self, client: Client, authentication: ServiceCenterCredentials, solution_name: str, solution_version_id: int
     ):
@@ -0,0 +1,281 @@
+"""
+Timeouts, retries and circuit breaking shared by the SOAP and REST wrappers
+"""
+import logging
+import random
+import socket
+import threading
+import time
+from http import HTTPStatus
+from http.client import HTTPException
+from typing import Any, Callable, Dict, Type
+from urllib.error import URLError
+
+import requests
+
+from platform_api.facades.base_model import GenericError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 10.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 30.0
+
+CIRCUIT_OPEN_ERROR_CODE = "CIRCUIT_OPEN"
+
+TIMEOUT_ERRORS = (socket.timeout, requests.exceptions.Timeout)
+TRANSIENT_ERRORS = TIMEOUT_ERRORS + (
+    ConnectionError,
+    URLError,
+    HTTPException,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def _is_timeout(error: Exception) -> bool:
+    """True if the error (or the reason wrapped by urllib) is a timeout"""
+
+    return isinstance(error, TIMEOUT_ERRORS) or isinstance(getattr(error, "reason", None), TIMEOUT_ERRORS)
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures of a single domain
+
+    The breaker opens after `failure_threshold` consecutive failures and rejects calls until
+    `recovery_timeout` seconds went by. Then one trial call is let through (half-open): a success
+    closes the breaker again and a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float) -> None:
+        super().__init__()
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Checks if a call may go through
+
+        Returns:
+            bool: False while the breaker is open
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = self.HALF_OPEN
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_error(self) -> None:
+        """
+        Records an error that tells nothing about the health of the domain (e.g. a reply that cannot be parsed)
+
+        It does not count toward opening the breaker, but a half-open trial call that ends this way re-opens it
+        rather than leaving the breaker waiting forever for the outcome of its trial.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResiliencePolicy:
+    """
+    Holds the timeouts, the retry settings and one circuit breaker per domain
+
+    A policy instance is meant to be shared: the breakers only protect a domain if every wrapper
+    calling that domain uses the same policy (see DEFAULT_RESILIENCE_POLICY).
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+    ) -> None:
+        super().__init__()
+
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # the settings only: a copy sent to another process gets its own (closed) breakers
+        state = self.__dict__.copy()
+        del state["_breakers"], state["_breakers_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    @property
+    def timeout(self) -> tuple:
+        """The (connect, read) timeout tuple expected by requests"""
+
+        return self.connect_timeout, self.read_timeout
+
+    @property
+    def socket_timeout(self) -> float:
+        """
+        The single socket timeout used by suds
+
+        urllib does not split connect and read timeouts so the larger of the two is used.
+        """
+
+        return max(self.connect_timeout, self.read_timeout)
+
+    def breaker_for(self, domain: str) -> CircuitBreaker:
+        """
+        Gets (or creates) the circuit breaker of a domain
+
+        Args:
+            domain (str): The host domain of the server.
+
+        Returns:
+            CircuitBreaker: the breaker for the domain
+        """
+        with self._breakers_lock:
+            breaker = self._breakers.get(domain)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+                self._breakers[domain] = breaker
+
+            return breaker
+
+    def reset(self) -> None:
+        """Forgets the circuit breakers, every domain starts again with a closed one"""
+
+        with self._breakers_lock:
+            self._breakers.clear()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Computes the delay before a retry (exponential backoff with full jitter)
+
+        Args:
+            attempt (int): The number of the attempt that failed, starting at 0
+
+        Returns:
+            float: The number of seconds to wait
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def execute(
+        self,
+        domain: str,
+        operation: Callable[[], Any],
+        error_class: Type[GenericError],
+        idempotent: bool = False,
+        is_server_error: Callable[[Any], bool] = None,
+    ) -> Any:
+        """
+        Calls the operation applying the circuit breaker of the domain and the retry settings
+
+        Only idempotent operations are retried. A result flagged by `is_server_error` counts as a
+        failure for the breaker; the last one is returned to the caller so the wrapper keeps handling
+        the error response as usual.
+
+        Args:
+            domain (str): The host domain of the server.
+            operation (Callable): The call to the remote service.
+            error_class (Type[GenericError]): The error raised on open circuit or transport failure.
+            idempotent (bool, optional): True if the operation can be safely retried. Defaults to False.
+            is_server_error (Callable, optional): Tells if a result is a 5xx response. Defaults to None.
+
+        Raises:
+            GenericError: An instance of error_class if the circuit is open or the transport failed.
+
+        Returns:
+            Any: The result of the operation
+        """
+        breaker = self.breaker_for(domain)
+        attempts = 1 + (self.max_retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            if not breaker.allow_request():
+                raise error_class(
+                    error_code=CIRCUIT_OPEN_ERROR_CODE,
+                    error_message=f"Circuit open for {domain}",
+                    http_status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                )
+
+            is_last_attempt = attempt == attempts - 1
+
+            try:
+                result = operation()
+            except TRANSIENT_ERRORS as e:
+                breaker.record_failure()
+                logger.warning(f"Attempt {attempt + 1}/{attempts} to {domain} failed: {e!r}")
+                if is_last_attempt:
+                    raise error_class(
+                        error_code="",
+                        error_message=str(e),
+                        http_status_code=HTTPStatus.GATEWAY_TIMEOUT
+                        if _is_timeout(e)
+                        else HTTPStatus.SERVICE_UNAVAILABLE,
+                    ) from e
+                time.sleep(self.backoff(attempt))
+                continue
+            except Exception:
+                breaker.record_error()
+                raise
+
+            if is_server_error is not None and is_server_error(result):
+                breaker.record_failure()
+                logger.warning(f"Attempt {attempt + 1}/{attempts} to {domain} returned a server error")
+                if is_last_attempt:
+                    return result
+                time.sleep(self.backoff(attempt))
+                continue
+
+            breaker.record_success()
+            return result
+
+
+DEFAULT_RESILIENCE_POLICY = ResiliencePolicy()
@@ -0,0 +1,330 @@
+"""
+On-disk cache of downloaded solutions
+
+Solution versions are immutable, so a (domain, solution name, version id) downloaded once never needs the
+network again. The decoded solutions are stored once per content hash under objects/, and a small index
+file per key points at them:
+
+    <root>/objects/ab/ab12...ef     the decoded solution, named by its sha256
+    <root>/index/34cd...01.json     {"sha256": ..., "size": ..., "solution_download_op_id": ...}
+
+Every file is written to a temporary name and renamed, so readers never see a partial file. Concurrent
+processes coordinate through a lock file: lookups share it, stores (and their eviction) take it. The least
+recently used solutions are evicted once the objects exceed the size budget, with the index entries pointing
+at them.
+
+The cache is private to a user: the default root is in the user's cache folder, it is created readable by its
+owner only, a root owned by another user is refused, and a lookup only returns an object of the cache owner
+whose size matches its index entry.
+"""
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import pathlib
+import tempfile
+import threading
+from typing import NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the cache is only safe for the threads of one process
+    fcntl = None
+
+DEFAULT_CACHE_DIR = (
+    pathlib.Path(os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache") / "simple-soap-tests" / "solutions"
+)
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+INDEX_FORMAT_VERSION = 1
+
+
+class CachedSolution(NamedTuple):
+    """A solution in the cache, the path stays valid until the solution is evicted"""
+
+    path: pathlib.Path
+    sha256: str
+    size: int
+    solution_download_op_id: int
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+    def mmap(self) -> mmap.mmap:
+        """
+        Maps the solution read-only, the mapping outlives an eviction of the file
+
+        Raises:
+            ValueError: if the solution is empty (an empty file cannot be mapped)
+        """
+
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _is_owned(stat: os.stat_result) -> bool:
+    return not hasattr(os, "getuid") or stat.st_uid == os.getuid()
+
+
+def _replace_atomically(path: pathlib.Path, write):
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+class SolutionCache:
+    """Content-addressed solution files with a size budget, shared by the processes using the same root"""
+
+    def __init__(self, root: pathlib.Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        super().__init__()
+        self._root = pathlib.Path(root)
+        self._objects = self._root / "objects"
+        self._index = self._root / "index"
+        self._max_bytes = max_bytes
+        self._thread_lock = threading.RLock()
+
+    @property
+    def root(self) -> pathlib.Path:
+        return self._root
+
+    @staticmethod
+    def is_cacheable(solution_version_id: int) -> bool:
+        """Only pinned versions are cached, version 0 (or None) downloads the current version of the solution"""
+
+        return bool(solution_version_id)
+
+    def _ensure_root(self):
+        """
+        Creates the root readable by its owner only
+
+        Raises:
+            PermissionError: if the root belongs to another user, who could then serve any file as a solution
+        """
+
+        self._root.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _is_owned(self._root.stat()):
+            raise PermissionError(f"The solution cache {self._root} belongs to another user")
+
+    @contextlib.contextmanager
+    def _lock(self, exclusive: bool):
+        with self._thread_lock:
+            self._ensure_root()
+            if fcntl is None:
+                yield
+                return
+
+            with open(self._root / "lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _index_path(self, domain: str, solution_name: str, solution_version_id: int) -> pathlib.Path:
+        key = f"{domain}\0{solution_name}\0{solution_version_id}".encode("utf-8")
+
+        return self._index / f"{hashlib.sha256(key).hexdigest()}.json"
+
+    def _object_path(self, sha256: str) -> pathlib.Path:
+        return self._objects / sha256[:2] / sha256
+
+    @staticmethod
+    def _is_intact(path: pathlib.Path, size: int) -> bool:
+        """True if the object exists, belongs to the cache owner and has the size of its index entry"""
+
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+
+        return _is_owned(stat) and stat.st_size == size
+
+    def get(self, domain: str, solution_name: str, solution_version_id: int) -> Optional[CachedSolution]:
+        """
+        Looks a solution up and marks it as recently used
+
+        Raises:
+            PermissionError: if the cache root belongs to another user
+
+        Returns:
+            Optional[CachedSolution]: the cached solution, None if it is not cached (or its object was altered)
+        """
+
+        if not self.is_cacheable(solution_version_id):
+            return None
+
+        with self._lock(exclusive=False):
+            try:
+                with open(self._index_path(domain, solution_name, solution_version_id)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if entry.get("format_version") != INDEX_FORMAT_VERSION:
+                return None
+
+            path = self._object_path(entry["sha256"])
+            if not self._is_intact(path, entry["size"]):
+                return None
+            try:
+                os.utime(path)
+            except OSError:
+                return None
+
+        return CachedSolution(path, entry["sha256"], entry["size"], entry["solution_download_op_id"])
+
+    @property
+    def incoming_dir(self) -> pathlib.Path:
+        """The folder to decode solutions into before put_file, on the file system of the cache"""
+
+        self._ensure_root()
+        path = self._root / "incoming"
+        path.mkdir(parents=True, exist_ok=True)
+
+        return path
+
+    def put(
+            self,
+            domain: str,
+            solution_name: str,
+            solution_version_id: int,
+            content: bytes,
+            solution_download_op_id: int,
+    ) -> CachedSolution:
+        """
+        Stores a downloaded solution, then evicts the least recently used ones beyond the size budget
+
+        The content of a version that is not pinned (see is_cacheable) is stored without an index entry: the
+        caller gets its file but later lookups miss.
+
+        Args:
+            domain (str): The host domain of the Service Center server
+            solution_name (str): The solution name
+            solution_version_id (int): The solution version identifier, see is_cacheable
+            content (bytes): The decoded solution
+            solution_download_op_id (int): The Solution Download Operation Id returned with it
+
+        Raises:
+            PermissionError: if the cache root belongs to another user
+
+        Returns:
+            CachedSolution: the stored solution
+        """
+
+        return self._add(
+            domain,
+            solution_name,
+            solution_version_id,
+            CachedSolution(None, hashlib.sha256(content).hexdigest(), len(content), solution_download_op_id),
+            lambda path: _replace_atomically(path, lambda f: f.write(content)),
+        )
+
+    def put_file(
+            self,
+            domain: str,
+            solution_name: str,
+            solution_version_id: int,
+            file_path: pathlib.Path,
+            sha256: str,
+            size: int,
+            solution_download_op_id: int,
+    ) -> CachedSolution:
+        """
+        Moves an already decoded solution into the cache, without reading it, see put
+
+        Args:
+            file_path (pathlib.Path): The decoded solution, in incoming_dir so it can be renamed into the cache
+            sha256 (str): Its sha256 hex digest
+            size (int): Its size
+
+        Returns:
+            CachedSolution: the stored solution
+        """
+
+        try:
+            return self._add(
+                domain,
+                solution_name,
+                solution_version_id,
+                CachedSolution(None, sha256, size, solution_download_op_id),
+                lambda path: os.replace(file_path, path),
+            )
+        finally:
+            # already stored under its hash by an earlier download
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(file_path)
+
+    def _add(self, domain: str, solution_name: str, solution_version_id: int, solution: CachedSolution, store):
+        path = self._object_path(solution.sha256)
+        index_path = self._index_path(domain, solution_name, solution_version_id)
+
+        with self._lock(exclusive=True):
+            if not self._is_intact(path, solution.size):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                store(path)
+            os.utime(path)
+
+            if self.is_cacheable(solution_version_id):
+                entry = {
+                    "format_version": INDEX_FORMAT_VERSION,
+                    "sha256": solution.sha256,
+                    "size": solution.size,
+                    "solution_download_op_id": solution.solution_download_op_id,
+                }
+                index_path.parent.mkdir(parents=True, exist_ok=True)
+                _replace_atomically(index_path, lambda f: f.write(json.dumps(entry).encode("utf-8")))
+
+            self._evict(keep=path)
+
+        return solution._replace(path=path)
+
+    def _evict(self, keep: pathlib.Path):
+        """
+        Deletes the least recently used objects until they fit the budget, and the index entries pointing at them
+
+        The caller holds the exclusive lock.
+        """
+
+        objects = []
+        for path in self._objects.glob("*/*"):
+            if path.name.startswith("."):
+                continue
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                objects.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in objects)
+        evicted = set()
+        for _, size, path in sorted(objects):
+            if total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total -= size
+                evicted.add(path.name)
+
+        if evicted:
+            for index_path in self._index.glob("*.json"):
+                try:
+                    with open(index_path) as f:
+                        sha256 = json.load(f).get("sha256")
+                except (OSError, ValueError):
+                    continue
+                if sha256 in evicted:
+                    with contextlib.suppress(OSError):
+                        index_path.unlink()
+
+    def clear(self):
+        """Deletes every cached solution"""
+
+        with self._lock(exclusive=True):
+            for path in list(self._objects.glob("*/*")) + list(self._index.glob("*")):
+                with contextlib.suppress(OSError):
+                    path.unlink()
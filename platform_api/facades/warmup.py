@@ -0,0 +1,150 @@
+"""
+Warms a process up for the domains it is about to call, before the traffic arrives
+
+The first call to a domain pays for the WSDL download and its suds parse, and with a transport keeping its
+connections (PooledRequestsTransport, Http2Transport) for the DNS lookup and the TLS handshake. warmup does
+all of them for every domain at once: the parsed WSDLs go to the warm client cache of the process, cloned by
+every facade, and the connections to the pool of the transport.
+
+    with Http2Transport() as transport:
+        for domain, result in warmup(["dev.example.com", "prd.example.com"], transport=transport).items():
+            print(domain, result.seconds, result.errors)
+        lifetime = LifetimeFacade(transport=transport)
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from platform_api.facades.base_model import GenericError
+from platform_api.facades.protocol_wrappers.http_transport import DEFAULT_TRANSPORT, HttpTransport
+from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import (
+    USER_MANAGEMENT_SERVICE_WSDL,
+    LifeTimeSoapWrapperService,
+)
+from platform_api.facades.protocol_wrappers.platform_soap_wrapper import (
+    OUTSYSTEMS_PLATFORM_SERVICE_WSDL,
+    OUTSYSTEMS_SC_SOLUTIONS_WSDL,
+    ServiceCenterSoapWrapperService,
+)
+from platform_api.facades.protocol_wrappers.resilience import DEFAULT_RESILIENCE_POLICY, ResiliencePolicy
+
+USER_MANAGEMENT_SERVICE = "UserManagementService.asmx"
+OUTSYSTEMS_PLATFORM_SERVICE = "OutSystemsPlatform.asmx"
+SOLUTIONS_SERVICE = "Solutions.asmx"
+# the connection of the transport used by the REST wrappers
+REST_CONNECTION = "rest"
+
+LIFETIME_SERVICES = (USER_MANAGEMENT_SERVICE, REST_CONNECTION)
+SERVICE_CENTER_SERVICES = (OUTSYSTEMS_PLATFORM_SERVICE, SOLUTIONS_SERVICE, REST_CONNECTION)
+ALL_SERVICES = (USER_MANAGEMENT_SERVICE, OUTSYSTEMS_PLATFORM_SERVICE, SOLUTIONS_SERVICE, REST_CONNECTION)
+
+DEFAULT_WARMUP_WORKERS = 16
+
+
+class WarmupResult(NamedTuple):
+    """
+    The warm-up of a domain: its duration and that of each service, in seconds, and the errors of the services
+
+    The errors are the GenericError of the resilience policy, or whatever else the service raised, e.g. the suds
+    error of a WSDL that cannot be parsed.
+    """
+
+    seconds: float
+    services: Dict[str, float]
+    errors: Dict[str, Exception]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _wsdl_warmer(wrapper_class: type, url: str) -> Callable[[str, ResiliencePolicy, HttpTransport], None]:
+    def _warm(domain: str, resilience_policy: ResiliencePolicy, transport: HttpTransport):
+        # the url of the wrapper calls, the key of the warm client
+        wrapper_class(resilience_policy=resilience_policy)._warm_client(url.format(domain=domain), faults=False)
+
+    return _warm
+
+
+def _warm_connection(domain: str, resilience_policy: ResiliencePolicy, transport: HttpTransport):
+    resilience_policy.execute(
+        domain=domain,
+        operation=lambda: transport.connect(f"https://{domain}/", timeout=resilience_policy.timeout),
+        error_class=GenericError,
+        idempotent=True,
+    )
+
+
+_WARMERS = {
+    USER_MANAGEMENT_SERVICE: _wsdl_warmer(
+        LifeTimeSoapWrapperService, "https://{domain}/" + USER_MANAGEMENT_SERVICE_WSDL
+    ),
+    OUTSYSTEMS_PLATFORM_SERVICE: _wsdl_warmer(
+        ServiceCenterSoapWrapperService, "https://{domain}" + OUTSYSTEMS_PLATFORM_SERVICE_WSDL
+    ),
+    SOLUTIONS_SERVICE: _wsdl_warmer(
+        ServiceCenterSoapWrapperService, "https://{domain}" + OUTSYSTEMS_SC_SOLUTIONS_WSDL
+    ),
+    REST_CONNECTION: _warm_connection,
+}
+
+
+def warmup(
+        domains: List[str],
+        services: Iterable[str] = ALL_SERVICES,
+        resilience_policy: ResiliencePolicy = None,
+        transport: HttpTransport = None,
+        workers: int = DEFAULT_WARMUP_WORKERS,
+) -> Dict[str, WarmupResult]:
+    """
+    Prefetches and parses the WSDLs of the services, and opens the connections of the transport, for every domain
+
+    The (domain, service) pairs are warmed concurrently. A service that fails is reported in the errors of its
+    domain, the others are still warmed.
+
+    Args:
+        domains (List[str]): The host domains of the servers
+        services (Iterable[str], optional): Some of ALL_SERVICES. Defaults to all of them.
+        resilience_policy (ResiliencePolicy, optional): The policy of the facades to warm up
+        transport (HttpTransport, optional): The transport of the facades to warm up
+        workers (int, optional): The number of threads
+
+    Raises:
+        ValueError: if a service is unknown
+
+    Returns:
+        Dict[str, WarmupResult]: the warm-up of each domain
+    """
+
+    resilience_policy = resilience_policy or DEFAULT_RESILIENCE_POLICY
+    transport = transport or DEFAULT_TRANSPORT
+    services = list(services)
+    unknown = [service for service in services if service not in _WARMERS]
+    if unknown:
+        raise ValueError(f"Unknown services {', '.join(unknown)}, expected some of {', '.join(ALL_SERVICES)}")
+
+    def _warm(task: Tuple[str, str]) -> Tuple[float, float, Optional[Exception]]:
+        domain, service = task
+        started = time.perf_counter()
+        try:
+            _WARMERS[service](domain, resilience_policy, transport)
+        except Exception as e:
+            return started, time.perf_counter(), e
+
+        return started, time.perf_counter(), None
+
+    tasks = [(domain, service) for domain in domains for service in services]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tasks)))) as executor:
+        outcomes = list(executor.map(_warm, tasks))
+
+    results = {}
+    for domain in domains:
+        warmed = {service: outcome for (d, service), outcome in zip(tasks, outcomes) if d == domain}
+        results[domain] = WarmupResult(
+            seconds=max((ended for _, ended, _ in warmed.values()), default=start) - start,
+            services={service: ended - started for service, (started, ended, _) in warmed.items()},
+            errors={service: error for service, (_, _, error) in warmed.items() if error is not None},
+        )
+
+    return results
@@ -12,8 +12,20 @@ setup(
     url="https://localhost",
     install_requires=[
     ],
+    extras_require={"http2": ["httpx[http2]"]},
     keywords="utilities",
     packages=find_packages(),
+    py_modules=[
+        "no_ssl_verification",
+        "stub_bundle",
+        "stubbing_utils",
+        "wiremock_launcher",
+        "wiremock_pool",
+        "wiremock_pytest_plugin",
+        "wiremock_service",
+        "wsdl_stub_generator",
+    ],
+    entry_points={"pytest11": ["wiremock_pytest_plugin = wiremock_pytest_plugin"]},
     include_package_data=True,
     python_requires=">=3.8",
     classifiers=[
@@ -0,0 +1,151 @@
+"""
+The SOAP endpoints and the request and response templates of the stubs shared by the load runner, the
+benchmark suite and the scenario tests
+
+The *_TEMPLATE strings are str.format templates, their ${xmlunit.ignore} placeholders are escaped as
+${{xmlunit.ignore}}.
+"""
+
+USER_MANAGEMENT_SOAP_OPERATIONS_URL = "/LifeTimeServices/UserManagementService.asmx?wsdl"
+PLATFORM_API_SOAP_OPERATIONS_URL = "/ServiceCenter/OutSystemsPlatform.asmx?wsdl"
+PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL = "/ServiceCenter/Solutions.asmx?wsdl"
+
+USER_CREATE_OR_UPDATE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:User_CreateOrUpdate>
+         <out:Authentication>
+            <out:Username>${{xmlunit.ignore}}</out:Username>
+            <out:Password>${{xmlunit.ignore}}</out:Password>
+         </out:Authentication>
+         <out:Username>{username}</out:Username>
+         <out:Password>${{xmlunit.ignore}}</out:Password>
+         <out:EncryptPassword>${{xmlunit.ignore}}</out:EncryptPassword>
+         <out:Name>${{xmlunit.ignore}}</out:Name>
+         <out:Email>${{xmlunit.ignore}}</out:Email>
+         <out:RoleName>${{xmlunit.ignore}}</out:RoleName>
+      </out:User_CreateOrUpdate>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+USER_CREATE_OR_UPDATE_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <User_CreateOrUpdateResponse xmlns="http://www.outsystems.com">
+            <Success>true</Success>
+            <Status>
+                <Id>1</Id>
+                <ResponseId>1</ResponseId>
+                <ResponseMessage>OK</ResponseMessage>
+                <ResponseAdditionalInfo/>
+            </Status>
+            <PlatformUser>
+                <Id>{{randomValue length=4 type='NUMERIC'}}</Id>
+            </PlatformUser>
+        </User_CreateOrUpdateResponse>
+    </soap:Body>
+</soap:Envelope>"""
+
+USER_CHANGE_PASSWORD_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:User_ChangePassword>
+         <out:Authentication>
+            <out:Username>${{xmlunit.ignore}}</out:Username>
+            <out:Password>${{xmlunit.ignore}}</out:Password>
+         </out:Authentication>
+         <out:Username>{username}</out:Username>
+         <out:NewPassword>${{xmlunit.ignore}}</out:NewPassword>
+         <out:EncryptPassword>${{xmlunit.ignore}}</out:EncryptPassword>
+      </out:User_ChangePassword>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+USER_SET_INACTIVE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:User_SetInactive>
+         <out:Authentication>
+            <out:Username>${{xmlunit.ignore}}</out:Username>
+            <out:Password>${{xmlunit.ignore}}</out:Password>
+         </out:Authentication>
+         <out:Username>{username}</out:Username>
+      </out:User_SetInactive>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+USER_STATUS_RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <{operation}Response xmlns="http://www.outsystems.com">
+            <Success>true</Success>
+            <Status>
+                <Id>1</Id>
+                <ResponseId>1</ResponseId>
+                <ResponseMessage>OK</ResponseMessage>
+                <ResponseAdditionalInfo/>
+            </Status>
+        </{operation}Response>
+    </soap:Body>
+</soap:Envelope>"""
+
+GET_PLATFORM_INFO_REQUEST = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:GetPlatformInfo/>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+GET_PLATFORM_INFO_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+<soap:Body>
+    <GetPlatformInfoResponse xmlns="http://www.outsystems.com">
+        <Version>11.12345</Version>
+        <Serial>LOADLOADLOADLOADLOADLOAD</Serial>
+    </GetPlatformInfoResponse>
+</soap:Body>
+</soap:Envelope>"""
+
+CREATE_ALL_SOLUTION_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:CreateAllSolution>
+         <out:AllSolutionName>{solution_name}</out:AllSolutionName>
+         <out:username>${{xmlunit.ignore}}</out:username>
+         <out:password>${{xmlunit.ignore}}</out:password>
+      </out:CreateAllSolution>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+CREATE_ALL_SOLUTION_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+<soap:Body>
+    <CreateAllSolutionResponse xmlns="http://www.outsystems.com">
+        <SolutionId>1000</SolutionId>
+    </CreateAllSolutionResponse>
+</soap:Body>
+</soap:Envelope>"""
+
+SOLUTION_DOWNLOAD_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:Download>
+         <out:SolutionName>{solution_name}</out:SolutionName>
+         <out:SolutionVersionId>{solution_version_id}</out:SolutionVersionId>
+         <out:username>${{xmlunit.ignore}}</out:username>
+         <out:password>${{xmlunit.ignore}}</out:password>
+      </out:Download>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+SOLUTION_DOWNLOAD_RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+<soap:Body>
+    <DownloadResponse xmlns="http://www.outsystems.com">
+        <SolutionDownloadOpId>1000</SolutionDownloadOpId>
+        <file>{file_content}</file>
+    </DownloadResponse>
+</soap:Body>
+</soap:Envelope>"""
+
+GET_INFRASTRUCTURE_RESPONSE = """[{"Key": "env-1", "Name": "Development", "IsLifeTime": false, "HostName": "dev.example.com"}]"""
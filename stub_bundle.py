@@ -0,0 +1,195 @@
+"""
+Single-file, compressed and content-addressed bundle of the default stubs
+
+The bundle is a gzip-compressed JSON document holding the mappings of defaults/mappings and the bodies of
+defaults/responses. Bodies are stored once per content hash and the mappings refer to them by that hash,
+so identical responses are shipped and uploaded once:
+
+    {
+        "format_version": 1,
+        "mappings": [{..., "response": {"bodyFileName": "<sha256>.xml"}}],
+        "bodies": {"<sha256>.xml": {"text": "..."}}
+    }
+
+    inv build-stub-bundle
+    inv setup-static-mappings --bundle build/default_stubs.bundle.gz
+
+Loading uploads each distinct body and then imports every mapping in one streamed request.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict, List, NamedTuple, Tuple
+
+from wiremock_service import WireMockService
+
+FORMAT_VERSION = 1
+
+ROOT_PATH = pathlib.Path(os.path.dirname(os.path.realpath(__file__)))
+DEFAULTS_PATH = ROOT_PATH / "defaults"
+DEFAULT_BUNDLE_PATH = ROOT_PATH / "build" / "default_stubs.bundle.gz"
+
+
+class StubBundle(NamedTuple):
+    """The mappings and the deduplicated bodies they refer to"""
+
+    mappings: List[dict]
+    bodies: Dict[str, bytes]
+
+
+def content_address(content: bytes, suffix: str = "") -> str:
+    """The file name of a body in the bundle: its sha256, with the original suffix for the content type"""
+
+    return f"{hashlib.sha256(content).hexdigest()}{suffix}"
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(body: dict) -> bytes:
+    if "text" in body:
+        return body["text"].encode("utf-8")
+
+    return base64.b64decode(body["base64"])
+
+
+def collect_defaults(defaults_path: pathlib.Path = DEFAULTS_PATH) -> StubBundle:
+    """
+    Reads the mappings and responses folders into a bundle
+
+    Args:
+        defaults_path (pathlib.Path): The folder holding the mappings and responses folders
+
+    Raises:
+        FileNotFoundError: if a mapping refers to a body file missing from the responses folder
+
+    Returns:
+        StubBundle: the mappings, with bodyFileName pointing at the content addressed bodies
+    """
+
+    addresses: Dict[str, str] = {}
+    bodies: Dict[str, bytes] = {}
+    for body_file in sorted((defaults_path / "responses").glob("*")):
+        content = body_file.read_bytes()
+        address = content_address(content, body_file.suffix)
+        addresses[body_file.name] = address
+        bodies[address] = content
+
+    mappings = []
+    for mapping_file in sorted((defaults_path / "mappings").glob("*.json")):
+        with open(mapping_file) as f:
+            for mapping in json.load(f)["mappings"]:
+                body_file_name = mapping.get("response", {}).get("bodyFileName")
+                if body_file_name is not None:
+                    if body_file_name not in addresses:
+                        raise FileNotFoundError(f"{mapping_file.name} refers to a missing body {body_file_name}")
+                    response = {**mapping["response"], "bodyFileName": addresses[body_file_name]}
+                    mapping = {**mapping, "response": response}
+                mappings.append(mapping)
+
+    # the bodies no mapping refers to are left out, nothing else knows their address
+    referenced = {
+        mapping["response"]["bodyFileName"] for mapping in mappings if "bodyFileName" in mapping.get("response", {})
+    }
+    return StubBundle(mappings=mappings, bodies={address: bodies[address] for address in sorted(referenced)})
+
+
+def write_bundle(bundle: StubBundle, path: pathlib.Path = DEFAULT_BUNDLE_PATH) -> pathlib.Path:
+    """Writes the bundle as gzip-compressed JSON"""
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    document = {
+        "format_version": FORMAT_VERSION,
+        "mappings": bundle.mappings,
+        "bodies": {address: _encode_body(content) for address, content in sorted(bundle.bodies.items())},
+    }
+    # no file name nor timestamp in the gzip header, so identical bundles are byte identical
+    with open(path, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as f:
+        f.write(json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+    return path
+
+
+def read_bundle(path: pathlib.Path = DEFAULT_BUNDLE_PATH) -> StubBundle:
+    """
+    Reads a bundle written by write_bundle
+
+    Raises:
+        ValueError: if the bundle was written in another format version
+
+    Returns:
+        StubBundle: the mappings and bodies of the bundle
+    """
+
+    with gzip.open(path, "rb") as f:
+        document = json.load(f)
+
+    if document.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path} has format version {document.get('format_version')}, expected {FORMAT_VERSION}")
+
+    return StubBundle(
+        mappings=document["mappings"],
+        bodies={address: _decode_body(body) for address, body in document["bodies"].items()},
+    )
+
+
+def build_bundle(
+        defaults_path: pathlib.Path = DEFAULTS_PATH, path: pathlib.Path = DEFAULT_BUNDLE_PATH
+) -> Tuple[pathlib.Path, StubBundle]:
+    """Collects the defaults folder and writes it as a bundle"""
+
+    bundle = collect_defaults(defaults_path)
+
+    return write_bundle(bundle, path), bundle
+
+
+def load_bundle(wiremock: WireMockService, path: pathlib.Path = DEFAULT_BUNDLE_PATH) -> StubBundle:
+    """
+    Uploads the bodies of a bundle and imports its mappings in one request
+
+    Args:
+        wiremock (WireMockService): The WireMock to load the stubs in
+        path (pathlib.Path): The bundle file
+
+    Returns:
+        StubBundle: the loaded bundle
+    """
+
+    bundle = read_bundle(path)
+
+    wiremock.upload_files(bundle.bodies.items())
+    wiremock.import_mappings(bundle.mappings)
+
+    return bundle
+
+
+def extract_bundle(root_dir: pathlib.Path, path: pathlib.Path = DEFAULT_BUNDLE_PATH) -> pathlib.Path:
+    """
+    Writes a bundle as a WireMock root folder (mappings/ and __files/), loaded by WireMock at startup
+
+        java -jar wiremock-jre8-standalone-2.28.1.jar --root-dir <root_dir> ...
+
+    Returns:
+        pathlib.Path: the root folder
+    """
+
+    bundle = read_bundle(path)
+    root_dir = pathlib.Path(root_dir)
+    (root_dir / "mappings").mkdir(parents=True, exist_ok=True)
+    (root_dir / "__files").mkdir(parents=True, exist_ok=True)
+
+    for address, content in bundle.bodies.items():
+        (root_dir / "__files" / address).write_bytes(content)
+    with open(root_dir / "mappings" / "default_stubs.json", "w") as f:
+        json.dump({"mappings": bundle.mappings}, f)
+
+    return root_dir
@@ -0,0 +1,215 @@
+"""
+Records real Lifetime / Service Center traffic into mapping files the static loader can ingest
+
+WireMock proxies the calls to the real server and records them:
+
+    inv record-start --target https://lifetime.example.com
+    (point the facades' domain at the WireMock, e.g. localhost:8433, and run the operations to capture)
+    inv record-stop --name lifetime_user_management
+
+The recorded mappings are normalized (credentials become ${xmlunit.ignore} placeholders), deduplicated
+and written to defaults/mappings/recorded_<name>.json, with the large response bodies moved to
+defaults/responses so tasks.setup_static_mappings uploads them once.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterable, List
+
+from wiremock_service import WireMockService
+
+XMLUNIT_IGNORE = "${xmlunit.ignore}"
+
+# element local names whose value changes between environments or runs, wherever they appear
+VOLATILE_ELEMENTS = {"Password", "Token", "username", "password"}
+# element local names that are only volatile inside the given parent (User_SetInactive has its own Username)
+VOLATILE_CHILD_ELEMENTS = {"Authentication": {"Username", "Password", "Token"}}
+
+BODY_FILE_THRESHOLD = 4 * 1024
+
+DEFAULTS_PATH = pathlib.Path(os.path.dirname(os.path.realpath(__file__))) / "defaults"
+
+RECORDING_SPEC = {
+    "persist": False,
+    "repeatsAsScenarios": False,
+    "requestBodyPattern": {"matcher": "equalToXml", "enablePlaceholders": True},
+}
+
+# mapping fields added by the recorder that only bloat the files
+RECORDER_FIELDS = ("id", "uuid", "insertionIndex", "scenarioName", "requiredScenarioState", "newScenarioState")
+KEPT_RESPONSE_HEADERS = {"content-type"}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def normalize_xml(xml: str, volatile_elements: Iterable[str] = VOLATILE_ELEMENTS) -> str:
+    """
+    Replaces the text of the volatile elements with the ${xmlunit.ignore} placeholder
+
+    Args:
+        xml (str): The request envelope
+        volatile_elements (Iterable[str]): Local names of the elements to ignore anywhere
+
+    Returns:
+        str: the normalized envelope, or the original one if it is not valid XML
+    """
+
+    try:
+        root = ElementTree.fromstring(xml)
+    except ElementTree.ParseError:
+        return xml
+
+    volatile_elements = set(volatile_elements)
+
+    def _normalize(element, parent_name: str):
+        name = _local_name(element.tag)
+        if len(element) == 0 and (
+            name in volatile_elements or name in VOLATILE_CHILD_ELEMENTS.get(parent_name, ())
+        ):
+            element.text = XMLUNIT_IGNORE
+        for child in element:
+            _normalize(child, name)
+
+    _normalize(root, "")
+
+    return ElementTree.tostring(root, encoding="unicode")
+
+
+def normalize_mapping(mapping: dict) -> dict:
+    """
+    Turns a recorded mapping into a compact, environment independent one
+
+    Args:
+        mapping (dict): A stub mapping returned by the WireMock recorder
+
+    Returns:
+        dict: the normalized mapping
+    """
+
+    mapping = {k: v for k, v in mapping.items() if k not in RECORDER_FIELDS}
+    request = dict(mapping["request"])
+    response = dict(mapping["response"])
+
+    body_patterns = []
+    for pattern in request.get("bodyPatterns", []):
+        if "equalToXml" in pattern:
+            pattern = {"equalToXml": normalize_xml(pattern["equalToXml"]), "enablePlaceholders": True}
+        body_patterns.append(pattern)
+    if body_patterns:
+        request["bodyPatterns"] = body_patterns
+
+    headers = {k: v for k, v in (response.get("headers") or {}).items() if k.lower() in KEPT_RESPONSE_HEADERS}
+    if headers:
+        response["headers"] = headers
+    else:
+        response.pop("headers", None)
+
+    mapping["request"] = request
+    mapping["response"] = response
+    mapping["persistent"] = True
+    mapping["metadata"] = {**(mapping.get("metadata") or {}), "recorded": "true"}
+
+    return mapping
+
+
+def _request_key(mapping: dict) -> str:
+    return hashlib.sha256(json.dumps(mapping["request"], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _is_wsdl_download(mapping: dict) -> bool:
+    request = mapping["request"]
+    url = request.get("url") or request.get("urlPattern") or ""
+
+    return request.get("method") == "GET" and url.lower().endswith("?wsdl")
+
+
+def dedupe_mappings(mappings: Iterable[dict]) -> List[dict]:
+    """Keeps the first mapping of each distinct request matcher"""
+
+    unique: Dict[str, dict] = {}
+    for mapping in mappings:
+        unique.setdefault(_request_key(mapping), mapping)
+
+    return list(unique.values())
+
+
+def write_mapping_file(
+        mappings: List[dict],
+        name: str,
+        defaults_path: pathlib.Path = DEFAULTS_PATH,
+        body_file_threshold: int = BODY_FILE_THRESHOLD,
+) -> pathlib.Path:
+    """
+    Writes the mappings in the defaults/mappings format, moving large bodies to defaults/responses
+
+    The body files are named after their content hash, so identical bodies are stored once.
+
+    Args:
+        mappings (List[dict]): The normalized mappings
+        name (str): The name of the recording
+        defaults_path (pathlib.Path): The folder holding the mappings and responses folders
+        body_file_threshold (int): The body size, in bytes, from which the body goes to its own file
+
+    Returns:
+        pathlib.Path: the path of the mapping file
+    """
+
+    responses_path = defaults_path / "responses"
+    mappings_path = defaults_path / "mappings"
+    responses_path.mkdir(parents=True, exist_ok=True)
+    mappings_path.mkdir(parents=True, exist_ok=True)
+
+    compact = []
+    for mapping in mappings:
+        response = dict(mapping["response"])
+        body = response.get("body")
+        if body is not None and len(body.encode("utf-8")) >= body_file_threshold:
+            file_name = f"recorded_{hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]}.xml"
+            body_file = responses_path / file_name
+            if not body_file.exists():
+                body_file.write_text(body, encoding="utf-8")
+            del response["body"]
+            response["bodyFileName"] = file_name
+        compact.append({**mapping, "response": response})
+
+    mapping_file = mappings_path / f"recorded_{name}.json"
+    with open(mapping_file, "w") as f:
+        json.dump({"mappings": compact}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    return mapping_file
+
+
+def start_recording(wiremock: WireMockService, target_base_url: str):
+    """Makes WireMock proxy every request to target_base_url and record it"""
+
+    wiremock.start_recording({**RECORDING_SPEC, "targetBaseUrl": target_base_url})
+
+
+def stop_recording(
+        wiremock: WireMockService, name: str, defaults_path: pathlib.Path = DEFAULTS_PATH, skip_wsdl: bool = True
+) -> pathlib.Path:
+    """
+    Stops the recording and writes the normalized, deduplicated mappings
+
+    Args:
+        wiremock (WireMockService): The recording WireMock
+        name (str): The name of the recording
+        defaults_path (pathlib.Path): The folder holding the mappings and responses folders
+        skip_wsdl (bool): Drop the WSDL downloads, the static mappings already serve them
+
+    Returns:
+        pathlib.Path: the path of the mapping file
+    """
+
+    recorded = wiremock.stop_recording().get("mappings", [])
+    if skip_wsdl:
+        recorded = [mapping for mapping in recorded if not _is_wsdl_download(mapping)]
+
+    mappings = dedupe_mappings(normalize_mapping(mapping) for mapping in recorded)
+
+    return write_mapping_file(mappings, name, defaults_path)
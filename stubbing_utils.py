@@ -1,43 +1,396 @@
+import functools
+import hashlib
 import uuid
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from xml.etree import ElementTree
 
-from wiremock_service import WireMockService
+from wiremock_service import WireMockService, is_uploaded
+from wsdl_stub_generator import OperationStub
+
+# WireMock fault types (https://wiremock.org/docs/simulating-faults/)
+FAULT_EMPTY_RESPONSE = "EMPTY_RESPONSE"
+FAULT_MALFORMED_RESPONSE_CHUNK = "MALFORMED_RESPONSE_CHUNK"
+FAULT_RANDOM_DATA_THEN_CLOSE = "RANDOM_DATA_THEN_CLOSE"
+FAULT_CONNECTION_RESET_BY_PEER = "CONNECTION_RESET_BY_PEER"
+
+# response bodies from this size on are uploaded once as a body file and referred to with bodyFileName
+BODY_FILE_THRESHOLD = 4 * 1024
+
+XMLUNIT_IGNORE = "${xmlunit.ignore}"
+
+# request body matchers: equalToXml by default, MATCH_XPATH opts into matchesXPath on the operation element and
+# its leaves where the expected request allows it (equalToXml otherwise)
+MATCH_XPATH = "xpath"
+MATCH_XML = "xml"
+
+XML_CACHE_SIZE = 1024
 
 
 def new_run_id() -> str:
     return str(uuid.uuid4())
 
 
+def fixed_delay(milliseconds: int) -> dict:
+    """Every response is delayed by the same amount of time"""
+
+    return {"fixedDelayMilliseconds": milliseconds}
+
+
+def uniform_delay(lower_milliseconds: int, upper_milliseconds: int) -> dict:
+    """Responses are delayed by a random time between lower and upper"""
+
+    if lower_milliseconds > upper_milliseconds:
+        raise ValueError("the lower bound of the delay must not exceed the upper bound")
+
+    return {"delayDistribution": {"type": "uniform", "lower": lower_milliseconds, "upper": upper_milliseconds}}
+
+
+def lognormal_delay(median_milliseconds: int, sigma: float) -> dict:
+    """
+    Responses are delayed following a lognormal distribution, a good model of real service tail latency
+
+    Args:
+        median_milliseconds (int): the 50th percentile of the delay
+        sigma (float): the standard deviation, the higher it is the longer the tail
+    """
+
+    return {"delayDistribution": {"type": "lognormal", "median": median_milliseconds, "sigma": sigma}}
+
+
+def chunked_dribble_delay(number_of_chunks: int, total_duration_milliseconds: int) -> dict:
+    """The response body is sent in chunks spread over the total duration (a slow network)"""
+
+    return {"chunkedDribbleDelay": {"numberOfChunks": number_of_chunks, "totalDuration": total_duration_milliseconds}}
+
+
+def connection_reset() -> dict:
+    """The connection is reset by the server before any response is sent"""
+
+    return {"fault": FAULT_CONNECTION_RESET_BY_PEER}
+
+
+def empty_response() -> dict:
+    """The connection is closed without sending a response"""
+
+    return {"fault": FAULT_EMPTY_RESPONSE}
+
+
+def malformed_response() -> dict:
+    """An OK status is sent followed by garbage and the connection is closed"""
+
+    return {"fault": FAULT_MALFORMED_RESPONSE_CHUNK}
+
+
+def random_data_then_close() -> dict:
+    """Garbage is sent and the connection is closed"""
+
+    return {"fault": FAULT_RANDOM_DATA_THEN_CLOSE}
+
+
+FAULT_BUILDERS = {
+    FAULT_CONNECTION_RESET_BY_PEER: connection_reset,
+    FAULT_EMPTY_RESPONSE: empty_response,
+    FAULT_MALFORMED_RESPONSE_CHUNK: malformed_response,
+    FAULT_RANDOM_DATA_THEN_CLOSE: random_data_then_close,
+}
+
+
+def body_file_name(body: bytes, suffix: str = ".xml") -> str:
+    """The content addressed name of a body file, identical bodies share the file"""
+
+    return f"{hashlib.sha256(body).hexdigest()}{suffix}"
+
+
+def _response_body(wiremock: WireMockService, body: Optional[str], suffix: str) -> dict:
+    """
+    The body of a stub response: inline when small, otherwise a body file uploaded once per WireMock, and again
+    after its mappings were reset (see wiremock_service.is_uploaded)
+
+    WireMock applies the response-template transformer to body files as well, so the variable parts of a
+    large body can be templated (e.g. {{request.path}}) and the body file shared by every run.
+    """
+
+    if body is None or len(body) < BODY_FILE_THRESHOLD:
+        return {"body": "" if body is None else body}
+
+    content = body.encode("utf-8")
+    file_name = body_file_name(content, suffix)
+    if not is_uploaded(wiremock.base_url, file_name):
+        wiremock.upload_file(file_name=file_name, file_content=content)
+
+    return {"bodyFileName": file_name}
+
+
+@functools.lru_cache(maxsize=XML_CACHE_SIZE)
+def canonicalize_xml(xml: str) -> str:
+    """
+    The C14N 2.0 form of an expected request: no comments, no whitespace-only text, n0, n1... prefixes
+
+    The result is memoized, the templates of a test module are canonicalized once per process.
+
+    Args:
+        xml (str): The expected request
+
+    Returns:
+        str: the canonical XML, or the original one if it is not well formed
+    """
+
+    try:
+        return ElementTree.canonicalize(xml, strip_text=True, rewrite_prefixes=True)
+    except ElementTree.ParseError:
+        return xml
+
+
+class _NotExpressible(Exception):
+    pass
+
+
+def _xpath_literal(text: str) -> str:
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+
+    raise _NotExpressible(text)
+
+
+@functools.lru_cache(maxsize=XML_CACHE_SIZE)
+def xpath_matcher(xml: str) -> Optional[dict]:
+    """
+    A matchesXPath body pattern standing in for equalToXml on an expected SOAP request, when there is one
+
+    The expression selects the operation element of the envelope with one predicate per literal leaf, the
+    ${xmlunit.ignore} leaves are only checked to exist. WireMock evaluates it on the parsed request instead of diffing
+    the whole document against the expected one. Unlike equalToXml it does not reject extra elements nor a
+    different element order. Requests with attributes, mixed content or other placeholders keep equalToXml.
+
+    Args:
+        xml (str): The expected request
+
+    Returns:
+        Optional[dict]: the body pattern, None if equalToXml is needed
+    """
+
+    try:
+        envelope = ElementTree.fromstring(xml)
+    except ElementTree.ParseError:
+        return None
+
+    namespaces: Dict[str, str] = {}
+
+    def _name(element) -> str:
+        uri, _, local = element.tag[1:].partition("}") if element.tag.startswith("{") else ("", "", element.tag)
+        if not uri:
+            return local
+        return f"{namespaces.setdefault(uri, f'ns{len(namespaces)}')}:{local}"
+
+    def _checks(element, path: Tuple[str, ...]) -> List[str]:
+        text = (element.text or "").strip()
+        children = list(element)
+        if element.attrib or (children and text) or any((child.tail or "").strip() for child in children):
+            raise _NotExpressible(element.tag)
+        if not children:
+            if text == XMLUNIT_IGNORE:
+                return [f"[{'/'.join(path) or '.'}]"]
+            if "${" in text:
+                raise _NotExpressible(text)
+            return [f"[{'/'.join(path) or '.'}={_xpath_literal(text)}]"]
+
+        return [check for child in children for check in _checks(child, path + (_name(child),))]
+
+    body = [child for child in envelope if child.tag.endswith("}Body")]
+    if len(body) != 1 or len(body[0]) != 1:
+        return None
+    operation = body[0][0]
+
+    try:
+        location = f"/{_name(envelope)}/{_name(body[0])}/{_name(operation)}"
+        checks = _checks(operation, ())
+    except _NotExpressible:
+        return None
+
+    return {
+        "matchesXPath": location + "".join(checks),
+        "xPathNamespaces": {prefix: uri for uri, prefix in namespaces.items()},
+    }
+
+
+def soap_body_pattern(expected_request: str, request_matcher: str = MATCH_XML) -> dict:
+    """The body pattern matching an expected SOAP request, see xpath_matcher and canonicalize_xml"""
+
+    if request_matcher == MATCH_XPATH:
+        pattern = xpath_matcher(expected_request)
+        if pattern is not None:
+            return pattern
+
+    return {"equalToXml": canonicalize_xml(expected_request), "enablePlaceholders": True}
+
+
+def _legacy_behaviours(fixed_delay_milliseconds: int = None, fault: str = None) -> List[dict]:
+    """The response behaviours equivalent to the fixed_delay_milliseconds and fault shorthands"""
+
+    behaviours = []
+    if fixed_delay_milliseconds is not None:
+        behaviours.append(fixed_delay(fixed_delay_milliseconds))
+    if fault is not None:
+        if fault not in FAULT_BUILDERS:
+            raise ValueError(f"unknown WireMock fault {fault!r}, expected one of {sorted(FAULT_BUILDERS)}")
+        behaviours.append(FAULT_BUILDERS[fault]())
+
+    return behaviours
+
+
+def _apply_response_faults(
+        response: dict,
+        fixed_delay_milliseconds: int = None,
+        fault: str = None,
+        response_behaviours: List[dict] = None
+) -> dict:
+    """
+    Adds the WireMock delay and fault settings to a stub response definition
+
+    fixed_delay_milliseconds and fault are shorthands for the fixed_delay and fault builders, applied before
+    response_behaviours.
+    """
+
+    for behaviour in _legacy_behaviours(fixed_delay_milliseconds, fault) + list(response_behaviours or []):
+        response.update(behaviour)
+
+    return response
+
+
 def register_soap_mapping(
         wiremock: WireMockService,
         run_id: str,
         soap_operations_url: str,
         expected_request: str,
         expected_response: str = None,
-        http_status_code=200
+        http_status_code=200,
+        fixed_delay_milliseconds: int = None,
+        fault: str = None,
+        response_behaviours: List[dict] = None,
+        request_matcher: str = MATCH_XML
 ):
+    """
+    Registers a SOAP stub matched on the body of the request
+
+    The body must be equal to the expected request, or with request_matcher=MATCH_XPATH only contain its literal
+    leaves (see xpath_matcher), which WireMock evaluates faster but matches more loosely.
+    """
+
     wiremock.post_mapping(
         {
             "request": {
                 "method": "POST",
                 "url": soap_operations_url,
-                "bodyPatterns": [
-                    {
-                        "equalToXml": expected_request,
-                        "enablePlaceholders": True
-                    }
-                ]
+                "bodyPatterns": [soap_body_pattern(expected_request, request_matcher)]
             },
-            "response": {
-                "status": http_status_code,
-                "headers": {
-                    "Content-Type": "application/xml"
+            "response": _apply_response_faults(
+                {
+                    "status": http_status_code,
+                    "headers": {
+                        "Content-Type": "application/xml"
+                    },
+                    **_response_body(wiremock, expected_response, ".xml"),
+                    "transformers": ["response-template"]
                 },
-                "body": "" if expected_response is None else expected_response,
-                "transformers": ["response-template"]
-            },
+                fixed_delay_milliseconds=fixed_delay_milliseconds,
+                fault=fault,
+                response_behaviours=response_behaviours,
+            ),
             "persistent": True,
             "priority": 100,
             "metadata": {"run_id": run_id, "date": datetime.now().isoformat()},
         }
     )
+
+
+def register_rest_mapping(
+        wiremock: WireMockService,
+        run_id: str,
+        method: str,
+        url: str,
+        username: str,
+        password: str,
+        expected_response: str = None,
+        http_status_code=200,
+        fixed_delay_milliseconds: int = None,
+        fault: str = None,
+        response_behaviours: List[dict] = None,
+        request_headers: Dict[str, str] = None,
+        response_headers: Dict[str, str] = None,
+        priority: int = 100
+):
+    """
+    Registers a REST stub matched on the basic auth credentials, so concurrent runs can share the url
+
+    The request_headers must be equal to the given values, e.g. an If-None-Match, and the response_headers are
+    added to the Content-Type. A lower priority wins over the other stubs of the url.
+    """
+    request = {
+        "method": method,
+        "url": url,
+        "basicAuthCredentials": {
+            "username": username,
+            "password": password,
+        },
+    }
+    if request_headers:
+        request["headers"] = {name: {"equalTo": value} for name, value in request_headers.items()}
+
+    wiremock.post_mapping(
+        {
+            "request": request,
+            "response": _apply_response_faults(
+                {
+                    "status": http_status_code,
+                    "headers": {
+                        "Content-Type": "application/json",
+                        **(response_headers or {}),
+                    },
+                    **_response_body(wiremock, expected_response, ".json"),
+                },
+                fixed_delay_milliseconds=fixed_delay_milliseconds,
+                fault=fault,
+                response_behaviours=response_behaviours,
+            ),
+            "persistent": True,
+            "priority": priority,
+            "metadata": {"run_id": run_id, "date": datetime.now().isoformat()},
+        }
+    )
+
+
+def register_operation_mapping(
+        wiremock: WireMockService,
+        run_id: str,
+        operation: OperationStub,
+        request_values: Dict[str, Optional[str]] = None,
+        response_values: Dict[str, str] = None,
+        http_status_code=200,
+        fixed_delay_milliseconds: int = None,
+        fault: str = None,
+        response_behaviours: List[dict] = None
+):
+    """
+    Registers a SOAP stub rendered from the compiled templates of a WSDL operation
+
+    Args:
+        wiremock (WireMockService): The WireMock to register the stub in
+        run_id (str): The run the stub belongs to
+        operation (OperationStub): The operation, see wsdl_stub_generator.load_registry
+        request_values (Dict[str, Optional[str]], optional): The expected request leaves, the others are ignored
+        response_values (Dict[str, str], optional): The response leaves, the others are left empty
+    """
+    register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=operation.operations_url,
+        expected_request=operation.render_request(**(request_values or {})),
+        expected_response=operation.render_response(**(response_values or {})),
+        http_status_code=http_status_code,
+        fixed_delay_milliseconds=fixed_delay_milliseconds,
+        fault=fault,
+        response_behaviours=response_behaviours,
+    )
@@ -1,12 +1,21 @@
 import json
 import os
 import pathlib
+import time
 
-from invoke import task
+from invoke import Exit, task
 
+import benchmark_suite
+import load_runner
+import stub_bundle
+import stub_recorder
+import wiremock_launcher
 from no_ssl_verification import do_not_verify
+from wiremock_pool import DEFAULT_POOL_SIZE, WIREMOCK_POOL_URLS_ENV, WireMockPool, print_stats
 from wiremock_service import WireMockService
 
+STATS_INTERVAL_SECONDS = 30
+
 
 def _load_static_mappings(wiremock: WireMockService):
 
@@ -31,15 +40,192 @@ def _load_static_mappings(wiremock: WireMockService):
     for file in files:
         print(f"Uploading file {file}")
 
-        with open(file) as mf:
-            wiremock.upload_file(file_name=file.name, file_content=mf.read())
+        wiremock.upload_file(file_name=file.name, file_content=file)
 
 
-@task
-def setup_static_mappings(context):
+@task(help={"bundle": "Load the stubs from this bundle (see build-stub-bundle) instead of the defaults folder"})
+def setup_static_mappings(context, bundle=None):
 
     with do_not_verify():
         wiremock = WireMockService()
         wiremock.delete_all_mappings()
 
-        _load_static_mappings(wiremock)
\ No newline at end of file
+        if bundle:
+            loaded = stub_bundle.load_bundle(wiremock, bundle)
+            print(f"Loaded {len(loaded.mappings)} mappings and {len(loaded.bodies)} bodies from {bundle}")
+        else:
+            _load_static_mappings(wiremock)
+
+
+@task(
+    help={
+        "profile": f"One of {', '.join(wiremock_launcher.PROFILES)}",
+        "port": "https port",
+        "jar": "WireMock standalone jar",
+        "bundle": "Preload this stub bundle instead of the defaults folder",
+        "no_preload": "Start without the static mappings",
+    }
+)
+def wiremock(
+    context,
+    profile=wiremock_launcher.DEFAULT_PROFILE,
+    port=wiremock_launcher.DEFAULT_HTTPS_PORT,
+    jar=None,
+    bundle=None,
+    no_preload=False,
+):
+
+    with wiremock_launcher.launch(
+        profile=profile, https_port=int(port), jar=jar, preload=not no_preload, bundle=bundle
+    ) as wiremock_process:
+        print(f"WireMock ready on {wiremock_process.service.base_url} ({profile}), log in {wiremock_process.log_path}")
+        try:
+            wiremock_process.wait()
+        except KeyboardInterrupt:
+            pass
+
+
+@task(
+    help={
+        "size": "Number of WireMock instances",
+        "base_port": "https port of the first instance, the others use the next ones",
+        "profile": f"One of {', '.join(wiremock_launcher.PROFILES)}",
+        "jar": "WireMock standalone jar",
+        "bundle": "Preload this stub bundle instead of the defaults folder",
+    }
+)
+def wiremock_pool(
+    context,
+    size=DEFAULT_POOL_SIZE,
+    base_port=wiremock_launcher.DEFAULT_HTTPS_PORT,
+    profile="perf",
+    jar=None,
+    bundle=None,
+):
+
+    with WireMockPool.launch(
+        size=int(size), base_port=int(base_port), profile=profile, jar=jar, bundle=bundle
+    ) as pool:
+        print(f"WireMock pool ready, use {WIREMOCK_POOL_URLS_ENV}={','.join(pool.urls)}")
+        try:
+            while True:
+                time.sleep(STATS_INTERVAL_SECONDS)
+                print_stats(pool.stats())
+        except KeyboardInterrupt:
+            pass
+
+
+@task(help={"output": "Path of the bundle file"})
+def build_stub_bundle(context, output=stub_bundle.DEFAULT_BUNDLE_PATH):
+
+    path, bundle = stub_bundle.build_bundle(path=output)
+    print(f"Bundled {len(bundle.mappings)} mappings and {len(bundle.bodies)} bodies into {path}")
+
+
+@task(
+    help={
+        "duration": "Seconds of load",
+        "concurrency": "Number of worker threads",
+        "rate": "Calls per second, omit to call back to back",
+        "mix": "Operation weights, e.g. create_or_update_user=3,get_platform_info=1",
+        "domain": "Host domain called by the facades",
+        "output": "Path of the JSON results file",
+        "pool_urls": "Comma separated WireMock pool, the run uses the shard of its run id",
+        "background_stubs": "Extra user management stubs no call matches",
+        "run_id": "The run id the stubs are keyed on, a new one by default",
+        "keep_stubs": "Leave the stubs in the WireMock after the run",
+        "skip_stubs": "Call the stubs of --run-id, do not register them",
+    }
+)
+def load_test(
+    context,
+    duration=load_runner.DEFAULT_DURATION_SECONDS,
+    concurrency=load_runner.DEFAULT_CONCURRENCY,
+    rate=None,
+    mix="",
+    domain=load_runner.DEFAULT_DOMAIN,
+    output=None,
+    pool_urls=None,
+    background_stubs=0,
+    run_id=None,
+    keep_stubs=False,
+    skip_stubs=False,
+):
+
+    if skip_stubs and not run_id:
+        raise Exit("--skip-stubs needs the --run-id of a run that kept its stubs (--keep-stubs)", code=2)
+
+    results = load_runner.run_load(
+        operations=load_runner.parse_mix(mix),
+        duration=float(duration),
+        concurrency=int(concurrency),
+        rate=float(rate) if rate else None,
+        domain=domain,
+        pool=WireMockPool(pool_urls.split(",")) if pool_urls else None,
+        background_stubs=int(background_stubs),
+        register_stubs=not skip_stubs,
+        run_id=run_id,
+        keep_stubs=keep_stubs,
+    )
+
+    load_runner.print_report(results)
+    if output:
+        load_runner.save_results(results, output)
+
+
+@task(
+    help={
+        "output": "Path of the JSON results file",
+        "filter": "Only run the benchmarks whose name contains this",
+        "max_payload_size": "Largest base64 payload, in bytes",
+        "wiremock_url": "WireMock base url, enables the stub registration benchmark",
+    }
+)
+def benchmark(
+    context,
+    output=benchmark_suite.DEFAULT_OUTPUT,
+    filter="",
+    max_payload_size=benchmark_suite.DEFAULT_MAX_PAYLOAD_SIZE,
+    wiremock_url=None,
+):
+
+    results = benchmark_suite.run_benchmarks(
+        name_filter=filter, max_payload_size=int(max_payload_size), wiremock_url=wiremock_url
+    )
+    benchmark_suite.save_results(results, output)
+
+
+@task(help={"threshold": "Slowdown in percent above which a benchmark is flagged"})
+def benchmark_compare(
+    context,
+    baseline,
+    current=benchmark_suite.DEFAULT_OUTPUT,
+    threshold=benchmark_suite.DEFAULT_THRESHOLD_PERCENT,
+):
+
+    regressions = benchmark_suite.compare_results(
+        benchmark_suite.load_results(baseline), benchmark_suite.load_results(current), float(threshold)
+    )
+    if regressions:
+        raise Exit(f"{len(regressions)} benchmark(s) regressed more than {threshold}%", code=1)
+
+
+@task(help={"target": "Base url of the real Lifetime or Service Center, e.g. https://lifetime.example.com"})
+def record_start(context, target):
+
+    with do_not_verify():
+        stub_recorder.start_recording(WireMockService(), target)
+
+
+@task(
+    help={
+        "name": "Name of the recording, the mappings go to defaults/mappings/recorded_<name>.json",
+        "keep_wsdl": "Keep the recorded WSDL downloads",
+    }
+)
+def record_stop(context, name, keep_wsdl=False):
+
+    with do_not_verify():
+        mapping_file = stub_recorder.stop_recording(WireMockService(), name, skip_wsdl=not keep_wsdl)
+
+    print(f"Recorded mappings written to {mapping_file}")
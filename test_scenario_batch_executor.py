@@ -0,0 +1,69 @@
+import pytest as pytest
+
+import no_ssl_verification as SSL
+import soap_stub_templates
+import stubbing_utils as WireMockStubbing
+from platform_api.facades.batch_executor import LIFETIME, PROCESS_MODE, THREAD_MODE, BatchCall, BatchExecutor
+from platform_api.facades.lifetime_model import InactivateLifetimeUserRequest, LifetimeCredentials, LifetimeError
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+
+def _setup_mappings(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=soap_stub_templates.USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+        expected_request=soap_stub_templates.USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username=f"{run_id}-batch_user"),
+        expected_response=soap_stub_templates.USER_STATUS_RESPONSE_TEMPLATE.format(operation="User_SetInactive"),
+    )
+
+
+@pytest.fixture(scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings)
+
+
+def _calls(run_id: str):
+    return [
+        BatchCall(
+            LIFETIME,
+            "inactivate_user",
+            {
+                "domain": DEFAULT_DOMAIN,
+                "authentication": LifetimeCredentials(username="admin_username", password="admin_password"),
+                "request": InactivateLifetimeUserRequest(tenant_id="1122333", username=username),
+            },
+        )
+        for username in (f"{run_id}-batch_user", f"{run_id}-batch_user", f"{run_id}-unknown_batch_user")
+    ]
+
+
+@pytest.mark.parametrize("mode", [THREAD_MODE, PROCESS_MODE])
+def test_batch_results_are_in_call_order(boostrap, mode):
+    run_id = boostrap
+
+    with SSL.do_not_verify():
+        with BatchExecutor(mode=mode, workers=2) as executor:
+            results = executor.run(_calls(run_id) + [BatchCall(LIFETIME, "inactivate_user", {"unexpected": True})])
+
+    assert [result.ok for result in results] == [True, True, False, False]
+    assert results[0].value
+    assert isinstance(results[2].error, LifetimeError)
+    assert isinstance(results[3].error, TypeError)
+
+
+@pytest.mark.parametrize("mode", [THREAD_MODE, PROCESS_MODE])
+def test_a_call_raising_any_error_does_not_abort_the_batch(mode):
+    calls = [
+        BatchCall(LIFETIME, "inactivate_user", {"unexpected_argument": True}),
+        BatchCall(LIFETIME, "no_such_operation", {}),
+    ]
+
+    with BatchExecutor(mode=mode, workers=2) as executor:
+        results = executor.run(calls)
+
+    assert [type(result.error) for result in results] == [TypeError, AttributeError]
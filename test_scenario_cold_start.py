@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+
+import pytest as pytest
+
+# imported by the first call of a facade, never by importing it
+HEAVY_MODULES = ["suds", "requests", "urllib3", "httpx"]
+
+FACADE_MODULES = [
+    "platform_api.facades.lifetime_facade",
+    "platform_api.facades.platform_service_center_facade",
+]
+
+
+@pytest.mark.parametrize("facade_module", FACADE_MODULES)
+def test_when_facade_is_imported_and_built_the_heavy_modules_are_not_loaded(facade_module):
+    script = (
+        f"import sys, {facade_module} as facade_module\n"
+        "[getattr(facade_module, name)() for name in dir(facade_module) if name.endswith('Facade')]\n"
+        f"print(__import__('json').dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+    )
+
+    output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+
+    assert json.loads(output) == []
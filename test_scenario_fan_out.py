@@ -0,0 +1,65 @@
+import pytest as pytest
+
+import no_ssl_verification as SSL
+import soap_stub_templates
+import stubbing_utils as WireMockStubbing
+from platform_api.facades.fan_out import SERVICE_CENTER, FanOut
+from platform_api.facades.platform_service_center_model import ServiceCenterError
+from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+
+def _setup_mappings_for_get_platform_info(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=soap_stub_templates.PLATFORM_API_SOAP_OPERATIONS_URL,
+        expected_request=soap_stub_templates.GET_PLATFORM_INFO_REQUEST,
+        expected_response=soap_stub_templates.GET_PLATFORM_INFO_RESPONSE,
+    )
+
+
+@pytest.fixture(scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings_for_get_platform_info)
+
+
+def test_when_fan_out_calls_a_domain_many_times(boostrap):
+    with SSL.do_not_verify(), FanOut(SERVICE_CENTER, concurrency=8, per_domain_limit=2) as fan_out:
+        results = list(fan_out.run("get_platform_info", [(DEFAULT_DOMAIN, {})] * 10))
+        stats = fan_out.stats()
+
+    assert len(results) == 10
+    assert all(result.ok and result.domain == DEFAULT_DOMAIN for result in results)
+    assert (stats.total, stats.completed, stats.failed, stats.in_flight) == (10, 10, 0, 0)
+    assert stats.latency_median <= stats.latency_p95 <= stats.latency_max
+
+
+def test_when_domains_are_unreachable_their_errors_are_streamed():
+    domains = ["localhost:1", "localhost:2", "localhost:3"]
+    policy = ResiliencePolicy(max_retries=0, connect_timeout=1, read_timeout=1)
+
+    with FanOut(SERVICE_CENTER, concurrency=2, resilience_policy=policy) as fan_out:
+        results = list(fan_out.run("get_platform_info", [(domain, {}) for domain in domains]))
+        stats = fan_out.stats()
+
+    assert sorted(result.domain for result in results) == domains
+    assert all(isinstance(result.error, ServiceCenterError) for result in results)
+    assert (stats.completed, stats.failed) == (3, 3)
+
+
+def test_when_a_call_raises_an_unexpected_error_the_other_results_are_streamed():
+    policy = ResiliencePolicy(max_retries=0, connect_timeout=1, read_timeout=1)
+    calls = [("localhost:1", {}), ("localhost:2", {"unexpected_argument": 1}), ("localhost:3", {})]
+
+    with FanOut(SERVICE_CENTER, concurrency=2, resilience_policy=policy) as fan_out:
+        results = {result.domain: result for result in fan_out.run("get_platform_info", calls)}
+
+    assert sorted(results) == ["localhost:1", "localhost:2", "localhost:3"]
+    assert isinstance(results["localhost:2"].error, TypeError)
+    assert isinstance(results["localhost:1"].error, ServiceCenterError)
+    assert isinstance(results["localhost:3"].error, ServiceCenterError)
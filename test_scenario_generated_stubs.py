@@ -0,0 +1,93 @@
+from collections import Counter
+from http import HTTPStatus
+
+import pytest as pytest
+
+import stubbing_utils as WireMockStubbing
+import no_ssl_verification as SSL
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.lifetime_model import LifetimeCredentials, InactivateLifetimeUserRequest, LifetimeError
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
+from wsdl_stub_generator import load_registry
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+
+def _setup_mappings_from_wsdl(wiremock: WireMockService, run_id: str):
+    set_inactive = load_registry().get("User_SetInactive")
+
+    WireMockStubbing.register_operation_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        operation=set_inactive,
+        request_values={"Username": f"{run_id}-generated_user", "Authentication_Token": None},
+        response_values={"Success": "true", "Status_Id": "1", "Status_ResponseId": "0"},
+    )
+    WireMockStubbing.register_operation_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        operation=set_inactive,
+        request_values={"Username": f"{run_id}-generated_inactive_user", "Authentication_Token": None},
+        response_values={
+            "Success": "false",
+            "Status_Id": "-1",
+            "Status_ResponseId": "1000",
+            "Status_ResponseMessage": "The user is already inactive",
+        },
+    )
+
+
+@pytest.fixture(scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings_from_wsdl)
+
+
+def test_registry_compiles_every_shipped_operation():
+    registry = load_registry()
+
+    assert registry.get("User_SetInactive").request_fields == (
+        "Authentication_Username",
+        "Authentication_Password",
+        "Authentication_Token",
+        "Username",
+    )
+    assert registry.get("GetPlatformInfo").response_fields == ("Version", "Serial")
+    assert registry.get("Authentication_GetToken").service == "AuthenticationService"
+    assert Counter(operation.service for operation in registry) == {
+        "UserManagementService": 10,
+        "AuthenticationService": 1,
+        "OutSystemsPlatform": 2,
+        "Solutions": 15,
+    }
+
+
+def test_generated_stub_is_matched(boostrap):
+    run_id = boostrap
+
+    with SSL.do_not_verify():
+        response = LifetimeFacade().inactivate_user(
+            domain=DEFAULT_DOMAIN,
+            authentication=LifetimeCredentials(username="admin_username", password="admin_password"),
+            request=InactivateLifetimeUserRequest(tenant_id="1122333", username=f"{run_id}-generated_user"),
+        )
+
+    assert response
+
+
+def test_generated_error_stub_is_matched(boostrap):
+    run_id = boostrap
+
+    with SSL.do_not_verify():
+        with pytest.raises(LifetimeError) as e:
+            LifetimeFacade().inactivate_user(
+                domain=DEFAULT_DOMAIN,
+                authentication=LifetimeCredentials(username="admin_username", password="admin_password"),
+                request=InactivateLifetimeUserRequest(
+                    tenant_id="1122333", username=f"{run_id}-generated_inactive_user"
+                ),
+            )
+
+    assert e.value.error_code == 1000
+    assert e.value.http_status_code == HTTPStatus.BAD_REQUEST
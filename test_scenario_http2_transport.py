@@ -0,0 +1,171 @@
+import asyncio
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest as pytest
+
+import no_ssl_verification as SSL
+import stubbing_utils as WireMockStubbing
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.lifetime_model import LifetimeCredentials
+from platform_api.facades.protocol_wrappers.http_transport import Http2Transport
+from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import COA_INFRASTRUCTURE
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
+
+pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+EXPECTED_INFRASTRUCTURE_RESPONSE = """[{"Key": "env-1", "Name": "Development", "IsLifeTime": false, "HostName": "dev.example.com"}]"""
+
+PASSWORD = "admin_password"
+CONCURRENT_CALLS = 16
+
+
+def _setup_mappings_for_http2(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-http2".format(run_id),
+        password=PASSWORD,
+        expected_response=EXPECTED_INFRASTRUCTURE_RESPONSE,
+    )
+
+
+@pytest.fixture(scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings_for_http2)
+
+
+def test_http2_transport_negotiates_http2(boostrap):
+    run_id = boostrap
+
+    with Http2Transport(verify=False) as transport:
+        response = transport.request(
+            "GET", f"https://{DEFAULT_DOMAIN}{COA_INFRASTRUCTURE}", auth=("{}-http2".format(run_id), PASSWORD)
+        )
+
+    assert response.status_code == 200
+    assert response.http_version == "HTTP/2"
+
+
+def test_concurrent_calls_share_the_http2_transport(boostrap):
+    run_id = boostrap
+    authentication = LifetimeCredentials(username="{}-http2".format(run_id), password=PASSWORD)
+
+    with Http2Transport(verify=False) as transport:
+        facade = LifetimeFacade(transport=transport)
+        with ThreadPoolExecutor(max_workers=CONCURRENT_CALLS) as executor:
+            infrastructures = list(
+                executor.map(
+                    lambda _: facade.get_infrastructure(domain=DEFAULT_DOMAIN, authentication=authentication),
+                    range(CONCURRENT_CALLS),
+                )
+            )
+
+        connections = transport._client._transport._pool.connections
+
+    assert all(infrastructure[0].key == "env-1" for infrastructure in infrastructures)
+    assert len(connections) == 1
+    assert "HTTP/2" in connections[0].info()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def http2_server(tmp_path_factory):
+    """A local HTTP/2 server (hypercorn) answering after a short delay, recording the client address of each call"""
+
+    hypercorn_asyncio = pytest.importorskip("hypercorn.asyncio")
+    hypercorn_config = pytest.importorskip("hypercorn.config")
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is needed to create the certificate of the local server")
+
+    directory = tmp_path_factory.mktemp("http2")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+            "-keyout", str(directory / "key.pem"), "-out", str(directory / "cert.pem"),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    clients = []
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        clients.append((scope["http_version"], scope["client"]))
+        # keeps the calls in flight together, so they have to share the connection or open new ones
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    port = _free_port()
+    config = hypercorn_config.Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.certfile = str(directory / "cert.pem")
+    config.keyfile = str(directory / "key.pem")
+    config.accesslog = config.errorlog = None
+
+    shutdown = threading.Event()
+
+    async def _wait_for_shutdown():
+        await asyncio.get_running_loop().run_in_executor(None, shutdown.wait)
+
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(hypercorn_asyncio.serve(app, config, shutdown_trigger=_wait_for_shutdown),),
+        daemon=True,
+    )
+    thread.start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    yield f"https://127.0.0.1:{port}", clients
+
+    shutdown.set()
+    thread.join(timeout=10)
+
+
+def test_concurrent_calls_are_multiplexed_over_one_http2_connection(http2_server):
+    url, clients = http2_server
+
+    with Http2Transport(verify=False) as transport:
+        with ThreadPoolExecutor(max_workers=CONCURRENT_CALLS) as executor:
+            responses = list(executor.map(lambda _: transport.request("GET", url), range(CONCURRENT_CALLS)))
+        connections = transport._client._transport._pool.connections
+
+    assert [response.http_version for response in responses] == ["HTTP/2"] * CONCURRENT_CALLS
+    assert len(connections) == 1
+    # the server saw every call come from the same client socket
+    assert len(clients) == CONCURRENT_CALLS
+    assert {client for _, client in clients} == {clients[0][1]}
+    assert {http_version for http_version, _ in clients} == {"2"}
+
+
+def test_without_h2_the_transport_asks_for_the_http2_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, "h2", None)
+
+    with pytest.raises(ImportError, match=r"httpx\[http2\]"):
+        Http2Transport()
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest as pytest
+import requests
+
+import no_ssl_verification as SSL
+import stubbing_utils as WireMockStubbing
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.lifetime_model import LifetimeCredentials
+from platform_api.facades.protocol_wrappers.http_transport import HttpTransport
+from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import COA_INFRASTRUCTURE, LifeTimeRestWrapperService
+from wiremock_pytest_plugin import wiremock_domain, wiremock_url
+from wiremock_service import WireMockService
+
+EXPECTED_INFRASTRUCTURE_RESPONSE = """[{"Key": "env-1", "Name": "Development", "IsLifeTime": false, "HostName": "dev.example.com"}, {"Key": "env-2", "Name": "Production", "IsLifeTime": false, "HostName": "prd.example.com"}]"""
+
+INFRASTRUCTURE_ETAG = '"infrastructure-v1"'
+
+PASSWORD = "admin_password"
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+wiremock = WireMockService(wiremock_url())
+
+
+def _setup_mappings_for_get_infrastructure(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-etag".format(run_id),
+        password=PASSWORD,
+        expected_response=EXPECTED_INFRASTRUCTURE_RESPONSE,
+        response_headers={"ETag": INFRASTRUCTURE_ETAG},
+    )
+
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-etag".format(run_id),
+        password=PASSWORD,
+        http_status_code=HTTPStatus.NOT_MODIFIED,
+        request_headers={"If-None-Match": INFRASTRUCTURE_ETAG},
+        priority=50,
+    )
+
+
+@pytest.fixture(scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings_for_get_infrastructure)
+
+
+def test_when_infrastructure_is_not_modified_the_cached_environments_are_returned(boostrap):
+    run_id = boostrap
+    authentication = LifetimeCredentials(username="{}-etag".format(run_id), password=PASSWORD)
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade()
+
+        environments = lifetime.get_infrastructure(domain=DEFAULT_DOMAIN, authentication=authentication)
+        version = lifetime.infrastructure_version(domain=DEFAULT_DOMAIN, authentication=authentication)
+        cached_environments = lifetime.get_infrastructure(domain=DEFAULT_DOMAIN, authentication=authentication)
+        changed = lifetime.infrastructure_changed_since(
+            domain=DEFAULT_DOMAIN, authentication=authentication, version=version
+        )
+
+    assert [environment.key for environment in environments] == ["env-1", "env-2"]
+    assert cached_environments == environments
+    assert not changed
+    not_modified = wiremock.get_requests_count(
+        {
+            "method": "GET",
+            "url": COA_INFRASTRUCTURE,
+            "basicAuthCredentials": {"username": authentication.username, "password": PASSWORD},
+            "headers": {"If-None-Match": {"equalTo": INFRASTRUCTURE_ETAG}},
+        }
+    )["count"]
+    assert not_modified >= 3
+
+
+class _ConditionalTransport(HttpTransport):
+    """Answers the infrastructure with an ETag, and 304 Not Modified to the requests sending it back"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests = []
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.requests.append(kwargs["headers"])
+        response = requests.Response()
+        if kwargs["headers"].get("If-None-Match") == INFRASTRUCTURE_ETAG:
+            response.status_code = HTTPStatus.NOT_MODIFIED
+            response._content = b""
+        else:
+            response.status_code = HTTPStatus.OK
+            response._content = EXPECTED_INFRASTRUCTURE_RESPONSE.encode("utf-8")
+            response.headers["ETag"] = INFRASTRUCTURE_ETAG
+
+        return response
+
+
+def test_when_returned_environments_are_changed_the_cached_ones_are_not():
+    rest = LifeTimeRestWrapperService(transport=_ConditionalTransport())
+    authentication = LifetimeCredentials(username="user", password=PASSWORD)
+
+    environments = rest.get_infrastructure(domain="lifetime.example.com", authentication=authentication)
+    environments[0].name = "Changed by the caller"
+    not_modified = rest.get_infrastructure(domain="lifetime.example.com", authentication=authentication)
+
+    assert [environment.name for environment in not_modified] == ["Development", "Production"]
+
+
+def test_only_the_most_recently_used_infrastructures_are_kept():
+    transport = _ConditionalTransport()
+    rest = LifeTimeRestWrapperService(transport=transport, max_cached_infrastructures=2)
+
+    for username in ("first", "second", "first", "third", "first", "second"):
+        rest.get_infrastructure(
+            domain="lifetime.example.com", authentication=LifetimeCredentials(username=username, password=PASSWORD)
+        )
+
+    # second was dropped when third came in, first was kept as it had just been used
+    assert ["If-None-Match" in headers for headers in transport.requests] == [False, False, True, False, True, False]
@@ -0,0 +1,143 @@
+import pytest as pytest
+
+import no_ssl_verification as SSL
+import stubbing_utils as WireMockStubbing
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.lifetime_model import InactivateLifetimeUserRequest, LifetimeCredentials
+from platform_api.facades.lifetime_session_tokens import LIFETIME_INVALID_TOKEN_RESPONSE_IDS, LifetimeSessionTokens
+from wiremock_pytest_plugin import wiremock_domain, wiremock_url
+from wiremock_service import WireMockService
+
+EXPECTED_GET_TOKEN_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:Authentication_GetToken>
+         <out:Username>{username}</out:Username>
+         <out:Password>${{xmlunit.ignore}}</out:Password>
+      </out:Authentication_GetToken>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+EXPECTED_GET_TOKEN_RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <Authentication_GetTokenResponse xmlns="http://www.outsystems.com">
+            <Success>true</Success>
+            <Status>
+                <Id>1</Id>
+                <ResponseId>0</ResponseId>
+                <ResponseMessage>OK</ResponseMessage>
+                <ResponseAdditionalInfo/>
+            </Status>
+            <Token>{token}</Token>
+        </Authentication_GetTokenResponse>
+    </soap:Body>
+</soap:Envelope>"""
+
+EXPECTED_USER_SET_INACTIVE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:User_SetInactive>
+         <out:Authentication>
+            <out:Token>{token}</out:Token>
+         </out:Authentication>
+         <out:Username>{username}</out:Username>
+      </out:User_SetInactive>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+EXPECTED_USER_SET_INACTIVE_RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <User_SetInactiveResponse xmlns="http://www.outsystems.com">
+            <Success>{success}</Success>
+            <Status>
+                <Id>1</Id>
+                <ResponseId>{response_id}</ResponseId>
+                <ResponseMessage>{response_message}</ResponseMessage>
+                <ResponseAdditionalInfo/>
+            </Status>
+        </User_SetInactiveResponse>
+    </soap:Body>
+</soap:Envelope>"""
+
+AUTHENTICATION_SOAP_OPERATIONS_URL = "/LifeTimeServices/AuthenticationService.asmx?wsdl"
+USER_MANAGEMENT_SOAP_OPERATIONS_URL = "/LifeTimeServices/UserManagementService.asmx?wsdl"
+
+
+def _setup_mappings_for_session_tokens(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=AUTHENTICATION_SOAP_OPERATIONS_URL,
+        expected_request=EXPECTED_GET_TOKEN_REQUEST_TEMPLATE.format(username=f"{run_id}-admin"),
+        expected_response=EXPECTED_GET_TOKEN_RESPONSE_TEMPLATE.format(token=f"{run_id}-token"),
+    )
+
+    for token, success, response_id, response_message in [
+        (f"{run_id}-token", "true", "0", "smooth"),
+        (f"{run_id}-expired_token", "false", str(min(LIFETIME_INVALID_TOKEN_RESPONSE_IDS)), "Invalid token"),
+    ]:
+        WireMockStubbing.register_soap_mapping(
+            wiremock=wiremock,
+            run_id=run_id,
+            soap_operations_url=USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+            expected_request=EXPECTED_USER_SET_INACTIVE_REQUEST_TEMPLATE.format(
+                token=token, username=f"{run_id}-username"
+            ),
+            expected_response=EXPECTED_USER_SET_INACTIVE_RESPONSE_TEMPLATE.format(
+                success=success, response_id=response_id, response_message=response_message
+            ),
+        )
+
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+wiremock = WireMockService(wiremock_url())
+
+
+def _count_get_token_calls(username: str) -> int:
+    return wiremock.get_requests_count(
+        {"method": "POST", "url": AUTHENTICATION_SOAP_OPERATIONS_URL, "bodyPatterns": [{"contains": username}]}
+    )["count"]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings_for_session_tokens)
+
+
+def _inactivate(lifetime: LifetimeFacade, run_id: str) -> bool:
+    return lifetime.inactivate_user(
+        domain=DEFAULT_DOMAIN,
+        authentication=LifetimeCredentials(username=f"{run_id}-admin", password="admin_password"),
+        request=InactivateLifetimeUserRequest(tenant_id="1122333", username=f"{run_id}-username"),
+    )
+
+
+def test_when_token_is_acquired_once_per_credentials(boostrap):
+    run_id = boostrap
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(session_tokens=LifetimeSessionTokens())
+        get_token_calls_before = _count_get_token_calls(f"{run_id}-admin")
+
+        responses = [_inactivate(lifetime, run_id) for _ in range(3)]
+
+        get_token_calls = _count_get_token_calls(f"{run_id}-admin") - get_token_calls_before
+
+    assert responses == [True, True, True]
+    assert get_token_calls == 1
+
+
+def test_when_token_is_rejected_it_is_refreshed(boostrap):
+    run_id = boostrap
+    session_tokens = LifetimeSessionTokens()
+    session_tokens.token_for(DEFAULT_DOMAIN, f"{run_id}-admin", "admin_password", lambda: f"{run_id}-expired_token")
+
+    with SSL.do_not_verify():
+        response = _inactivate(LifetimeFacade(session_tokens=session_tokens), run_id)
+
+    assert response
+    assert session_tokens.get(DEFAULT_DOMAIN, f"{run_id}-admin", "admin_password") == f"{run_id}-token"
@@ -7,7 +7,8 @@ import stubbing_utils as WireMockStubbing
 from platform_api.facades.lifetime_facade import LifetimeFacade
 from platform_api.facades.lifetime_model import LifetimeCredentials, LifetimeError, \
     LifetimeUser
-from wiremock_service import WireMockService, WIREMOCK_DEFAULT_URL
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
 
 EXPECTED_USER_CREATE_OR_UPDATE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
    <soapenv:Header/>
@@ -51,10 +52,8 @@ EXPECTED_USER_CREATE_OR_UPDATE_RESPONSE_TEMPLATE = """<?xml version="1.0" encodi
 
 USER_MANAGEMENT_SOAP_OPERATIONS_URL = "/LifeTimeServices/UserManagementService.asmx?wsdl"
 
-wiremock = WireMockService(WIREMOCK_DEFAULT_URL)
 
-
-def _setup_mappings_for_user_create_or_update(run_id: str):
+def _setup_mappings_for_user_create_or_update(wiremock: WireMockService, run_id: str):
     happy_request = EXPECTED_USER_CREATE_OR_UPDATE_REQUEST_TEMPLATE.format(
         username="username",
         password="password",
@@ -139,20 +138,13 @@ def _setup_mappings_for_user_create_or_update(run_id: str):
     )
 
 
-DEFAULT_DOMAIN = "localhost:8433"
+DEFAULT_DOMAIN = wiremock_domain()
 
 
 @pytest.fixture(autouse=True, scope="session")
-def boostrap():
-    run_id = WireMockStubbing.new_run_id()
-
-    with SSL.do_not_verify():
-        _setup_mappings_for_user_create_or_update(run_id)
-
-    yield run_id
-
+def boostrap(wiremock_stubs):
     with SSL.do_not_verify():
-        wiremock.delete_by_run_id(run_id)
+        return wiremock_stubs.ensure(_setup_mappings_for_user_create_or_update)
 
 
 def test_when_user_create_or_update_is_successful():
@@ -7,7 +7,8 @@ import no_ssl_verification as SSL
 from platform_api.facades.lifetime_facade import LifetimeFacade
 from platform_api.facades.lifetime_model import LifetimeCredentials, InactivateLifetimeUserRequest, LifetimeError
 from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import LIFETIME_INACTIVATE_USER_USER_NOT_FOUND
-from wiremock_service import WireMockService, WIREMOCK_DEFAULT_URL
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
 
 EXPECTED_USER_SET_INACTIVE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
    <soapenv:Header/>
@@ -39,10 +40,8 @@ EXPECTED_USER_SET_INACTIVE_RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="
 
 USER_MANAGEMENT_SOAP_OPERATIONS_URL = "/LifeTimeServices/UserManagementService.asmx?wsdl"
 
-wiremock = WireMockService(WIREMOCK_DEFAULT_URL)
 
-
-def _setup_mappings_for_user_set_inactive(run_id: str):
+def _setup_mappings_for_user_set_inactive(wiremock: WireMockService, run_id: str):
     """
     Exemplo de introduzir o run_id por forma a garantir testes concorrentes
     """
@@ -129,20 +128,13 @@ def _setup_mappings_for_user_set_inactive(run_id: str):
     )
 
 
-DEFAULT_DOMAIN = "localhost:8433"
+DEFAULT_DOMAIN = wiremock_domain()
 
 
 @pytest.fixture(autouse=True, scope="session")
-def boostrap():
-    run_id = WireMockStubbing.new_run_id()
-
-    with SSL.do_not_verify():
-        _setup_mappings_for_user_set_inactive(run_id)
-
-    yield run_id
-
+def boostrap(wiremock_stubs):
     with SSL.do_not_verify():
-        wiremock.delete_by_run_id(run_id)
+        return wiremock_stubs.ensure(_setup_mappings_for_user_set_inactive)
 
 
 def test_when_set_inactive_is_successful(boostrap):
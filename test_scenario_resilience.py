@@ -0,0 +1,285 @@
+from http import HTTPStatus
+
+import pytest as pytest
+
+import no_ssl_verification as SSL
+import stubbing_utils as WireMockStubbing
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.lifetime_model import InactivateLifetimeUserRequest, LifetimeCredentials, LifetimeError
+from platform_api.facades.protocol_wrappers.lifetime_rest_wrapper import COA_INFRASTRUCTURE
+from platform_api.facades.protocol_wrappers.resilience import CIRCUIT_OPEN_ERROR_CODE, CircuitBreaker, ResiliencePolicy
+from wiremock_pytest_plugin import wiremock_domain, wiremock_url
+from wiremock_service import WireMockService
+
+EXPECTED_USER_SET_INACTIVE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:User_SetInactive>
+         <out:Authentication>
+            <out:Username>${{xmlunit.ignore}}</out:Username>
+            <out:Password>${{xmlunit.ignore}}</out:Password>
+         </out:Authentication>
+         <out:Username>{username}</out:Username>
+      </out:User_SetInactive>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+EXPECTED_INFRASTRUCTURE_RESPONSE = """[{"Key": "env-1", "Name": "Development", "IsLifeTime": false, "HostName": "dev.example.com"}]"""
+
+USER_MANAGEMENT_SOAP_OPERATIONS_URL = "/LifeTimeServices/UserManagementService.asmx?wsdl"
+
+PASSWORD = "admin_password"
+SLOW_RESPONSE_DELAY_MILLISECONDS = 2000
+READ_TIMEOUT_SECONDS = 0.5
+
+wiremock = WireMockService(wiremock_url())
+
+
+def _setup_mappings_for_resilience(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-slow".format(run_id),
+        password=PASSWORD,
+        expected_response=EXPECTED_INFRASTRUCTURE_RESPONSE,
+        fixed_delay_milliseconds=SLOW_RESPONSE_DELAY_MILLISECONDS
+    )
+
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-reset".format(run_id),
+        password=PASSWORD,
+        response_behaviours=[WireMockStubbing.connection_reset()]
+    )
+
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-malformed".format(run_id),
+        password=PASSWORD,
+        expected_response=EXPECTED_INFRASTRUCTURE_RESPONSE,
+        response_behaviours=[WireMockStubbing.malformed_response()]
+    )
+
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-failing".format(run_id),
+        password=PASSWORD,
+        expected_response="Server Error",
+        http_status_code=HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url=COA_INFRASTRUCTURE,
+        username="{}-healthy".format(run_id),
+        password=PASSWORD,
+        expected_response=EXPECTED_INFRASTRUCTURE_RESPONSE
+    )
+
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+        expected_request=EXPECTED_USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username="{}-slow".format(run_id)),
+        expected_response=None,
+        fixed_delay_milliseconds=SLOW_RESPONSE_DELAY_MILLISECONDS
+    )
+
+
+def _count_infrastructure_requests(username: str) -> int:
+    return wiremock.get_requests_count(
+        {
+            "method": "GET",
+            "url": COA_INFRASTRUCTURE,
+            "basicAuthCredentials": {"username": username, "password": PASSWORD},
+        }
+    )["count"]
+
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+
+@pytest.fixture(scope="session")
+def boostrap(wiremock_stubs):
+    with SSL.do_not_verify():
+        return wiremock_stubs.ensure(_setup_mappings_for_resilience)
+
+
+def test_when_get_infrastructure_times_out_it_is_retried(boostrap):
+    run_id = boostrap
+    username = "{}-slow".format(run_id)
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(
+            resilience_policy=ResiliencePolicy(read_timeout=READ_TIMEOUT_SECONDS, max_retries=2, backoff_factor=0)
+        )
+
+        with pytest.raises(LifetimeError) as e:
+            _ = lifetime.get_infrastructure(
+                domain=DEFAULT_DOMAIN,
+                authentication=LifetimeCredentials(username=username, password=PASSWORD),
+            )
+
+        assert e.value.http_status_code == HTTPStatus.GATEWAY_TIMEOUT
+        assert _count_infrastructure_requests(username) == 3
+
+
+def test_when_connection_is_reset_it_fails_with_service_unavailable(boostrap):
+    run_id = boostrap
+    username = "{}-reset".format(run_id)
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(resilience_policy=ResiliencePolicy(max_retries=1, backoff_factor=0))
+
+        with pytest.raises(LifetimeError) as e:
+            _ = lifetime.get_infrastructure(
+                domain=DEFAULT_DOMAIN,
+                authentication=LifetimeCredentials(username=username, password=PASSWORD),
+            )
+
+        assert e.value.http_status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert _count_infrastructure_requests(username) == 2
+
+
+def test_when_response_is_malformed_it_fails_with_service_unavailable(boostrap):
+    run_id = boostrap
+    username = "{}-malformed".format(run_id)
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(resilience_policy=ResiliencePolicy(max_retries=1, backoff_factor=0))
+
+        with pytest.raises(LifetimeError) as e:
+            _ = lifetime.get_infrastructure(
+                domain=DEFAULT_DOMAIN,
+                authentication=LifetimeCredentials(username=username, password=PASSWORD),
+            )
+
+        assert e.value.http_status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert _count_infrastructure_requests(username) == 2
+
+
+def test_when_server_keeps_failing_the_circuit_opens(boostrap):
+    run_id = boostrap
+    username = "{}-failing".format(run_id)
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(
+            resilience_policy=ResiliencePolicy(max_retries=0, failure_threshold=2, recovery_timeout=60)
+        )
+        authentication = LifetimeCredentials(username=username, password=PASSWORD)
+
+        for _ in range(2):
+            with pytest.raises(LifetimeError) as e:
+                _ = lifetime.get_infrastructure(domain=DEFAULT_DOMAIN, authentication=authentication)
+            assert e.value.http_status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+        with pytest.raises(LifetimeError) as e:
+            _ = lifetime.get_infrastructure(domain=DEFAULT_DOMAIN, authentication=authentication)
+
+        assert e.value.error_code == CIRCUIT_OPEN_ERROR_CODE
+        assert e.value.http_status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert _count_infrastructure_requests(username) == 2
+
+
+def test_when_server_is_healthy_the_call_succeeds(boostrap):
+    run_id = boostrap
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(resilience_policy=ResiliencePolicy(max_retries=2, backoff_factor=0))
+
+        environments = lifetime.get_infrastructure(
+            domain=DEFAULT_DOMAIN,
+            authentication=LifetimeCredentials(username="{}-healthy".format(run_id), password=PASSWORD),
+        )
+
+    assert len(environments) == 1
+    assert environments[0].key == "env-1"
+
+
+def test_when_non_idempotent_soap_call_times_out_it_is_not_retried(boostrap):
+    run_id = boostrap
+    username = "{}-slow".format(run_id)
+
+    with SSL.do_not_verify():
+        lifetime = LifetimeFacade(
+            resilience_policy=ResiliencePolicy(read_timeout=READ_TIMEOUT_SECONDS, max_retries=2, backoff_factor=0)
+        )
+
+        with pytest.raises(LifetimeError) as e:
+            _ = lifetime.inactivate_user(
+                domain=DEFAULT_DOMAIN,
+                authentication=LifetimeCredentials(username="admin_username", password=PASSWORD),
+                request=InactivateLifetimeUserRequest(tenant_id="1122333", username=username),
+            )
+
+        count = wiremock.get_requests_count(
+            {
+                "method": "POST",
+                "url": USER_MANAGEMENT_SOAP_OPERATIONS_URL,
+                "bodyPatterns": [{"contains": username}],
+            }
+        )["count"]
+
+    assert e.value.http_status_code == HTTPStatus.GATEWAY_TIMEOUT
+    assert count == 1
+
+
+def test_when_half_open_trial_raises_an_unexpected_error_the_circuit_opens_again():
+    policy = ResiliencePolicy(max_retries=0, failure_threshold=1, recovery_timeout=0)
+
+    def _reset():
+        raise ConnectionResetError("reset")
+
+    def _unparsable():
+        raise ValueError("not a WSDL")
+
+    with pytest.raises(LifetimeError):
+        policy.execute(domain="trial.example.com", operation=_reset, error_class=LifetimeError)
+    with pytest.raises(ValueError):
+        policy.execute(domain="trial.example.com", operation=_unparsable, error_class=LifetimeError)
+
+    assert policy.breaker_for("trial.example.com").state == CircuitBreaker.OPEN
+    assert policy.execute(domain="trial.example.com", operation=lambda: "ok", error_class=LifetimeError) == "ok"
+    assert policy.breaker_for("trial.example.com").state == CircuitBreaker.CLOSED
+
+
+def test_when_unexpected_errors_are_raised_the_circuit_stays_closed():
+    policy = ResiliencePolicy(max_retries=0, failure_threshold=1)
+
+    def _bad_arguments():
+        raise TypeError("unexpected keyword argument")
+
+    for _ in range(3):
+        with pytest.raises(TypeError):
+            policy.execute(domain="closed.example.com", operation=_bad_arguments, error_class=LifetimeError)
+
+    assert policy.breaker_for("closed.example.com").state == CircuitBreaker.CLOSED
+    assert policy.execute(domain="closed.example.com", operation=lambda: "ok", error_class=LifetimeError) == "ok"
+
+
+def test_when_the_policy_is_reset_every_domain_gets_a_closed_breaker():
+    policy = ResiliencePolicy(max_retries=0, failure_threshold=1)
+
+    def _reset():
+        raise ConnectionResetError("reset")
+
+    with pytest.raises(LifetimeError):
+        policy.execute(domain="reset.example.com", operation=_reset, error_class=LifetimeError)
+    assert policy.breaker_for("reset.example.com").state == CircuitBreaker.OPEN
+
+    policy.reset()
+
+    assert policy.breaker_for("reset.example.com").state == CircuitBreaker.CLOSED
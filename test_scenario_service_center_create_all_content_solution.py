@@ -10,7 +10,8 @@ from platform_api.facades.lifetime_model import LifetimeCredentials, LifetimeErr
     LifetimeChangeUserPassword
 from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
 from platform_api.facades.platform_service_center_model import ServiceCenterCredentials, ServiceCenterError
-from wiremock_service import WireMockService, WIREMOCK_DEFAULT_URL
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
 
 EXPECTED_SERVICE_CENTER_CREATE_ALL_CONTENT_SOLUTION_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
    <soapenv:Header/>
@@ -35,10 +36,8 @@ EXPECTED_SERVICE_CENTER_CREATE_ALL_CONTENT_SOLUTION_RESPONSE_TEMPLATE = """<?xml
 
 PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL = "/ServiceCenter/Solutions.asmx?wsdl"
 
-wiremock = WireMockService(WIREMOCK_DEFAULT_URL)
 
-
-def _setup_mappings_for_service_center_all_content_solution(run_id: str):
+def _setup_mappings_for_service_center_all_content_solution(wiremock: WireMockService, run_id: str):
     happy_request = EXPECTED_SERVICE_CENTER_CREATE_ALL_CONTENT_SOLUTION_REQUEST_TEMPLATE.format(
         solution_name="a_beautiful_name",
     )
@@ -66,20 +65,13 @@ def _setup_mappings_for_service_center_all_content_solution(run_id: str):
     )
 
 
-DEFAULT_DOMAIN = "localhost:8433"
+DEFAULT_DOMAIN = wiremock_domain()
 
 
 @pytest.fixture(autouse=True, scope="session")
-def boostrap():
-    run_id = WireMockStubbing.new_run_id()
-
-    with SSL.do_not_verify():
-        _setup_mappings_for_service_center_all_content_solution(run_id)
-
-    yield run_id
-
+def boostrap(wiremock_stubs):
     with SSL.do_not_verify():
-        wiremock.delete_by_run_id(run_id)
+        return wiremock_stubs.ensure(_setup_mappings_for_service_center_all_content_solution)
 
 
 def test_when_create_all_content_solution_is_successful():
@@ -8,7 +8,8 @@ from platform_api.facades.lifetime_facade import LifetimeFacade
 from platform_api.facades.lifetime_model import LifetimeCredentials, LifetimeError, \
     LifetimeChangeUserPassword
 from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
-from wiremock_service import WireMockService, WIREMOCK_DEFAULT_URL
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
 
 EXPECTED_SERVICE_CENTER_GET_PLATFORM_INFO_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
    <soapenv:Header/>
@@ -30,29 +31,23 @@ EXPECTED_SERVICE_CENTER_GET_PLATFORM_INFO_RESPONSE_TEMPLATE = """<?xml version="
 PLATFORM_API_SOAP_OPERATIONS_URL = "/ServiceCenter/OutSystemsPlatform.asmx?wsdl"
 
 
-wiremock = WireMockService(WIREMOCK_DEFAULT_URL)
+DEFAULT_DOMAIN = wiremock_domain()
 
 
-DEFAULT_DOMAIN = "localhost:8433"
+def _setup_mappings_for_service_center_get_platform_info(wiremock: WireMockService, run_id: str):
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=PLATFORM_API_SOAP_OPERATIONS_URL,
+        expected_request=EXPECTED_SERVICE_CENTER_GET_PLATFORM_INFO_REQUEST_TEMPLATE,
+        expected_response=EXPECTED_SERVICE_CENTER_GET_PLATFORM_INFO_RESPONSE_TEMPLATE
+    )
 
 
 @pytest.fixture(autouse=True, scope="session")
-def boostrap():
-    run_id = WireMockStubbing.new_run_id()
-
-    with SSL.do_not_verify():
-        WireMockStubbing.register_soap_mapping(
-            wiremock=wiremock,
-            run_id=run_id,
-            soap_operations_url=PLATFORM_API_SOAP_OPERATIONS_URL,
-            expected_request=EXPECTED_SERVICE_CENTER_GET_PLATFORM_INFO_REQUEST_TEMPLATE,
-            expected_response=EXPECTED_SERVICE_CENTER_GET_PLATFORM_INFO_RESPONSE_TEMPLATE
-        )
-
-    yield run_id
-
+def boostrap(wiremock_stubs):
     with SSL.do_not_verify():
-        wiremock.delete_by_run_id(run_id)
+        return wiremock_stubs.ensure(_setup_mappings_for_service_center_get_platform_info)
 
 
 def test_when_get_platform_info_is_successful():
@@ -10,7 +10,8 @@ from platform_api.facades.lifetime_model import LifetimeCredentials, LifetimeErr
     LifetimeChangeUserPassword
 from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
 from platform_api.facades.platform_service_center_model import ServiceCenterCredentials, ServiceCenterError
-from wiremock_service import WireMockService, WIREMOCK_DEFAULT_URL
+from wiremock_pytest_plugin import wiremock_domain
+from wiremock_service import WireMockService
 
 EXPECTED_SERVICE_CENTER_SET_LICENSE_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
    <soapenv:Header/>
@@ -44,14 +45,12 @@ EXPECTED_SERVICE_CENTER_SET_LICENSE_RESPONSE_TEMPLATE_WITH_ERROR_TEXT = """<?xml
 
 PLATFORM_API_SOAP_OPERATIONS_URL = "/ServiceCenter/OutSystemsPlatform.asmx?wsdl"
 
-wiremock = WireMockService(WIREMOCK_DEFAULT_URL)
-
 FILE_FOR_SUCCESSFUL_OPERATION = Base64Encoder().from_string_to_base64_string("good_license_file")
 FILE_FOR_UNSUCCESSFUL_OPERATION = Base64Encoder().from_string_to_base64_string("bad_license_file")
 FILE_FOR_CATASTROPHIC_OPERATION = Base64Encoder().from_string_to_base64_string("catastrophic_license_file")
 
 
-def _setup_mappings_for_service_center_set_license(run_id: str):
+def _setup_mappings_for_service_center_set_license(wiremock: WireMockService, run_id: str):
     happy_request = EXPECTED_SERVICE_CENTER_SET_LICENSE_REQUEST_TEMPLATE.format(
         file_content=FILE_FOR_SUCCESSFUL_OPERATION,
     )
@@ -94,20 +93,13 @@ def _setup_mappings_for_service_center_set_license(run_id: str):
     )
 
 
-DEFAULT_DOMAIN = "localhost:8433"
+DEFAULT_DOMAIN = wiremock_domain()
 
 
 @pytest.fixture(autouse=True, scope="session")
-def boostrap():
-    run_id = WireMockStubbing.new_run_id()
-
-    with SSL.do_not_verify():
-        _setup_mappings_for_service_center_set_license(run_id)
-
-    yield run_id
-
+def boostrap(wiremock_stubs):
     with SSL.do_not_verify():
-        wiremock.delete_by_run_id(run_id)
+        return wiremock_stubs.ensure(_setup_mappings_for_service_center_set_license)
 
 
 def test_when_set_license_is_successful():
@@ -1,3 +1,4 @@
+import hashlib
 from http import HTTPStatus
 
 import pytest as pytest
@@ -10,7 +11,9 @@ from platform_api.facades.lifetime_model import LifetimeCredentials, LifetimeErr
     LifetimeChangeUserPassword
 from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
 from platform_api.facades.platform_service_center_model import ServiceCenterCredentials, ServiceCenterError
-from wiremock_service import WireMockService, WIREMOCK_DEFAULT_URL
+from platform_api.facades.solution_cache import SolutionCache
+from wiremock_pytest_plugin import wiremock_domain, wiremock_url
+from wiremock_service import WireMockService
 
 EXPECTED_SERVICE_CENTER_SOLUTION_DOWNLOAD_REQUEST_TEMPLATE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
    <soapenv:Header/>
@@ -37,12 +40,16 @@ EXPECTED_SERVICE_CENTER_SOLUTION_DOWNLOAD_RESPONSE_TEMPLATE = """<?xml version="
 
 PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL = "/ServiceCenter/Solutions.asmx?wsdl"
 
-wiremock = WireMockService(WIREMOCK_DEFAULT_URL)
-
 FILE_FOR_SUCCESSFUL_OPERATION = Base64Encoder().from_string_to_base64_string("the_master_solution_file")
+FILE_FOR_CACHED_OPERATION = Base64Encoder().from_string_to_base64_string("the_cached_solution_file")
+
+
+def _cached_solution_name(run_id: str) -> str:
+    # only downloaded by the cache test, so the journal count of its downloads is not raced by the other tests
+    return f"{run_id}-the_cached_solution"
 
 
-def _setup_mappings_for_service_center_solution_download(run_id: str):
+def _setup_mappings_for_service_center_solution_download(wiremock: WireMockService, run_id: str):
     happy_request = EXPECTED_SERVICE_CENTER_SOLUTION_DOWNLOAD_REQUEST_TEMPLATE.format(
         solution_name="the_master_solution",
         solution_version_id="1000",
@@ -59,6 +66,20 @@ def _setup_mappings_for_service_center_solution_download(run_id: str):
         expected_response=happy_response
     )
 
+    WireMockStubbing.register_soap_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        soap_operations_url=PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL,
+        expected_request=EXPECTED_SERVICE_CENTER_SOLUTION_DOWNLOAD_REQUEST_TEMPLATE.format(
+            solution_name=_cached_solution_name(run_id),
+            solution_version_id="1001",
+        ),
+        expected_response=EXPECTED_SERVICE_CENTER_SOLUTION_DOWNLOAD_RESPONSE_TEMPLATE.format(
+            solution_download_operation_id="1001",
+            file_content=FILE_FOR_CACHED_OPERATION,
+        ),
+    )
+
     expected_request_for_network_error = EXPECTED_SERVICE_CENTER_SOLUTION_DOWNLOAD_REQUEST_TEMPLATE.format(
         solution_name="the_belzebu_solution_name",
         solution_version_id="666",
@@ -73,20 +94,25 @@ def _setup_mappings_for_service_center_solution_download(run_id: str):
     )
 
 
-DEFAULT_DOMAIN = "localhost:8433"
+DEFAULT_DOMAIN = wiremock_domain()
 
+wiremock = WireMockService(wiremock_url())
 
-@pytest.fixture(autouse=True, scope="session")
-def boostrap():
-    run_id = WireMockStubbing.new_run_id()
 
-    with SSL.do_not_verify():
-        _setup_mappings_for_service_center_solution_download(run_id)
+def _count_solution_downloads(solution_name: str) -> int:
+    return wiremock.get_requests_count(
+        {
+            "method": "POST",
+            "url": PLATFORM_SOLUTIONS_SOAP_OPERATIONS_URL,
+            "bodyPatterns": [{"contains": solution_name}],
+        }
+    )["count"]
 
-    yield run_id
 
+@pytest.fixture(autouse=True, scope="session")
+def boostrap(wiremock_stubs):
     with SSL.do_not_verify():
-        wiremock.delete_by_run_id(run_id)
+        return wiremock_stubs.ensure(_setup_mappings_for_service_center_solution_download)
 
 
 def test_when_solution_download_is_successful():
@@ -105,6 +131,26 @@ def test_when_solution_download_is_successful():
     assert Base64Encoder().from_base64_string_to_string(response.file_content) == "the_master_solution_file"
 
 
+def test_when_solution_is_downloaded_to_a_file(tmp_path):
+    with SSL.do_not_verify():
+        service_center = PlatformServiceCenterFacade()
+
+        response = service_center.solution_download(
+            domain=DEFAULT_DOMAIN,
+            authentication=ServiceCenterCredentials(username="admin_username", password="admin_password"),
+            solution_name="the_master_solution",
+            solution_version_id=1000,
+            file_backed=True,
+            download_dir=str(tmp_path),
+        )
+
+    assert response.solution_download_op_id == 1000
+    assert response.file_path.parent == tmp_path
+    assert response.size == len(b"the_master_solution_file")
+    assert response.sha256 == hashlib.sha256(b"the_master_solution_file").hexdigest()
+    assert response.payload()[:] == b"the_master_solution_file"
+
+
 def test_when_create_all_content_solution_with_catastrophic_error():
     with SSL.do_not_verify():
         service_center = PlatformServiceCenterFacade()
@@ -120,3 +166,28 @@ def test_when_create_all_content_solution_with_catastrophic_error():
     assert e.value.error_code == ""
     assert e.value.error_message == "Server Error"
     assert e.value.http_status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def test_when_cached_solution_is_downloaded_once(boostrap, tmp_path):
+    solution_name = _cached_solution_name(boostrap)
+
+    with SSL.do_not_verify():
+        service_center = PlatformServiceCenterFacade(solution_cache=SolutionCache(root=tmp_path))
+        downloads_before = _count_solution_downloads(solution_name)
+
+        solutions = [
+            service_center.solution_download_cached(
+                domain=DEFAULT_DOMAIN,
+                authentication=ServiceCenterCredentials(username="admin_username", password="admin_password"),
+                solution_name=solution_name,
+                solution_version_id=1001
+            )
+            for _ in range(2)
+        ]
+
+        downloads = _count_solution_downloads(solution_name) - downloads_before
+
+    assert downloads == 1
+    assert solutions[0] == solutions[1]
+    assert solutions[1].read_bytes() == b"the_cached_solution_file"
+    assert solutions[1].solution_download_op_id == 1001
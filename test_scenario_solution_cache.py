@@ -0,0 +1,59 @@
+import json
+import os
+import stat
+
+import pytest as pytest
+
+from platform_api.facades import solution_cache
+from platform_api.facades.solution_cache import DEFAULT_CACHE_DIR, SolutionCache
+
+DOMAIN = "sc.example.com"
+
+
+def test_default_cache_is_in_the_user_cache_folder():
+    assert DEFAULT_CACHE_DIR.parts[-2:] == ("simple-soap-tests", "solutions")
+    assert not str(DEFAULT_CACHE_DIR).startswith("/tmp/")
+
+
+def test_cache_root_is_private_to_its_owner(tmp_path):
+    cache = SolutionCache(root=tmp_path / "cache")
+
+    cache.put(DOMAIN, "solution", 1, b"content", 10)
+
+    assert stat.S_IMODE((tmp_path / "cache").stat().st_mode) == 0o700
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file owners to compare")
+def test_cache_root_of_another_user_is_refused(tmp_path, monkeypatch):
+    cache = SolutionCache(root=tmp_path / "cache")
+    cache.put(DOMAIN, "solution", 1, b"content", 10)
+    other_user = os.getuid() + 1
+    monkeypatch.setattr(solution_cache.os, "getuid", lambda: other_user)
+
+    with pytest.raises(PermissionError):
+        cache.get(DOMAIN, "solution", 1)
+
+
+def test_altered_object_is_a_miss_and_is_stored_again(tmp_path):
+    cache = SolutionCache(root=tmp_path)
+    stored = cache.put(DOMAIN, "solution", 1, b"the solution", 10)
+    stored.path.write_bytes(b"a poisoned package")
+
+    assert cache.get(DOMAIN, "solution", 1) is None
+
+    cache.put(DOMAIN, "solution", 1, b"the solution", 10)
+    assert cache.get(DOMAIN, "solution", 1).read_bytes() == b"the solution"
+
+
+def test_evicted_solutions_leave_no_index_entry(tmp_path):
+    cache = SolutionCache(root=tmp_path, max_bytes=15)
+    first = cache.put(DOMAIN, "first", 1, b"0123456789", 10)
+    os.utime(first.path, (1, 1))
+
+    cache.put(DOMAIN, "second", 1, b"abcdefghij", 11)
+
+    assert not first.path.exists()
+    assert cache.get(DOMAIN, "first", 1) is None
+    assert cache.get(DOMAIN, "second", 1).read_bytes() == b"abcdefghij"
+    entries = [json.loads(path.read_text()) for path in (tmp_path / "index").glob("*.json")]
+    assert [entry["sha256"] for entry in entries] == [cache.get(DOMAIN, "second", 1).sha256]
@@ -0,0 +1,97 @@
+import json
+
+import pytest as pytest
+
+import stub_bundle
+
+
+class _FakeWireMock:
+    def __init__(self) -> None:
+        self.files = {}
+        self.mappings = []
+
+    def upload_files(self, files, compress=False):
+        self.files.update(files)
+
+    def import_mappings(self, mappings):
+        self.mappings.extend(mappings)
+
+
+def _mapping(name: str, body_file_name: str = None) -> dict:
+    response = {"status": 200}
+    if body_file_name is not None:
+        response["bodyFileName"] = body_file_name
+    return {"name": name, "request": {"url": f"/{name}", "method": "GET"}, "response": response}
+
+
+@pytest.fixture
+def defaults_path(tmp_path):
+    (tmp_path / "responses").mkdir()
+    (tmp_path / "mappings").mkdir()
+    (tmp_path / "responses" / "first.xml").write_text("<same/>")
+    (tmp_path / "responses" / "second.xml").write_text("<same/>")
+    (tmp_path / "responses" / "binary.bin").write_bytes(b"\xff\x00\xfe")
+    (tmp_path / "responses" / "unreferenced.xml").write_text("<unused/>")
+    mappings = [
+        _mapping("first", "first.xml"),
+        _mapping("second", "second.xml"),
+        _mapping("binary", "binary.bin"),
+        _mapping("inline"),
+    ]
+    (tmp_path / "mappings" / "stubs.json").write_text(json.dumps({"mappings": mappings}))
+
+    return tmp_path
+
+
+def test_bundle_round_trips_through_build_and_load(defaults_path, tmp_path):
+    path, built = stub_bundle.build_bundle(defaults_path, tmp_path / "build" / "stubs.bundle.gz")
+    wiremock = _FakeWireMock()
+
+    loaded = stub_bundle.load_bundle(wiremock, path)
+
+    assert loaded == built
+    assert wiremock.mappings == built.mappings
+    assert [mapping["name"] for mapping in wiremock.mappings] == ["first", "second", "binary", "inline"]
+    assert wiremock.files == {
+        stub_bundle.content_address(b"<same/>", ".xml"): b"<same/>",
+        stub_bundle.content_address(b"\xff\x00\xfe", ".bin"): b"\xff\x00\xfe",
+    }
+    assert {mapping["response"].get("bodyFileName") for mapping in wiremock.mappings} - {None} == set(wiremock.files)
+
+
+def test_identical_bundles_are_byte_identical(defaults_path, tmp_path):
+    first, _ = stub_bundle.build_bundle(defaults_path, tmp_path / "first.bundle.gz")
+    second, _ = stub_bundle.build_bundle(defaults_path, tmp_path / "second.bundle.gz")
+
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_bundle_is_extracted_as_a_wiremock_root_folder(defaults_path, tmp_path):
+    path, built = stub_bundle.build_bundle(defaults_path, tmp_path / "stubs.bundle.gz")
+
+    root_dir = stub_bundle.extract_bundle(tmp_path / "root", path)
+
+    assert sorted(file.name for file in (root_dir / "__files").iterdir()) == sorted(built.bodies)
+    assert json.loads((root_dir / "mappings" / "default_stubs.json").read_text()) == {"mappings": built.mappings}
+
+
+def test_when_a_mapping_refers_to_a_missing_body(defaults_path):
+    (defaults_path / "mappings" / "broken.json").write_text(json.dumps({"mappings": [_mapping("x", "missing.xml")]}))
+
+    with pytest.raises(FileNotFoundError):
+        stub_bundle.collect_defaults(defaults_path)
+
+
+def test_when_bundle_has_another_format_version(defaults_path, tmp_path, monkeypatch):
+    path, _ = stub_bundle.build_bundle(defaults_path, tmp_path / "stubs.bundle.gz")
+    monkeypatch.setattr(stub_bundle, "FORMAT_VERSION", stub_bundle.FORMAT_VERSION + 1)
+
+    with pytest.raises(ValueError):
+        stub_bundle.read_bundle(path)
+
+
+def test_shipped_defaults_bundle_every_body_they_refer_to():
+    bundle = stub_bundle.collect_defaults()
+
+    referenced = {mapping["response"].get("bodyFileName") for mapping in bundle.mappings} - {None}
+    assert referenced == set(bundle.bodies)
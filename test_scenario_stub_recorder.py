@@ -0,0 +1,61 @@
+import xml.etree.ElementTree as ElementTree
+
+from stub_recorder import XMLUNIT_IGNORE, dedupe_mappings, normalize_xml
+
+SOAP = "http://schemas.xmlsoap.org/soap/envelope/"
+LT = "http://www.outsystems.com/LifeTimeServices"
+
+
+def test_normalize_xml_ignores_the_credentials_and_keeps_the_arguments():
+    xml = (
+        f'<soap:Envelope xmlns:soap="{SOAP}" xmlns:lt="{LT}"><soap:Body><lt:User_SetInactive>'
+        "<lt:Authentication><lt:Username>admin</lt:Username><lt:Password>secret</lt:Password>"
+        "<lt:Token>abc</lt:Token></lt:Authentication>"
+        "<lt:Username>john.doe</lt:Username>"
+        "</lt:User_SetInactive></soap:Body></soap:Envelope>"
+    )
+
+    root = ElementTree.fromstring(normalize_xml(xml))
+
+    authentication = root.find(f".//{{{LT}}}Authentication")
+    assert [child.text for child in authentication] == [XMLUNIT_IGNORE] * 3
+    # the Username outside the Authentication is the argument of the operation
+    assert root.find(f".//{{{LT}}}User_SetInactive/{{{LT}}}Username").text == "john.doe"
+
+
+def test_normalize_xml_ignores_the_given_volatile_elements_anywhere():
+    xml = "<a><b><Stamp>1</Stamp></b><Stamp>2</Stamp><Name>x</Name></a>"
+
+    root = ElementTree.fromstring(normalize_xml(xml, volatile_elements=["Stamp"]))
+
+    assert [element.text for element in root.iter("Stamp")] == [XMLUNIT_IGNORE, XMLUNIT_IGNORE]
+    assert root.find("Name").text == "x"
+
+
+def test_normalize_xml_leaves_elements_with_children_alone():
+    xml = "<a><Token><Inner>1</Inner></Token></a>"
+
+    assert ElementTree.fromstring(normalize_xml(xml)).find("Token/Inner").text == "1"
+
+
+def test_normalize_xml_returns_invalid_xml_as_is():
+    assert normalize_xml("<not xml") == "<not xml"
+
+
+def _mapping(url: str, body: str, status: int = 200) -> dict:
+    return {"request": {"method": "POST", "url": url}, "response": {"status": status, "body": body}}
+
+
+def test_dedupe_mappings_keeps_the_first_mapping_of_each_request():
+    first = _mapping("/a", "first")
+    mappings = [first, _mapping("/b", "other"), _mapping("/a", "second", status=500)]
+
+    assert dedupe_mappings(mappings) == [first, mappings[1]]
+
+
+def test_dedupe_mappings_ignores_the_order_of_the_request_fields():
+    first = {"request": {"method": "GET", "url": "/a"}, "response": {"status": 200}}
+    second = {"request": {"url": "/a", "method": "GET"}, "response": {"status": 404}}
+
+    assert dedupe_mappings([first, second]) == [first]
+    assert dedupe_mappings([]) == []
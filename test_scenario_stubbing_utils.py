@@ -0,0 +1,140 @@
+import hashlib
+import json
+
+import pytest as pytest
+
+import soap_stub_templates
+import stubbing_utils as WireMockStubbing
+from wiremock_service import WireMockService
+
+EXPECTED_REQUEST = soap_stub_templates.USER_SET_INACTIVE_REQUEST_TEMPLATE.format(username="some_user")
+
+
+def test_soap_stubs_match_the_whole_request_by_default():
+    pattern = WireMockStubbing.soap_body_pattern(EXPECTED_REQUEST)
+
+    assert pattern == {
+        "equalToXml": WireMockStubbing.canonicalize_xml(EXPECTED_REQUEST),
+        "enablePlaceholders": True,
+    }
+
+
+def test_xpath_matcher_checks_the_literal_leaves_and_that_the_ignored_ones_exist():
+    pattern = WireMockStubbing.soap_body_pattern(EXPECTED_REQUEST, WireMockStubbing.MATCH_XPATH)
+
+    assert pattern["matchesXPath"] == (
+        "/ns0:Envelope/ns0:Body/ns1:User_SetInactive"
+        "[ns1:Authentication/ns1:Username][ns1:Authentication/ns1:Password][ns1:Username='some_user']"
+    )
+    assert pattern["xPathNamespaces"] == {
+        "ns0": "http://schemas.xmlsoap.org/soap/envelope/",
+        "ns1": "http://www.outsystems.com",
+    }
+
+
+def test_xpath_matcher_falls_back_to_equal_to_xml_on_attributes():
+    expected_request = EXPECTED_REQUEST.replace("<out:Username>some_user", '<out:Username type="login">some_user')
+
+    assert "equalToXml" in WireMockStubbing.soap_body_pattern(expected_request, WireMockStubbing.MATCH_XPATH)
+
+
+def test_small_bodies_are_inline_and_large_ones_are_content_addressed_files(recording_server):
+    wiremock = WireMockService(recording_server.url)
+    large_body = "x" * WireMockStubbing.BODY_FILE_THRESHOLD
+    file_name = WireMockStubbing.body_file_name(large_body.encode("utf-8"), ".xml")
+
+    small = WireMockStubbing._response_body(wiremock, "x" * (WireMockStubbing.BODY_FILE_THRESHOLD - 1), ".xml")
+    large = WireMockStubbing._response_body(wiremock, large_body, ".xml")
+
+    assert small == {"body": "x" * (WireMockStubbing.BODY_FILE_THRESHOLD - 1)}
+    assert large == {"bodyFileName": file_name}
+    assert file_name == hashlib.sha256(large_body.encode("utf-8")).hexdigest() + ".xml"
+    assert [(request.method, request.path, request.body) for request in recording_server.requests] == [
+        ("PUT", f"/__admin/files/{file_name}", large_body.encode("utf-8"))
+    ]
+
+
+def test_body_files_are_uploaded_once_until_the_mappings_are_reset(recording_server):
+    wiremock = WireMockService(recording_server.url)
+    large_body = "y" * WireMockStubbing.BODY_FILE_THRESHOLD
+
+    for _ in range(2):
+        WireMockStubbing._response_body(wiremock, large_body, ".xml")
+    wiremock.reset_mappings()
+    WireMockStubbing._response_body(wiremock, large_body, ".xml")
+
+    assert [request.method for request in recording_server.requests] == ["PUT", "POST", "PUT"]
+
+
+def test_uniform_delay_draws_between_the_bounds():
+    assert WireMockStubbing.uniform_delay(100, 300) == {
+        "delayDistribution": {"type": "uniform", "lower": 100, "upper": 300}
+    }
+    assert WireMockStubbing.uniform_delay(200, 200)["delayDistribution"]["lower"] == 200
+
+    with pytest.raises(ValueError):
+        WireMockStubbing.uniform_delay(300, 100)
+
+
+def test_lognormal_delay_is_set_by_its_median_and_sigma():
+    assert WireMockStubbing.lognormal_delay(80, 0.4) == {
+        "delayDistribution": {"type": "lognormal", "median": 80, "sigma": 0.4}
+    }
+
+
+def test_chunked_dribble_delay_spreads_the_body_over_the_duration():
+    assert WireMockStubbing.chunked_dribble_delay(5, 1000) == {
+        "chunkedDribbleDelay": {"numberOfChunks": 5, "totalDuration": 1000}
+    }
+
+
+def _registered_response(recording_server, **kwargs) -> dict:
+    WireMockStubbing.register_soap_mapping(
+        wiremock=WireMockService(recording_server.url),
+        run_id="run",
+        soap_operations_url="/operations",
+        expected_request=EXPECTED_REQUEST,
+        expected_response="<ok/>",
+        **kwargs,
+    )
+    [request] = [request for request in recording_server.requests if request.path == "/__admin/mappings"]
+    recording_server.requests.clear()
+
+    return json.loads(request.body)["response"]
+
+
+def test_delay_and_fault_shorthands_go_through_the_builders(recording_server):
+    shorthands = _registered_response(
+        recording_server, fixed_delay_milliseconds=250, fault=WireMockStubbing.FAULT_CONNECTION_RESET_BY_PEER
+    )
+    behaviours = _registered_response(
+        recording_server,
+        response_behaviours=[WireMockStubbing.fixed_delay(250), WireMockStubbing.connection_reset()],
+    )
+
+    assert shorthands == behaviours
+    assert shorthands["fixedDelayMilliseconds"] == 250
+    assert shorthands["fault"] == "CONNECTION_RESET_BY_PEER"
+
+
+def test_response_behaviours_override_the_shorthands(recording_server):
+    response = _registered_response(
+        recording_server,
+        fault=WireMockStubbing.FAULT_EMPTY_RESPONSE,
+        response_behaviours=[WireMockStubbing.random_data_then_close()],
+    )
+
+    assert response["fault"] == WireMockStubbing.FAULT_RANDOM_DATA_THEN_CLOSE
+
+
+def test_unknown_fault_is_rejected_before_registering(recording_server):
+    with pytest.raises(ValueError):
+        WireMockStubbing.register_soap_mapping(
+            wiremock=WireMockService(recording_server.url),
+            run_id="run",
+            soap_operations_url="/operations",
+            expected_request=EXPECTED_REQUEST,
+            fault="CONNECTION_REFUSED",
+        )
+
+    assert recording_server.requests == []
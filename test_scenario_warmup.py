@@ -0,0 +1,49 @@
+import pytest as pytest
+
+import no_ssl_verification as SSL
+from platform_api.facades.lifetime_facade import LifetimeFacade
+from platform_api.facades.platform_service_center_facade import PlatformServiceCenterFacade
+from platform_api.facades.protocol_wrappers.base_soap_wrapper import clear_warm_clients
+from platform_api.facades.protocol_wrappers.http_transport import HttpTransport, PooledRequestsTransport
+from platform_api.facades.warmup import LIFETIME_SERVICES, REST_CONNECTION, SERVICE_CENTER_SERVICES, warmup
+from wiremock_pytest_plugin import wiremock_domain
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+
+@pytest.mark.parametrize(
+    "facade_class, services",
+    [(LifetimeFacade, LIFETIME_SERVICES), (PlatformServiceCenterFacade, SERVICE_CENTER_SERVICES)],
+)
+def test_when_facade_is_warmed_up_every_service_is_timed(facade_class, services):
+    clear_warm_clients()
+
+    with SSL.do_not_verify(), PooledRequestsTransport() as transport:
+        results = facade_class(transport=transport).warmup([DEFAULT_DOMAIN])
+
+    assert list(results) == [DEFAULT_DOMAIN]
+    assert results[DEFAULT_DOMAIN].ok
+    assert sorted(results[DEFAULT_DOMAIN].services) == sorted(services)
+    assert results[DEFAULT_DOMAIN].seconds >= max(results[DEFAULT_DOMAIN].services.values())
+
+
+def test_when_service_is_unknown():
+    with pytest.raises(ValueError):
+        warmup([DEFAULT_DOMAIN], services=["Unknown.asmx"])
+
+
+class _UnexpectedErrorTransport(HttpTransport):
+    def connect(self, url, timeout=None):
+        if "broken" in url:
+            raise RuntimeError("unexpected")
+
+
+def test_when_a_service_raises_an_unexpected_error_the_others_are_still_warmed():
+    results = warmup(
+        ["broken.example.com", "healthy.example.com"],
+        services=[REST_CONNECTION],
+        transport=_UnexpectedErrorTransport(),
+    )
+
+    assert isinstance(results["broken.example.com"].errors[REST_CONNECTION], RuntimeError)
+    assert results["healthy.example.com"].ok
@@ -0,0 +1,75 @@
+import pytest as pytest
+
+import wiremock_launcher
+from wiremock_launcher import DEFAULT_WIREMOCK_JAR, PROFILES, WIREMOCK_JAR_ENV, WireMockProfile, wiremock_command
+
+
+def test_command_puts_the_jvm_options_before_the_jar_and_the_wiremock_options_after():
+    profile = WireMockProfile(name="test", wiremock_args=("--verbose",), jvm_args=("-Xmx1g",))
+
+    command = wiremock_command(profile, https_port=9443, jar="wiremock.jar", root_dir="/tmp/stubs")
+
+    assert command == [
+        "java", "-Xmx1g", "-jar", "wiremock.jar",
+        "--disable-http", "--https-port", "9443",
+        "--root-dir", "/tmp/stubs",
+        "--verbose",
+    ]
+
+
+def test_command_without_root_dir_lets_wiremock_use_its_working_folder():
+    command = wiremock_command(WireMockProfile(name="test", wiremock_args=()), jar="wiremock.jar")
+
+    assert command == ["java", "-jar", "wiremock.jar", "--disable-http", "--https-port", "8433"]
+
+
+def test_command_takes_the_jar_from_the_environment_then_the_default(monkeypatch):
+    monkeypatch.setenv(WIREMOCK_JAR_ENV, "/opt/wiremock.jar")
+    assert wiremock_command(PROFILES["dev"])[2] == "/opt/wiremock.jar"
+    assert wiremock_command(PROFILES["dev"], jar="explicit.jar")[2] == "explicit.jar"
+
+    monkeypatch.delenv(WIREMOCK_JAR_ENV)
+    assert wiremock_command(PROFILES["dev"])[2] == DEFAULT_WIREMOCK_JAR
+
+
+@pytest.mark.parametrize("name", sorted(PROFILES))
+def test_profiles_are_named_after_their_key_and_keep_response_templating(name):
+    profile = PROFILES[name]
+
+    assert profile.name == name
+    assert "--local-response-templating" in profile.wiremock_args
+
+
+def test_only_the_dev_profile_logs_the_requests():
+    assert "--verbose" in PROFILES["dev"].wiremock_args
+    assert "--verbose" not in PROFILES["ci"].wiremock_args
+    assert "--verbose" not in PROFILES["perf"].wiremock_args
+
+
+def test_ci_profile_bounds_the_request_journal_the_resilience_tests_count():
+    args = PROFILES["ci"].wiremock_args
+
+    assert "--no-request-journal" not in args
+    assert args[args.index("--max-request-journal-entries") + 1] == "10000"
+
+
+def test_perf_profile_drops_the_journal_and_answers_asynchronously_on_a_fixed_heap():
+    profile = PROFILES["perf"]
+    args = profile.wiremock_args
+
+    assert "--no-request-journal" in args
+    assert args[args.index("--async-response-enabled") + 1] == "true"
+    assert int(args[args.index("--container-threads") + 1]) > int(
+        PROFILES["ci"].wiremock_args[PROFILES["ci"].wiremock_args.index("--container-threads") + 1]
+    )
+    assert {"-Xms1g", "-Xmx1g"} <= set(profile.jvm_args)
+
+
+def test_launch_rejects_an_unknown_profile_before_starting_anything(monkeypatch):
+    def _popen(*args, **kwargs):
+        raise AssertionError("no process should be started")
+
+    monkeypatch.setattr(wiremock_launcher.subprocess, "Popen", _popen)
+
+    with pytest.raises(KeyError):
+        wiremock_launcher.launch(profile="production")
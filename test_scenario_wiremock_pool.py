@@ -0,0 +1,81 @@
+import pytest as pytest
+
+from wiremock_pool import HashRing, ShardStats, WireMockPool, print_stats
+
+NODES = [f"https://localhost:{port}" for port in range(8433, 8437)]
+KEYS = [f"run-{index}" for index in range(2000)]
+
+
+def _assignment(ring: HashRing) -> dict:
+    return {key: ring.node_for(key) for key in KEYS}
+
+
+def test_ring_needs_a_node():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_ring_assignment_does_not_depend_on_the_node_order():
+    assert _assignment(HashRing(NODES)) == _assignment(HashRing(list(reversed(NODES))))
+
+
+def test_ring_spreads_the_keys_over_every_node():
+    counts = {node: 0 for node in NODES}
+    for node in _assignment(HashRing(NODES)).values():
+        counts[node] += 1
+
+    # 100 virtual nodes per node keep every share within a few tens of percent of the even split
+    assert all(len(KEYS) / len(NODES) * 0.5 < count < len(KEYS) / len(NODES) * 1.5 for count in counts.values())
+
+
+def test_adding_a_node_only_moves_keys_to_the_new_node():
+    before = _assignment(HashRing(NODES))
+    after = _assignment(HashRing(NODES + ["https://localhost:8437"]))
+
+    moved = {key for key in KEYS if before[key] != after[key]}
+
+    assert moved
+    assert {after[key] for key in moved} == {"https://localhost:8437"}
+    assert len(moved) < len(KEYS) / 3
+
+
+def test_removing_a_node_only_moves_the_keys_it_served():
+    before = _assignment(HashRing(NODES))
+    after = _assignment(HashRing(NODES[1:]))
+
+    assert {key for key in KEYS if before[key] != after[key]} == {
+        key for key in KEYS if before[key] == NODES[0]
+    }
+
+
+def test_workers_of_a_run_get_the_same_shard_in_every_process():
+    keys = [f"some-run-gw{worker}" for worker in range(16)]
+
+    urls = [WireMockPool(NODES).url_for(key) for key in keys]
+
+    assert urls == [WireMockPool(NODES).url_for(key) for key in keys]
+    assert set(urls) <= set(NODES)
+    assert len(set(urls)) > 1
+
+
+def test_pool_counts_the_keys_assigned_to_each_shard():
+    # nothing listens on port 1, the shard load is unknown
+    urls = ["http://127.0.0.1:1", "http://127.0.0.1:2"]
+    pool = WireMockPool(urls)
+    for key in KEYS[:50] + KEYS[:10]:
+        pool.url_for(key)
+
+    stats = pool.stats()
+
+    assert [shard.url for shard in stats] == urls
+    assert sum(shard.assigned_keys for shard in stats) == 50
+    assert all(shard.mappings is None and shard.journal_requests is None for shard in stats)
+    assert pool.domain_for(KEYS[0]) in {"127.0.0.1:1", "127.0.0.1:2"}
+
+
+def test_print_stats_shows_unknown_loads_as_dashes(capsys):
+    print_stats([ShardStats("https://localhost:8433", 3, 120, None)])
+
+    header, row = capsys.readouterr().out.splitlines()
+    assert header.split() == ["shard", "keys", "mappings", "journal"]
+    assert row.split() == ["https://localhost:8433", "3", "120", "-"]
@@ -0,0 +1,42 @@
+import uuid
+
+import stubbing_utils as WireMockStubbing
+import wiremock_pytest_plugin
+from wiremock_pytest_plugin import StubRegistrationCache, delete_run
+
+
+def _setup(wiremock, run_id):
+    WireMockStubbing.register_rest_mapping(
+        wiremock=wiremock,
+        run_id=run_id,
+        method="GET",
+        url="/some/resource",
+        username="user",
+        password="password",
+        expected_response="{}",
+    )
+
+
+def test_a_registered_stub_set_is_not_looked_up_again_in_the_run_directory(recording_server, monkeypatch):
+    run_id = str(uuid.uuid4())
+    cache = StubRegistrationCache(recording_server.url, run_id)
+    locked = []
+    file_lock = wiremock_pytest_plugin._file_lock
+
+    def _counting_file_lock(path):
+        locked.append(path)
+        return file_lock(path)
+
+    monkeypatch.setattr(wiremock_pytest_plugin, "_file_lock", _counting_file_lock)
+
+    try:
+        cache.ensure(_setup)
+        registered_locks = len(locked)
+        cache.ensure(_setup)
+    finally:
+        monkeypatch.undo()
+        delete_run(run_id)
+
+    assert registered_locks > 0
+    assert len(locked) == registered_locks
+    assert [request.method for request in recording_server.requests].count("POST") == 1
@@ -0,0 +1,43 @@
+import no_ssl_verification as SSL
+import stubbing_utils as WireMockStubbing
+from wiremock_pytest_plugin import wiremock_url
+from wiremock_service import WireMockRun, WireMockService
+
+EXPECTED_GET_PLATFORM_INFO_REQUEST = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:out="http://www.outsystems.com">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <out:GetPlatformInfo/>
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+PLATFORM_API_SOAP_OPERATIONS_URL = "/ServiceCenter/OutSystemsPlatform.asmx?wsdl"
+
+wiremock = WireMockService(wiremock_url())
+
+
+def _server_mapping_ids() -> set:
+    return {mapping["id"] for mapping in wiremock.get_mappings()["mappings"]}
+
+
+def test_when_run_is_closed_only_its_mappings_are_deleted():
+    with SSL.do_not_verify():
+        with WireMockRun(wiremock_url()) as other_run:
+            with WireMockRun(wiremock_url()) as run:
+                for wiremock_run in (run, other_run):
+                    WireMockStubbing.register_soap_mapping(
+                        wiremock=wiremock_run,
+                        run_id=wiremock_run.run_id,
+                        soap_operations_url=PLATFORM_API_SOAP_OPERATIONS_URL,
+                        expected_request=EXPECTED_GET_PLATFORM_INFO_REQUEST,
+                    )
+
+                run_mapping_ids = set(run.mapping_ids)
+                assert len(run_mapping_ids) == 1
+                assert run_mapping_ids <= _server_mapping_ids()
+
+            other_run_mapping_ids = set(other_run.mapping_ids)
+            server_mapping_ids = _server_mapping_ids()
+            assert not run_mapping_ids & server_mapping_ids
+            assert other_run_mapping_ids <= server_mapping_ids
+
+        assert not other_run_mapping_ids & _server_mapping_ids()
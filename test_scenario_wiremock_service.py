@@ -0,0 +1,64 @@
+import gzip
+import io
+
+import pytest as pytest
+
+from wiremock_service import UPLOAD_CHUNK_SIZE, WireMockService
+
+# spans several upload chunks, with a short last one
+CONTENT = bytes(range(256)) * (UPLOAD_CHUNK_SIZE // 128) + b"tail"
+
+
+def _uploaded(recording_server, file_name: str):
+    [request] = [request for request in recording_server.requests if request.path == f"/__admin/files/{file_name}"]
+    return request
+
+
+@pytest.mark.parametrize(
+    "kind",
+    ["bytes", "path", "file", "chunks"],
+)
+def test_body_file_is_uploaded_byte_for_byte(recording_server, tmp_path, kind):
+    path = tmp_path / "body.bin"
+    path.write_bytes(CONTENT)
+    file_content = {
+        "bytes": CONTENT,
+        "path": path,
+        "file": io.BytesIO(CONTENT),
+        "chunks": (CONTENT[i:i + 1000] for i in range(0, len(CONTENT), 1000)),
+    }[kind]
+
+    WireMockService(recording_server.url).upload_file(f"{kind}.bin", file_content)
+
+    request = _uploaded(recording_server, f"{kind}.bin")
+    assert request.method == "PUT"
+    assert request.body == CONTENT
+    assert "Content-Encoding" not in request.headers
+    if kind == "chunks":
+        assert request.headers["Transfer-Encoding"] == "chunked"
+    else:
+        assert request.headers["Content-Length"] == str(len(CONTENT))
+
+
+@pytest.mark.parametrize("kind", ["bytes", "path", "chunks"])
+def test_compressed_body_file_is_gzipped(recording_server, tmp_path, kind):
+    path = tmp_path / "body.bin"
+    path.write_bytes(CONTENT)
+    file_content = {"bytes": CONTENT, "path": path, "chunks": iter([CONTENT[:10], CONTENT[10:]])}[kind]
+
+    WireMockService(recording_server.url).upload_file(f"{kind}.bin.gz", file_content, compress=True)
+
+    request = _uploaded(recording_server, f"{kind}.bin.gz")
+    assert request.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(request.body) == CONTENT
+
+
+def test_text_body_file_is_sent_as_utf8_even_when_it_names_a_file(recording_server, tmp_path):
+    path = tmp_path / "body.xml"
+    path.write_text("<not-sent/>")
+
+    WireMockService(recording_server.url).upload_files([("text.xml", "<olá/>"), ("str_path.xml", str(path))])
+
+    assert _uploaded(recording_server, "text.xml").body == "<olá/>".encode("utf-8")
+    # a str is always the content: pass a pathlib.Path to upload a file
+    assert _uploaded(recording_server, "str_path.xml").body == str(path).encode("utf-8")
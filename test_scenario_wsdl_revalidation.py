@@ -0,0 +1,159 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest as pytest
+
+import no_ssl_verification as SSL
+from platform_api.facades.protocol_wrappers import base_soap_wrapper
+from platform_api.facades.protocol_wrappers.base_soap_wrapper import (
+    DEFAULT_WSDL_REVALIDATION_SECONDS,
+    clear_warm_clients,
+    revalidate_warm_clients,
+    set_wsdl_revalidation_interval,
+)
+from platform_api.facades.protocol_wrappers.lifetime_soap_wrapper import (
+    USER_MANAGEMENT_SERVICE_WSDL,
+    LifeTimeSoapWrapperService,
+)
+from platform_api.facades.protocol_wrappers.resilience import ResiliencePolicy
+from wiremock_pytest_plugin import wiremock_domain
+
+DEFAULT_DOMAIN = wiremock_domain()
+
+RESPONSES_DIR = Path(__file__).parent / "defaults" / "responses"
+
+USER_MANAGEMENT_WSDL = (RESPONSES_DIR / "lifetime_service_usermanagement.xml").read_bytes()
+UPGRADED_USER_MANAGEMENT_WSDL = USER_MANAGEMENT_WSDL.replace(b"User_SetInactive", b"User_SetDisabled")
+MAINTENANCE_PAGE = b"<!DOCTYPE html><html><body><p>Down for maintenance<br></p></body></html>"
+XHTML_MAINTENANCE_PAGE = b"<html><body><p>Down for maintenance</p></body></html>"
+
+
+class _WsdlHandler(BaseHTTPRequestHandler):
+    """Serves the document of the server with its ETag, and 304 to a request with that ETag"""
+
+    def do_GET(self):
+        self.server.if_none_match.append(self.headers.get("If-None-Match"))
+        if self.server.etag and self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if self.server.etag:
+            self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(len(self.server.document)))
+        self.end_headers()
+        self.wfile.write(self.server.document)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def wsdl_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WsdlHandler)
+    server.document = USER_MANAGEMENT_WSDL
+    server.etag = '"v1"'
+    server.if_none_match = []
+    server.url = f"http://127.0.0.1:{server.server_port}/{USER_MANAGEMENT_SERVICE_WSDL}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    clear_warm_clients()
+
+    yield server
+
+    set_wsdl_revalidation_interval(DEFAULT_WSDL_REVALIDATION_SECONDS)
+    clear_warm_clients()
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_for_revalidations():
+    deadline = time.monotonic() + 10
+    while base_soap_wrapper._revalidating and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _wrapper() -> LifeTimeSoapWrapperService:
+    return LifeTimeSoapWrapperService(resilience_policy=ResiliencePolicy(max_retries=0))
+
+
+def test_when_wsdl_is_not_modified_the_client_is_kept(wsdl_server):
+    wrapper = _wrapper()
+    client = wrapper._get_soap_client(wsdl_server.url)
+
+    changed = revalidate_warm_clients([wsdl_server.url])
+
+    assert changed == []
+    assert wsdl_server.if_none_match == [None, '"v1"']
+    assert wrapper._get_soap_client(wsdl_server.url) is client
+
+
+def test_when_only_the_etag_changed_the_wsdl_is_not_parsed_again(wsdl_server):
+    wrapper = _wrapper()
+    client = wrapper._get_soap_client(wsdl_server.url)
+    wsdl_server.etag = '"v2"'
+
+    assert revalidate_warm_clients([wsdl_server.url]) == []
+    assert revalidate_warm_clients([wsdl_server.url]) == []
+    assert wsdl_server.if_none_match == [None, '"v1"', '"v2"']
+    assert wrapper._get_soap_client(wsdl_server.url) is client
+
+
+def test_when_wsdl_changed_it_is_parsed_again_and_cloned(wsdl_server):
+    wrapper = _wrapper()
+    client = wrapper._get_soap_client(wsdl_server.url)
+    wsdl_server.document, wsdl_server.etag = UPGRADED_USER_MANAGEMENT_WSDL, '"v2"'
+
+    changed = revalidate_warm_clients([wsdl_server.url])
+    upgraded_client = wrapper._get_soap_client(wsdl_server.url)
+
+    assert changed == [wsdl_server.url]
+    assert upgraded_client is not client
+    assert hasattr(upgraded_client.service, "User_SetDisabled")
+    assert upgraded_client.options.location == wsdl_server.url
+
+
+def test_when_interval_elapsed_the_wsdl_is_revalidated_in_the_background(wsdl_server):
+    wrapper = _wrapper()
+    client = wrapper._get_soap_client(wsdl_server.url)
+    wsdl_server.document, wsdl_server.etag = UPGRADED_USER_MANAGEMENT_WSDL, '"v2"'
+    set_wsdl_revalidation_interval(0)
+
+    # the call past the interval starts the revalidation and gets the current client
+    assert wrapper._get_soap_client(wsdl_server.url) is client
+    _wait_for_revalidations()
+    set_wsdl_revalidation_interval(DEFAULT_WSDL_REVALIDATION_SECONDS)
+
+    assert hasattr(wrapper._get_soap_client(wsdl_server.url).service, "User_SetDisabled")
+
+
+@pytest.mark.parametrize("document", [MAINTENANCE_PAGE, XHTML_MAINTENANCE_PAGE])
+def test_when_revalidated_wsdl_is_malformed_the_client_is_kept_until_the_next_interval(wsdl_server, document):
+    wrapper = _wrapper()
+    client = wrapper._get_soap_client(wsdl_server.url)
+    wsdl_server.document, wsdl_server.etag = document, '"maintenance"'
+    set_wsdl_revalidation_interval(0)
+
+    wrapper._get_soap_client(wsdl_server.url)
+    _wait_for_revalidations()
+    set_wsdl_revalidation_interval(DEFAULT_WSDL_REVALIDATION_SECONDS)
+
+    assert wrapper._get_soap_client(wsdl_server.url) is client
+    assert wrapper._get_soap_client(wsdl_server.url) is client
+    assert len(wsdl_server.if_none_match) == 2
+
+
+def test_when_wiremock_wsdl_is_unchanged_the_client_is_kept():
+    clear_warm_clients()
+    url = "https://{}/{}".format(DEFAULT_DOMAIN, USER_MANAGEMENT_SERVICE_WSDL)
+
+    with SSL.do_not_verify():
+        wrapper = LifeTimeSoapWrapperService()
+        client = wrapper._get_soap_client(url)
+
+        changed = revalidate_warm_clients([url])
+
+        assert changed == []
+        assert wrapper._get_soap_client(url) is client
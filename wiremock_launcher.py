@@ -0,0 +1,227 @@
+"""
+Starts a managed WireMock process, waits until it answers and preloads the static mappings
+
+    with launch(profile="perf") as wiremock_process:
+        wiremock = wiremock_process.service
+        ...
+
+    inv wiremock --profile perf --port 8433
+
+Profiles:
+    dev: request logging (--verbose), the unbounded request journal, the WireMock defaults otherwise
+    ci: no request logging, a bounded request journal (the resilience tests count requests)
+    perf: no request logging and no request journal, more container threads, asynchronous responses
+        (so delayed responses do not hold a container thread) and a fixed size heap
+"""
+import os
+import pathlib
+import subprocess
+import tempfile
+import time
+from typing import NamedTuple, Optional, Tuple
+
+import requests
+
+import no_ssl_verification as SSL
+import stub_bundle
+from wiremock_service import WireMockService, forget_uploaded_files
+
+WIREMOCK_JAR_ENV = "WIREMOCK_JAR"
+DEFAULT_WIREMOCK_JAR = "wiremock-jre8-standalone-2.28.1.jar"
+DEFAULT_HTTPS_PORT = 8433
+DEFAULT_PROFILE = "dev"
+DEFAULT_READY_TIMEOUT_SECONDS = 60.0
+READY_POLL_INTERVAL_SECONDS = 0.2
+
+
+class WireMockProfile(NamedTuple):
+    """The WireMock command line options and the JVM options of a launch profile"""
+
+    name: str
+    wiremock_args: Tuple[str, ...]
+    jvm_args: Tuple[str, ...] = ()
+
+
+PROFILES = {
+    "dev": WireMockProfile(
+        name="dev",
+        wiremock_args=("--verbose", "--local-response-templating"),
+    ),
+    "ci": WireMockProfile(
+        name="ci",
+        wiremock_args=(
+            "--local-response-templating",
+            "--max-request-journal-entries", "10000",
+            "--container-threads", "100",
+        ),
+        jvm_args=("-Xms512m", "-Xmx512m"),
+    ),
+    "perf": WireMockProfile(
+        name="perf",
+        wiremock_args=(
+            "--local-response-templating",
+            "--no-request-journal",
+            "--container-threads", "200",
+            "--jetty-acceptor-threads", "4",
+            "--async-response-enabled", "true",
+            "--async-response-threads", "50",
+        ),
+        jvm_args=("-Xms1g", "-Xmx1g", "-XX:+UseG1GC"),
+    ),
+}
+
+
+def wiremock_command(
+        profile: WireMockProfile, https_port: int = DEFAULT_HTTPS_PORT, jar: str = None, root_dir: str = None
+) -> list:
+    """
+    Builds the java command line of a profile
+
+    Args:
+        profile (WireMockProfile): The launch profile
+        https_port (int): The https port, plain http is disabled as in start.sh
+        jar (str, optional): The WireMock standalone jar. Defaults to WIREMOCK_JAR or the 2.28.1 jar.
+        root_dir (str, optional): The folder holding the mappings and __files WireMock loads at startup
+
+    Returns:
+        list: the command
+    """
+
+    jar = jar or os.environ.get(WIREMOCK_JAR_ENV, DEFAULT_WIREMOCK_JAR)
+    command = ["java", *profile.jvm_args, "-jar", jar, "--disable-http", "--https-port", str(https_port)]
+    if root_dir is not None:
+        command += ["--root-dir", str(root_dir)]
+
+    return command + list(profile.wiremock_args)
+
+
+class WireMockProcess:
+    """A WireMock started by launch, stopped when leaving the context"""
+
+    def __init__(self, process: subprocess.Popen, https_port: int, log_path: pathlib.Path) -> None:
+        super().__init__()
+        self._process = process
+        self._https_port = https_port
+        self.log_path = log_path
+        self.service = WireMockService(f"https://localhost:{https_port}")
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    def is_running(self) -> bool:
+        return self._process.poll() is None
+
+    def wait_until_ready(self, timeout: float = DEFAULT_READY_TIMEOUT_SECONDS):
+        """
+        Polls the admin API until WireMock answers
+
+        Raises:
+            RuntimeError: if the process exited before being ready
+            TimeoutError: if WireMock did not answer within the timeout
+        """
+
+        deadline = time.monotonic() + timeout
+        url = f"{self.service.base_url}/__admin/mappings?limit=1"
+
+        while time.monotonic() < deadline:
+            if not self.is_running():
+                raise RuntimeError(
+                    f"WireMock exited with code {self._process.returncode}, see {self.log_path}"
+                )
+            try:
+                with SSL.do_not_verify():
+                    if requests.get(url, timeout=READY_POLL_INTERVAL_SECONDS * 5).ok:
+                        return
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(READY_POLL_INTERVAL_SECONDS)
+
+        raise TimeoutError(f"WireMock not ready on port {self._https_port} after {timeout}s, see {self.log_path}")
+
+    def wait(self):
+        """Blocks until the process exits"""
+
+        self._process.wait()
+
+    def stop(self, timeout: float = 10.0):
+        if self.is_running():
+            self._process.terminate()
+            try:
+                self._process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+
+    def __enter__(self) -> "WireMockProcess":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def preload_static_mappings(wiremock: WireMockService, bundle: Optional[str] = None):
+    """
+    Loads the default stubs, from a bundle file or straight from the defaults folder
+
+    Either way the bodies are uploaded once and the mappings imported in one request.
+    """
+
+    if bundle is not None:
+        stub_bundle.load_bundle(wiremock, bundle)
+        return
+
+    defaults = stub_bundle.collect_defaults()
+    wiremock.upload_files(defaults.bodies.items())
+    wiremock.import_mappings(defaults.mappings)
+
+
+def launch(
+        profile: str = DEFAULT_PROFILE,
+        https_port: int = DEFAULT_HTTPS_PORT,
+        jar: str = None,
+        root_dir: str = None,
+        preload: bool = True,
+        bundle: str = None,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT_SECONDS,
+) -> WireMockProcess:
+    """
+    Starts WireMock and returns once it is ready to serve
+
+    Args:
+        profile (str): The name of a profile in PROFILES
+        https_port (int): The https port
+        jar (str, optional): The WireMock standalone jar
+        root_dir (str, optional): The WireMock root folder
+        preload (bool): Load the static mappings once WireMock is ready
+        bundle (str, optional): Preload this stub bundle instead of the defaults folder
+        ready_timeout (float): Seconds to wait for WireMock to answer
+
+    Raises:
+        KeyError: if the profile is unknown
+        RuntimeError: if WireMock exited during startup
+        TimeoutError: if WireMock was not ready in time
+
+    Returns:
+        WireMockProcess: the running WireMock, its service property is bound to the port
+    """
+
+    command = wiremock_command(PROFILES[profile], https_port, jar, root_dir)
+    log_path = pathlib.Path(tempfile.gettempdir()) / f"wiremock-{https_port}.log"
+
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+    wiremock_process = WireMockProcess(process, https_port, log_path)
+
+    try:
+        wiremock_process.wait_until_ready(ready_timeout)
+        # a new WireMock on the port of an earlier one, its body files may be gone
+        forget_uploaded_files(wiremock_process.service.base_url)
+        if preload:
+            with SSL.do_not_verify():
+                preload_static_mappings(wiremock_process.service, bundle)
+    except BaseException:
+        wiremock_process.stop()
+        raise
+
+    return wiremock_process
@@ -0,0 +1,197 @@
+"""
+A pool of WireMock instances, each run id (or pytest worker) served by one shard chosen by consistent hashing
+
+    with WireMockPool.launch(size=4, profile="perf") as pool:
+        wiremock = pool.shard_for(run_id)        # register the stubs of the run there
+        domain = pool.domain_for(run_id)         # and point the facades at it
+        ...
+        print_stats(pool.stats())
+
+    inv wiremock-pool --size 4
+
+A pool of already running instances is built from their urls (WireMockPool(urls) or WIREMOCK_POOL_URLS).
+Adding or removing a shard only moves the keys of the neighbouring ring segments, the other runs keep their
+shard and their stubs.
+"""
+import bisect
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+
+import no_ssl_verification as SSL
+import wiremock_launcher
+from wiremock_service import WireMockService
+
+WIREMOCK_POOL_URLS_ENV = "WIREMOCK_POOL_URLS"
+DEFAULT_POOL_SIZE = 2
+# virtual nodes per shard, enough for an even split of the keys between a handful of shards
+DEFAULT_REPLICAS = 100
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hashing of keys to nodes"""
+
+    def __init__(self, nodes: List[str], replicas: int = DEFAULT_REPLICAS) -> None:
+        super().__init__()
+        if not nodes:
+            raise ValueError("a hash ring needs at least one node")
+
+        ring = sorted((_hash(f"{node}#{replica}"), node) for node in nodes for replica in range(replicas))
+        self._hashes = [point for point, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    def node_for(self, key: str) -> str:
+        """The first node clockwise from the hash of the key"""
+
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+
+        return self._nodes[index]
+
+
+class ShardStats(NamedTuple):
+    """The load of a shard"""
+
+    url: str
+    assigned_keys: int
+    mappings: Optional[int]
+    journal_requests: Optional[int]
+
+
+class WireMockPool:
+    """WireMock shards and the assignment of the keys (run ids, workers) to them"""
+
+    def __init__(self, urls: List[str], replicas: int = DEFAULT_REPLICAS) -> None:
+        super().__init__()
+        self._services: Dict[str, WireMockService] = {url: WireMockService(url) for url in urls}
+        self._ring = HashRing(list(self._services), replicas)
+        self._assigned: Dict[str, Set[str]] = {url: set() for url in urls}
+        self._lock = threading.Lock()
+        self._processes: List[wiremock_launcher.WireMockProcess] = []
+
+    @classmethod
+    def from_env(cls) -> Optional["WireMockPool"]:
+        """The pool listed in WIREMOCK_POOL_URLS (comma separated), None if it is not set"""
+
+        urls = [url.strip() for url in os.environ.get(WIREMOCK_POOL_URLS_ENV, "").split(",") if url.strip()]
+
+        return cls(urls) if urls else None
+
+    @classmethod
+    def launch(
+            cls,
+            size: int = DEFAULT_POOL_SIZE,
+            base_port: int = wiremock_launcher.DEFAULT_HTTPS_PORT,
+            profile: str = wiremock_launcher.DEFAULT_PROFILE,
+            jar: str = None,
+            bundle: str = None,
+    ) -> "WireMockPool":
+        """
+        Starts size WireMock instances on consecutive ports, each with the static mappings
+
+        Raises:
+            RuntimeError: if an instance exited during startup
+            TimeoutError: if an instance was not ready in time
+
+        Returns:
+            WireMockPool: the pool, closing it stops the instances
+        """
+
+        ports = [base_port + index for index in range(size)]
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [
+                executor.submit(wiremock_launcher.launch, profile=profile, https_port=port, jar=jar, bundle=bundle)
+                for port in ports
+            ]
+            processes, errors = [], []
+            for future in futures:
+                try:
+                    processes.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            for process in processes:
+                process.stop()
+            raise errors[0]
+
+        pool = cls([process.service.base_url for process in processes])
+        pool._processes = processes
+
+        return pool
+
+    @property
+    def urls(self) -> List[str]:
+        return list(self._services)
+
+    def url_for(self, key: str) -> str:
+        """The url of the shard serving a key (run id, worker id)"""
+
+        url = self._ring.node_for(key)
+        with self._lock:
+            self._assigned[url].add(key)
+
+        return url
+
+    def shard_for(self, key: str) -> WireMockService:
+        """The WireMock serving a key, to register the stubs of the key there"""
+
+        return self._services[self.url_for(key)]
+
+    def domain_for(self, key: str) -> str:
+        """The domain the facades must call for a key (e.g. localhost:8434)"""
+
+        return urlparse(self.url_for(key)).netloc
+
+    def stats(self) -> List[ShardStats]:
+        """
+        The load of every shard: the keys assigned by this pool, the stub mappings and the journal size
+
+        The mappings and journal size are None when the shard could not be reached (or, for the journal,
+        when it is disabled, see the perf profile of wiremock_launcher).
+        """
+
+        with self._lock:
+            assigned = {url: len(keys) for url, keys in self._assigned.items()}
+
+        stats = []
+        for url, service in self._services.items():
+            mappings = journal_requests = None
+            try:
+                with SSL.do_not_verify():
+                    mappings = service.count_mappings()
+                    journal_requests = service.count_journal_requests()
+            except requests.exceptions.RequestException:
+                pass
+            stats.append(ShardStats(url, assigned[url], mappings, journal_requests))
+
+        return stats
+
+    def close(self):
+        """Stops the instances started by launch"""
+
+        for process in self._processes:
+            process.stop()
+        self._processes = []
+
+    def __enter__(self) -> "WireMockPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def print_stats(stats: List[ShardStats]):
+    print(f"{'shard':<32}{'keys':>8}{'mappings':>10}{'journal':>10}")
+    for shard in stats:
+        mappings = "-" if shard.mappings is None else shard.mappings
+        journal = "-" if shard.journal_requests is None else shard.journal_requests
+        print(f"{shard.url:<32}{shard.assigned_keys:>8}{mappings:>10}{journal:>10}")
@@ -0,0 +1,254 @@
+"""
+pytest plugin sharing one WireMock client, one run id and one stub registration cache across the
+test modules and the parallel workers (pytest-parallel processes or pytest-xdist workers)
+
+The process that starts pytest creates the run id and exports it in WIREMOCK_RUN_ID, so the worker
+processes inherit it. Stub sets are identified by the hash of their content: the first worker to ask
+for a set registers it, the others find the marker left in the run directory and reuse it. The mapping
+ids are appended to the run directory as well, and the starting process deletes them all at the end.
+
+With a pool of WireMocks (--wiremock-pool or WIREMOCK_POOL_URLS, comma separated urls) every worker is
+assigned a shard by consistent hashing of the run id and its worker id (pytest-xdist workers; the
+processes forked by pytest-parallel share the shard of the process that started them). The test modules
+point the facades at the shard with wiremock_domain().
+
+Fixtures:
+    wiremock: the shared WireMockService
+    wiremock_run_id: the run id shared by every worker
+    wiremock_run: a WireMockRun for stubs private to the worker, deleted when the worker finishes
+    wiremock_stubs: the StubRegistrationCache
+"""
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import uuid
+from typing import Callable, Dict, List, Set
+from urllib.parse import urlparse
+
+import pytest
+
+import no_ssl_verification as SSL
+from wiremock_pool import WireMockPool, WIREMOCK_POOL_URLS_ENV
+from wiremock_service import FileContent, WireMockRun, WireMockService, WIREMOCK_DEFAULT_URL
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows, where the workers of a run are not coordinated
+    fcntl = None
+
+RUN_ID_ENV = "WIREMOCK_RUN_ID"
+WIREMOCK_URL_ENV = "WIREMOCK_URL"
+# the WireMock (pool shard) of the current process
+SHARD_URL_ENV = "WIREMOCK_SHARD_URL"
+XDIST_WORKER_ENV = "PYTEST_XDIST_WORKER"
+
+MAPPING_IDS_FILE = "mapping_ids"
+
+# metadata that changes on every registration and must not change the identity of a stub set
+VOLATILE_METADATA = ("date",)
+
+
+def wiremock_url() -> str:
+    """The url of the WireMock serving the current worker"""
+
+    return os.environ.get(SHARD_URL_ENV) or os.environ.get(WIREMOCK_URL_ENV) or WIREMOCK_DEFAULT_URL
+
+
+def wiremock_domain() -> str:
+    """The domain the facades of the current worker must call (e.g. localhost:8433)"""
+
+    return urlparse(wiremock_url()).netloc
+
+
+def _url_key(wiremock_base_url: str) -> str:
+    return hashlib.sha256(wiremock_base_url.encode("utf-8")).hexdigest()[:16]
+
+
+def _run_directory(run_id: str) -> pathlib.Path:
+    path = pathlib.Path(tempfile.gettempdir()) / "wiremock-runs" / run_id
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+@contextlib.contextmanager
+def _file_lock(path: pathlib.Path):
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class _CapturingWireMock:
+    """Stands in for a WireMockService to collect the mappings a setup function would post"""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__()
+        self.base_url = base_url
+        self.mappings: List[dict] = []
+        self.files: Dict[str, FileContent] = {}
+
+    def post_mapping(self, data: dict, content_type=None):
+        self.mappings.append(data)
+
+        return data
+
+    def upload_file(self, file_name: str, file_content: FileContent, compress: bool = False):
+        self.files[file_name] = file_content
+
+
+def stub_set_key(mappings: List[dict]) -> str:
+    """
+    The content hash identifying a stub set
+
+    Args:
+        mappings (List[dict]): The mappings of the set
+
+    Returns:
+        str: the sha256 hex digest of the mappings, without the volatile metadata
+    """
+
+    normalized = []
+    for mapping in mappings:
+        metadata = {k: v for k, v in (mapping.get("metadata") or {}).items() if k not in VOLATILE_METADATA}
+        normalized.append({**mapping, "metadata": metadata})
+
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class StubRegistrationCache:
+    """Registers each distinct stub set once per run, whatever the number of modules and workers asking for it"""
+
+    def __init__(self, wiremock_base_url: str, run_id: str) -> None:
+        super().__init__()
+        self._run = WireMockRun(wiremock_base_url, run_id=run_id)
+        self._directory = _run_directory(run_id)
+        self._registered: Set[str] = set()
+
+    @property
+    def run_id(self) -> str:
+        return self._run.run_id
+
+    def ensure(self, setup: Callable[[WireMockService, str], None]) -> str:
+        """
+        Makes sure the stubs posted by setup are registered
+
+        Args:
+            setup (Callable): Posts the stubs, called with (wiremock, run_id)
+
+        Returns:
+            str: the run id, so the fixture can hand it to the tests
+        """
+
+        capture = _CapturingWireMock(self._run.base_url)
+        setup(capture, self.run_id)
+        # stub sets are registered once per shard
+        key = f"{_url_key(self._run.base_url)}-{stub_set_key(capture.mappings)}"
+
+        if key in self._registered:
+            return self.run_id
+
+        with _file_lock(self._directory / f"{key}.lock"):
+            marker = self._directory / f"{key}.registered"
+            if not marker.exists():
+                # body files are content addressed and shared between runs, they are never deleted
+                self._run.upload_files(capture.files.items())
+                registered_before = len(self._run.mapping_ids)
+                for mapping in capture.mappings:
+                    self._run.post_mapping(mapping)
+                self._record(self._run.mapping_ids[registered_before:])
+                marker.touch()
+
+        self._registered.add(key)
+
+        return self.run_id
+
+    def _record(self, mapping_ids: List[str]):
+        ids_file = self._directory / MAPPING_IDS_FILE
+        with _file_lock(self._directory / f"{MAPPING_IDS_FILE}.lock"):
+            with open(ids_file, "a") as f:
+                f.writelines(f"{self._run.base_url} {mapping_id}\n" for mapping_id in mapping_ids)
+
+
+def delete_run(run_id: str):
+    """Deletes the stubs registered through the StubRegistrationCache of a run, on every shard, and its directory"""
+
+    directory = _run_directory(run_id)
+    ids_file = directory / MAPPING_IDS_FILE
+
+    if ids_file.exists():
+        mapping_ids: Dict[str, List[str]] = {}
+        for line in ids_file.read_text().splitlines():
+            if line.strip():
+                url, mapping_id = line.split()
+                mapping_ids.setdefault(url, []).append(mapping_id)
+        with SSL.do_not_verify():
+            for url, ids in mapping_ids.items():
+                WireMockService(url).delete_by_ids(ids)
+
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--wiremock-url",
+        default=os.environ.get(WIREMOCK_URL_ENV, WIREMOCK_DEFAULT_URL),
+        help="base url of the WireMock server used by the tests",
+    )
+    parser.addoption(
+        "--wiremock-pool",
+        default=os.environ.get(WIREMOCK_POOL_URLS_ENV, ""),
+        help="comma separated base urls of a WireMock pool, each worker uses one of them",
+    )
+
+
+def pytest_configure(config):
+    config._wiremock_run_owner = RUN_ID_ENV not in os.environ
+    if config._wiremock_run_owner:
+        os.environ[RUN_ID_ENV] = str(uuid.uuid4())
+
+    pool_urls = [url.strip() for url in config.getoption("--wiremock-pool").split(",") if url.strip()]
+    if pool_urls:
+        worker = os.environ.get(XDIST_WORKER_ENV, "main")
+        os.environ[SHARD_URL_ENV] = WireMockPool(pool_urls).url_for(f"{os.environ[RUN_ID_ENV]}-{worker}")
+    else:
+        os.environ[SHARD_URL_ENV] = config.getoption("--wiremock-url")
+
+
+def pytest_unconfigure(config):
+    if getattr(config, "_wiremock_run_owner", False):
+        delete_run(os.environ.pop(RUN_ID_ENV))
+        os.environ.pop(SHARD_URL_ENV, None)
+
+
+@pytest.fixture(scope="session")
+def wiremock_run_id() -> str:
+    return os.environ[RUN_ID_ENV]
+
+
+@pytest.fixture(scope="session")
+def wiremock() -> WireMockService:
+    return WireMockService(wiremock_url())
+
+
+@pytest.fixture(scope="session")
+def wiremock_run(wiremock_run_id):
+    run = WireMockRun(wiremock_url(), run_id=wiremock_run_id)
+
+    yield run
+
+    with SSL.do_not_verify():
+        run.close()
+
+
+@pytest.fixture(scope="session")
+def wiremock_stubs(wiremock_run_id) -> StubRegistrationCache:
+    return StubRegistrationCache(wiremock_url(), wiremock_run_id)
@@ -1,4 +1,13 @@
+import contextlib
+import functools
+import gzip
 import json
+import os
+import threading
+import uuid
+import zlib
+from http import HTTPStatus
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import requests
 
@@ -7,6 +16,69 @@ DEFAULT_XML_HEADER = {"Content-Type": "application/xml"}
 
 WIREMOCK_DEFAULT_URL = "https://localhost:8433"
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# the content of a body file: the text or bytes themselves, a path, a binary file object or an iterable of chunks
+FileContent = Union[str, bytes, os.PathLike, BinaryIO, Iterable[bytes]]
+
+# (wiremock base url, file name) of the body files uploaded by this process, forgotten when the mappings of the
+# WireMock are reset or deleted, or when wiremock_launcher starts it again
+_uploaded_files: Set[Tuple[str, str]] = set()
+_uploaded_files_lock = threading.Lock()
+
+
+def is_uploaded(base_url: str, file_name: str) -> bool:
+    """True if this process uploaded the body file to the WireMock since its mappings were last reset"""
+
+    with _uploaded_files_lock:
+        return (base_url, file_name) in _uploaded_files
+
+
+def forget_uploaded_files(base_url: str = None):
+    """Forgets the body files uploaded to a WireMock (to every WireMock by default), they are uploaded again"""
+
+    with _uploaded_files_lock:
+        if base_url is None:
+            _uploaded_files.clear()
+        else:
+            _uploaded_files.difference_update({key for key in _uploaded_files if key[0] == base_url})
+
+
+def _read_chunks(file: BinaryIO) -> Iterator[bytes]:
+    return iter(functools.partial(file.read, UPLOAD_CHUNK_SIZE), b"")
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@contextlib.contextmanager
+def _file_body(file_content: FileContent, compress: bool):
+    """
+    The request body uploading a file without reading it whole
+
+    Paths and file objects are sent as they are read (with a Content-Length when the size is known), iterables
+    with chunked transfer encoding. Compressed bodies are gzipped chunk by chunk.
+    """
+
+    if isinstance(file_content, str):
+        file_content = file_content.encode("utf-8")
+
+    if isinstance(file_content, bytes):
+        yield gzip.compress(file_content) if compress else file_content
+    elif isinstance(file_content, os.PathLike):
+        with open(file_content, "rb") as f:
+            yield _gzip_chunks(_read_chunks(f)) if compress else f
+    elif hasattr(file_content, "read"):
+        yield _gzip_chunks(_read_chunks(file_content)) if compress else file_content
+    else:
+        yield _gzip_chunks(file_content) if compress else file_content
+
 
 class WireMockService:
     """Handles call to the wiremock api"""
@@ -46,6 +118,7 @@ class WireMockService:
 
         response = requests.delete(self._mappings_url)
         response.raise_for_status()
+        forget_uploaded_files(self._base_url)
 
         return json.loads(response.text)
 
@@ -86,9 +159,70 @@ class WireMockService:
 
         return json.loads(response.text)
 
-    def upload_file(self, file_name: str, file_content: str):
-        response = requests.put(f"{self._wiremock_admin_url}/files/{file_name}", data=file_content)
+    def delete_by_ids(self, uuids: Iterable[str]):
+        """Deletes stub mappings by id, reusing one connection for all of them
+
+        Mappings that no longer exist are ignored.
+
+        Args:
+            uuids (Iterable[str]): The unique identifiers of the stub mappings
+        """
+
+        with requests.Session() as session:
+            for mapping_id in uuids:
+                response = session.delete(f"{self._mappings_url}/{mapping_id}")
+                if response.status_code != HTTPStatus.NOT_FOUND:
+                    response.raise_for_status()
+
+    def _put_file(self, session, file_name: str, file_content: FileContent, compress: bool):
+        headers = {"Content-Encoding": "gzip"} if compress else None
+        with _file_body(file_content, compress) as body:
+            response = session.put(f"{self._wiremock_admin_url}/files/{file_name}", data=body, headers=headers)
+        response.raise_for_status()
+
+        with _uploaded_files_lock:
+            _uploaded_files.add((self._base_url, file_name))
+
+    def upload_file(self, file_name: str, file_content: FileContent, compress: bool = False):
+        """Uploads a response body file, streamed from its source
+
+        Args:
+            file_name (str): The name the stubs refer to with bodyFileName
+            file_content (FileContent): The text (sent as UTF-8) or bytes, a path (a str is content, not a path),
+                a binary file object or an iterable of byte chunks
+            compress (bool): Gzip the upload, WireMock inflates request bodies sent with Content-Encoding gzip
+        """
+
+        self._put_file(requests, file_name, file_content, compress)
+
+    def upload_files(self, files: Iterable[Tuple[str, FileContent]], compress: bool = False):
+        """Uploads response body files, reusing one connection for all of them
+
+        Args:
+            files (Iterable[Tuple[str, FileContent]]): (file name, content) pairs, see upload_file
+            compress (bool): Gzip the uploads
+        """
+
+        with requests.Session() as session:
+            for file_name, file_content in files:
+                self._put_file(session, file_name, file_content, compress)
+
+    def import_mappings(self, mappings: Iterable[dict]):
+        """Imports stub mappings in a single request, streamed as they are serialized
+
+        Mappings with the id of an existing one replace it, the other mappings are kept.
+
+        Args:
+            mappings (Iterable[dict]): The stub mappings
+        """
+
+        def _body():
+            yield b'{"importOptions": {"duplicatePolicy": "OVERWRITE", "deleteAllNotInImport": false}, "mappings": ['
+            for index, mapping in enumerate(mappings):
+                yield (b"," if index else b"") + json.dumps(mapping).encode("utf-8")
+            yield b"]}"
 
+        response = requests.post(f"{self._mappings_url}/import", data=_body(), headers=DEFAULT_JSON_HEADER)
         response.raise_for_status()
 
     def get_requests_count(self, data: dict):
@@ -107,9 +241,98 @@ class WireMockService:
 
         return json.loads(response.text)
 
+    def count_mappings(self) -> int:
+        """Returns the number of stub mappings"""
+
+        response = requests.get(self._mappings_url, params={"limit": 1})
+        response.raise_for_status()
+
+        return json.loads(response.text)["meta"]["total"]
+
+    def count_journal_requests(self) -> Optional[int]:
+        """Returns the number of requests in the request journal, None if the journal is disabled"""
+
+        response = requests.get(f"{self._wiremock_admin_url}/requests", params={"limit": 1})
+        response.raise_for_status()
+        journal = json.loads(response.text)
+
+        return None if journal.get("requestJournalDisabled") else journal["meta"]["total"]
+
+    def start_recording(self, spec: dict):
+        """Starts recording the requests proxied to spec["targetBaseUrl"]
+
+        Args:
+            spec (dict): the WireMock recording spec
+        """
+
+        response = requests.post(f"{self._wiremock_admin_url}/recordings/start", json=spec, headers=DEFAULT_JSON_HEADER)
+        response.raise_for_status()
+
+    def stop_recording(self) -> dict:
+        """Stops the recording and returns the recorded stub mappings"""
+
+        response = requests.post(f"{self._wiremock_admin_url}/recordings/stop")
+        response.raise_for_status()
+
+        return json.loads(response.text)
+
     def reset_mappings(self):
         """Reset the  mappings"""
 
         url = f"{self._wiremock_admin_url}/mappings/reset?reloadStaticMappings=true"
         response = requests.post(url)
         response.raise_for_status()
+        forget_uploaded_files(self._base_url)
+
+
+class WireMockRun(WireMockService):
+    """Stub namespace of a single test run
+
+    Every mapping posted through the run gets a client side id and the run_id metadata, and the ids are
+    tracked so closing the run deletes exactly those mappings. Unlike delete_by_run_id, which makes
+    WireMock match the metadata of every mapping on the server, the teardown cost only depends on the
+    size of the run.
+
+    The run can be passed wherever a WireMockService is expected (e.g. stubbing_utils.register_soap_mapping).
+    """
+
+    def __init__(self, wiremock_base_url=WIREMOCK_DEFAULT_URL, run_id: str = None) -> None:
+        super().__init__(wiremock_base_url)
+        self._run_id = run_id or str(uuid.uuid4())
+        self._mapping_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def run_id(self) -> str:
+        return self._run_id
+
+    @property
+    def mapping_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._mapping_ids)
+
+    def post_mapping(self, data: dict, content_type=None):
+        data = dict(data)
+        data.setdefault("id", str(uuid.uuid4()))
+        data["metadata"] = {"run_id": self._run_id, **(data.get("metadata") or {})}
+
+        response = super().post_mapping(data, content_type)
+
+        with self._lock:
+            self._mapping_ids.append(response.get("id", data["id"]))
+
+        return response
+
+    def close(self):
+        """Deletes every mapping registered through the run"""
+
+        with self._lock:
+            mapping_ids, self._mapping_ids = self._mapping_ids, []
+
+        self.delete_by_ids(mapping_ids)
+
+    def __enter__(self) -> "WireMockRun":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
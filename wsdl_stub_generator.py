@@ -0,0 +1,423 @@
+"""
+Generates request matcher and response templates for every operation of the WSDLs shipped in defaults/
+
+Each WSDL is parsed once into a compiled registry of OperationStub: the request template is the SOAP
+envelope the suds client sends, the response template the one it expects back, with a str.format
+placeholder for every leaf element. The registry is cached on disk by WSDL content hash, so only a
+changed WSDL is parsed again.
+
+    registry = load_registry()
+    operation = registry.get("User_SetInactive")
+    request = operation.render_request(Username="bob")     # the other leaves are ${xmlunit.ignore}
+    response = operation.render_response(Success="true")   # the other leaves are empty
+
+stubbing_utils.register_operation_mapping registers a stub from an OperationStub.
+"""
+import hashlib
+import io
+import json
+import os
+import pathlib
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape
+
+XMLUNIT_IGNORE = "${xmlunit.ignore}"
+
+# bumped whenever the compiled format changes, so old cache entries are ignored
+REGISTRY_FORMAT_VERSION = 2
+
+DEFAULTS_PATH = pathlib.Path(os.path.dirname(os.path.realpath(__file__))) / "defaults"
+CACHE_PATH = pathlib.Path(tempfile.gettempdir()) / "wsdl-stubs"
+
+WSDL_NS = "http://schemas.xmlsoap.org/wsdl/"
+SOAP_BINDING_NS = "http://schemas.xmlsoap.org/wsdl/soap/"
+XSD_NS = "http://www.w3.org/2001/XMLSchema"
+SOAP_ENVELOPE_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+
+FIELD_SEPARATOR = "_"
+
+# the schema constructs holding the elements of a complex type
+COMPOSITORS = tuple(
+    f"{{{XSD_NS}}}{name}" for name in ("sequence", "all", "choice", "complexContent", "extension")
+)
+
+REQUEST_ENVELOPE = (
+    f'<soapenv:Envelope xmlns:soapenv="{SOAP_ENVELOPE_NS}" xmlns:out="{{namespace}}">'
+    "<soapenv:Header/><soapenv:Body>{body}</soapenv:Body></soapenv:Envelope>"
+)
+RESPONSE_ENVELOPE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    f'<soap:Envelope xmlns:soap="{SOAP_ENVELOPE_NS}"><soap:Body>{{body}}</soap:Body></soap:Envelope>'
+)
+
+
+class OperationStub(NamedTuple):
+    """The compiled templates of a WSDL operation"""
+
+    service: str
+    name: str
+    soap_action: str
+    operations_url: str
+    request_template: str
+    request_fields: Tuple[str, ...]
+    request_tags: Tuple[str, ...]
+    response_template: str
+    response_fields: Tuple[str, ...]
+
+    def render_request(self, **values: Optional[str]) -> str:
+        """
+        Renders the request matcher
+
+        Args:
+            values (str): The expected leaf values, by field name (e.g. Authentication_Username). None
+                leaves the element out, as suds does for the optional parameters it was not given.
+
+        Raises:
+            KeyError: if a value does not match a field of the operation
+
+        Returns:
+            str: the envelope to use with equalToXml, the leaves without a value are ${xmlunit.ignore}
+        """
+
+        texts = _fill(self.name, self.request_fields, values, XMLUNIT_IGNORE)
+        elements = {
+            field: "" if values.get(field, XMLUNIT_IGNORE) is None else f"<{tag}>{texts[field]}</{tag}>"
+            for field, tag in zip(self.request_fields, self.request_tags)
+        }
+
+        return self.request_template.format(**elements)
+
+    def render_response(self, **values: str) -> str:
+        """
+        Renders the response body
+
+        Args:
+            values (str): The leaf values, by field name (e.g. Status_ResponseId)
+
+        Raises:
+            KeyError: if a value does not match a field of the operation
+
+        Returns:
+            str: the envelope, the leaves without a value are left empty
+        """
+
+        return self.response_template.format(**_fill(self.name, self.response_fields, values, ""))
+
+
+def _fill(operation: str, fields: Tuple[str, ...], values: Dict[str, str], default: str) -> Dict[str, str]:
+    unknown = set(values) - set(fields)
+    if unknown:
+        raise KeyError(f"{operation} has no field(s) {', '.join(sorted(unknown))}")
+
+    return {field: escape(str(values[field])) if values.get(field) is not None else default for field in fields}
+
+
+class StubRegistry:
+    """The compiled operations of one or more WSDLs"""
+
+    def __init__(self, operations: Iterable[OperationStub] = ()) -> None:
+        super().__init__()
+        self._operations: Dict[Tuple[str, str], OperationStub] = {}
+        self._by_name: Dict[str, List[OperationStub]] = {}
+        for operation in operations:
+            self.add(operation)
+
+    def add(self, operation: OperationStub):
+        self._operations[(operation.service, operation.name)] = operation
+        self._by_name.setdefault(operation.name, []).append(operation)
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def __iter__(self):
+        return iter(self._operations.values())
+
+    def get(self, name: str, service: str = None) -> OperationStub:
+        """
+        Gets a compiled operation
+
+        Args:
+            name (str): The operation name, e.g. User_SetInactive
+            service (str, optional): The WSDL service name, only needed if several services share the name
+
+        Raises:
+            KeyError: if the operation is unknown or ambiguous
+
+        Returns:
+            OperationStub: the compiled operation
+        """
+
+        if service is not None:
+            return self._operations[(service, name)]
+
+        candidates = self._by_name.get(name, [])
+        if len(candidates) != 1:
+            raise KeyError(f"{len(candidates)} operations named {name}, pass the service")
+
+        return candidates[0]
+
+
+class _WsdlCompiler:
+    """Compiles the operations of a single WSDL document"""
+
+    def __init__(self, wsdl: bytes, operations_url: str) -> None:
+        super().__init__()
+        self._operations_url = operations_url
+        self._prefixes: Dict[str, str] = {}
+        self._root = self._parse(wsdl)
+        self._elements: Dict[Tuple[str, str], Tuple[ElementTree.Element, bool]] = {}
+        self._types: Dict[Tuple[str, str], Tuple[ElementTree.Element, bool]] = {}
+        self._index_schemas()
+
+    def _parse(self, wsdl: bytes) -> ElementTree.Element:
+        # ElementTree drops the prefix declarations, collect them to resolve type="s0:..." attributes
+        root = None
+        for event, item in ElementTree.iterparse(io.BytesIO(wsdl), events=("start-ns", "start")):
+            if event == "start-ns":
+                self._prefixes.setdefault(*item)
+            elif root is None:
+                root = item
+
+        return root
+
+    def _resolve(self, value: str) -> Tuple[str, str]:
+        prefix, _, local = value.rpartition(":")
+        return self._prefixes.get(prefix, ""), local
+
+    def _index_schemas(self):
+        for schema in self._root.iter(f"{{{XSD_NS}}}schema"):
+            namespace = schema.get("targetNamespace", "")
+            qualified = schema.get("elementFormDefault") == "qualified"
+            for child in schema:
+                if child.tag == f"{{{XSD_NS}}}element":
+                    self._elements[(namespace, child.get("name"))] = (child, qualified)
+                elif child.tag == f"{{{XSD_NS}}}complexType":
+                    self._types[(namespace, child.get("name"))] = (child, qualified)
+
+    def _direct_children(self, complex_type: ElementTree.Element) -> List[ElementTree.Element]:
+        """The elements of a complex type, without descending into the anonymous types of those elements"""
+
+        children = []
+        for child in complex_type:
+            if child.tag == f"{{{XSD_NS}}}element":
+                children.append(child)
+            elif child.tag in COMPOSITORS:
+                base = self._types.get(self._resolve(child.get("base", "")))
+                if base is not None:
+                    children.extend(self._direct_children(base[0]))
+                children.extend(self._direct_children(child))
+
+        return children
+
+    def _body(self, element_qname: Tuple[str, str], request: bool) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        element, qualified = self._elements[element_qname]
+        namespace, name = element_qname
+        # requests are matched with the out: prefix of the test templates, responses are written the way
+        # ASMX does, with a default namespace on the operation element
+        prefix = "out:" if request else ""
+        inner_xml, leaves = self._walk(element, qualified, prefix, request, (), frozenset())
+
+        open_tag = f"<out:{name}" if request else f'<{name} xmlns="{namespace}"'
+        close_tag = f"</out:{name}>" if request else f"</{name}>"
+        body = f"{open_tag}>{inner_xml}{close_tag}" if inner_xml else f"{open_tag}/>"
+
+        return body, tuple(leaves)
+
+    def _walk(
+            self,
+            element: ElementTree.Element,
+            qualified: bool,
+            prefix: str,
+            whole_leaves: bool,
+            path: Tuple[str, ...],
+            seen: frozenset,
+    ) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        """
+        Renders the content of an element: its children with a placeholder for each leaf
+
+        The placeholder stands for the whole leaf element when whole_leaves is set (so the request
+        matcher can leave out the optional elements suds does not send), for its text otherwise.
+        Returns None for a simple element, and the (field, tag) of every leaf.
+        """
+
+        complex_type = element.find(f"{{{XSD_NS}}}complexType")
+        type_name = element.get("type")
+        if complex_type is None and type_name is not None:
+            type_key = self._resolve(type_name)
+            if type_key in self._types and type_key not in seen:
+                complex_type, qualified = self._types[type_key]
+                seen = seen | {type_key}
+
+        if complex_type is None:
+            return None, []
+
+        xml, leaves = [], []
+        for child in self._direct_children(complex_type):
+            name = child.get("name") or self._resolve(child.get("ref", ""))[1]
+            tag = f"{prefix}{name}" if qualified else name
+            child_path = path + (name,)
+            inner_xml, inner_leaves = self._walk(child, qualified, prefix, whole_leaves, child_path, seen)
+
+            if inner_xml is None:
+                field = FIELD_SEPARATOR.join(child_path)
+                xml.append(f"{{{field}}}" if whole_leaves else f"<{tag}>{{{field}}}</{tag}>")
+                leaves.append((field, tag))
+            else:
+                xml.append(f"<{tag}>{inner_xml}</{tag}>" if inner_xml else f"<{tag}/>")
+                leaves.extend(inner_leaves)
+
+        return "".join(xml), leaves
+
+    def compile(self) -> List[OperationStub]:
+        messages = {
+            message.get("name"): self._resolve(message.find(f"{{{WSDL_NS}}}part").get("element"))
+            for message in self._root.findall(f"{{{WSDL_NS}}}message")
+            if message.find(f"{{{WSDL_NS}}}part") is not None
+        }
+        port_types = {
+            port_type.get("name"): {
+                operation.get("name"): (
+                    self._resolve(operation.find(f"{{{WSDL_NS}}}input").get("message"))[1],
+                    self._resolve(operation.find(f"{{{WSDL_NS}}}output").get("message"))[1],
+                )
+                for operation in port_type.findall(f"{{{WSDL_NS}}}operation")
+            }
+            for port_type in self._root.findall(f"{{{WSDL_NS}}}portType")
+        }
+        service = self._root.find(f"{{{WSDL_NS}}}service")
+        service_name = service.get("name") if service is not None else self._root.get("name", "")
+
+        operations = []
+        for binding in self._root.findall(f"{{{WSDL_NS}}}binding"):
+            # SOAP 1.1 only, it is what the suds clients speak
+            if binding.find(f"{{{SOAP_BINDING_NS}}}binding") is None:
+                continue
+            port_type = port_types[self._resolve(binding.get("type"))[1]]
+            for operation in binding.findall(f"{{{WSDL_NS}}}operation"):
+                name = operation.get("name")
+                soap_operation = operation.find(f"{{{SOAP_BINDING_NS}}}operation")
+                input_message, output_message = port_type[name]
+                input_element, output_element = messages[input_message], messages[output_message]
+
+                request_body, request_leaves = self._body(input_element, request=True)
+                response_body, response_leaves = self._body(output_element, request=False)
+
+                operations.append(
+                    OperationStub(
+                        service=service_name,
+                        name=name,
+                        soap_action=soap_operation.get("soapAction", "") if soap_operation is not None else "",
+                        operations_url=self._operations_url,
+                        request_template=REQUEST_ENVELOPE.format(namespace=input_element[0], body=request_body),
+                        request_fields=tuple(field for field, _ in request_leaves),
+                        request_tags=tuple(tag for _, tag in request_leaves),
+                        response_template=RESPONSE_ENVELOPE.format(body=response_body),
+                        response_fields=tuple(field for field, _ in response_leaves),
+                    )
+                )
+
+        return operations
+
+
+def compile_wsdl(wsdl: bytes, operations_url: str) -> List[OperationStub]:
+    """
+    Compiles every SOAP 1.1 operation of a WSDL
+
+    Args:
+        wsdl (bytes): The WSDL document
+        operations_url (str): The url the suds client posts the operations to
+
+    Returns:
+        List[OperationStub]: the compiled operations
+    """
+
+    return _WsdlCompiler(wsdl, operations_url).compile()
+
+
+def _cache_file(wsdl: bytes, operations_url: str, cache_path: pathlib.Path) -> pathlib.Path:
+    digest = hashlib.sha256(wsdl + b"\0" + operations_url.encode("utf-8")).hexdigest()
+    return cache_path / f"{digest}.v{REGISTRY_FORMAT_VERSION}.json"
+
+
+def load_wsdl(wsdl: bytes, operations_url: str, cache_path: Optional[pathlib.Path] = CACHE_PATH) -> List[OperationStub]:
+    """
+    Compiles a WSDL, reusing the cached result of an identical one
+
+    Args:
+        wsdl (bytes): The WSDL document
+        operations_url (str): The url the suds client posts the operations to
+        cache_path (pathlib.Path, optional): The cache folder, None disables the cache
+
+    Returns:
+        List[OperationStub]: the compiled operations
+    """
+
+    if cache_path is None:
+        return compile_wsdl(wsdl, operations_url)
+
+    cache_file = _cache_file(wsdl, operations_url, cache_path)
+    try:
+        with open(cache_file) as f:
+            return [OperationStub(*(tuple(v) if isinstance(v, list) else v for v in item)) for item in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        pass
+
+    operations = compile_wsdl(wsdl, operations_url)
+
+    cache_path.mkdir(parents=True, exist_ok=True)
+    temporary_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporary_file, "w") as f:
+        json.dump([list(operation) for operation in operations], f)
+    os.replace(temporary_file, cache_file)
+
+    return operations
+
+
+def shipped_wsdls(defaults_path: pathlib.Path = DEFAULTS_PATH) -> List[Tuple[pathlib.Path, str]]:
+    """
+    Lists the WSDLs served by the static mappings
+
+    Returns:
+        List[Tuple[pathlib.Path, str]]: the WSDL file and the url it is served at (the operations url)
+    """
+
+    wsdls = []
+    for mapping_file in sorted((defaults_path / "mappings").glob("*.json")):
+        with open(mapping_file) as f:
+            for mapping in json.load(f)["mappings"]:
+                url = mapping["request"].get("url", "")
+                body_file = mapping["response"].get("bodyFileName")
+                if body_file and url.lower().endswith("?wsdl"):
+                    wsdls.append((defaults_path / "responses" / body_file, url))
+
+    return wsdls
+
+
+_registries: Dict[Tuple[pathlib.Path, Optional[pathlib.Path]], StubRegistry] = {}
+
+
+def load_registry(
+        defaults_path: pathlib.Path = DEFAULTS_PATH, cache_path: Optional[pathlib.Path] = CACHE_PATH
+) -> StubRegistry:
+    """
+    Gets the compiled registry of every operation of the shipped WSDLs, built once per process
+
+    Args:
+        defaults_path (pathlib.Path): The folder holding the mappings and responses folders
+        cache_path (pathlib.Path, optional): The cache folder, None disables the on-disk cache
+
+    Returns:
+        StubRegistry: the compiled operations
+    """
+
+    key = (defaults_path, cache_path)
+    if key not in _registries:
+        registry = StubRegistry()
+        for wsdl_file, operations_url in shipped_wsdls(defaults_path):
+            for operation in load_wsdl(wsdl_file.read_bytes(), operations_url, cache_path):
+                registry.add(operation)
+        _registries[key] = registry
+
+    return _registries[key]